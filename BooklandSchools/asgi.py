@@ -3,6 +3,18 @@ ASGI config for BooklandSchools project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+To run it, with the read API served by the async views in
+booklandapp/async_views.py:
+
+    ASYNC_READ_VIEWS=True gunicorn BooklandSchools.asgi:application \
+        -k uvicorn_worker.UvicornWorker --workers 2
+
+or, for a single process, ``uvicorn BooklandSchools.asgi:application``.
+Each worker holds its clients on one event loop instead of a thread per
+connection. All middleware in settings.MIDDLEWARE is async-capable, so the
+async views run without a sync_to_async hop; the other views run on
+Django's worker threads as usual.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
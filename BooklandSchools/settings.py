@@ -66,22 +66,37 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # =====================================================
 MIDDLEWARE = [
+    "booklandapp.middleware.ServerTimingMiddleware",
+    "booklandapp.middleware.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "booklandapp.middleware.WhiteNoiseMiddleware",
+    "booklandapp.middleware.APICompressionMiddleware",
+    # Django's session, CSRF, auth and messages middleware, skipped for
+    # GET/HEAD/OPTIONS under PUBLIC_API_PREFIX (see PublicAPIBypassMixin).
+    "booklandapp.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "booklandapp.middleware.CsrfViewMiddleware",
+    "booklandapp.middleware.AuthenticationMiddleware",
+    "booklandapp.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Serve reads of the public API without sessions, auth, messages or CSRF:
+# every such request is anonymous and never touches the session table.
+PUBLIC_API_FAST_PATH = os.getenv("PUBLIC_API_FAST_PATH", "True").lower() == "true"
+PUBLIC_API_PREFIX = "/api/"
+
 # =====================================================
-# URLS / WSGI
+# URLS / WSGI / ASGI
 # =====================================================
 ROOT_URLCONF = "BooklandSchools.urls"
 WSGI_APPLICATION = "BooklandSchools.wsgi.application"
+# Serve the read endpoints with the native async views in
+# booklandapp/async_views.py. Turn on for the ASGI deployment (see
+# BooklandSchools/asgi.py); under WSGI every request to an async view
+# would pay for an event loop of its own.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "False").lower() == "true"
 
 # =====================================================
 # TEMPLATES
@@ -109,12 +124,112 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
 
+# Postgres only; set DATABASE_SSL_REQUIRE=False for a local Postgres (benchmarks).
+DATABASE_SSL_REQUIRE = os.getenv("DATABASE_SSL_REQUIRE", "True").lower() == "true"
+
+# Connections. Without a pool each worker (and background thread) keeps one
+# persistent connection for DB_CONN_MAX_AGE seconds; health checks test a
+# reused connection before its first query of a request, so a connection
+# the server dropped while the dyno idled is replaced instead of erroring.
+# DB_POOL=True uses psycopg's pool (Postgres only) instead: up to
+# DB_POOL_MAX_SIZE connections per worker, checked on checkout, closed
+# after DB_POOL_MAX_IDLE idle seconds, with stats logged every
+# DB_POOL_STATS_INTERVAL seconds (booklandapp/dbpool.py).
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 600))
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() == "true"
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 10))
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 4))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", 300))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))
+DB_POOL_STATS_INTERVAL = float(os.getenv("DB_POOL_STATS_INTERVAL", 300))
+
+
+def database_config(url):
+    # parse(), not config(): config() prefers $DATABASE_URL over the URL given.
+    config = dj_database_url.parse(url, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=DB_CONN_HEALTH_CHECKS)
+    if config["ENGINE"] == "django.db.backends.postgresql":
+        # sslmode is a libpq option; SQLite's connect() rejects it.
+        options = config.setdefault("OPTIONS", {})
+        if DATABASE_SSL_REQUIRE:
+            options["sslmode"] = "require"
+        options["connect_timeout"] = DB_CONNECT_TIMEOUT
+        if DB_POOL:
+            # Django hands pooled connections back on close, so none persist.
+            config["CONN_MAX_AGE"] = 0
+            options["pool"] = {
+                "min_size": DB_POOL_MIN_SIZE,
+                "max_size": DB_POOL_MAX_SIZE,
+                "timeout": DB_POOL_TIMEOUT,
+                "max_idle": DB_POOL_MAX_IDLE,
+                "max_lifetime": DB_POOL_MAX_LIFETIME,
+            }
+    return config
+
+
 DATABASES = {
-    "default": dj_database_url.config(
-        default=DATABASE_URL,
-        conn_max_age=600,
-        ssl_require=True,
-    )
+    "default": database_config(DATABASE_URL),
+}
+
+# Optional read replica for GET requests to the public API
+# (booklandapp/routers.py). Reads stay on the primary for
+# DATABASE_REPLICA_PIN_SECONDS after a write, and for
+# DATABASE_REPLICA_RETRY_SECONDS after the replica fails. Tests and
+# benchmarks use the primary's test database in its place.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+DATABASE_REPLICA_ALIAS = "replica"
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DATABASE_REPLICA_PIN_SECONDS", 10))
+DATABASE_REPLICA_RETRY_SECONDS = int(os.getenv("DATABASE_REPLICA_RETRY_SECONDS", 30))
+# Seconds between checks that the replica connection still works.
+DATABASE_REPLICA_CHECK_SECONDS = float(os.getenv("DATABASE_REPLICA_CHECK_SECONDS", 5))
+# The pin after a content edit is this file's modification time, so every
+# worker on the host honours it. Instances on other hosts do not see it;
+# the writer's own pin cookie works everywhere.
+DATABASE_REPLICA_PIN_PATH = os.getenv("DATABASE_REPLICA_PIN_PATH", str(BASE_DIR / "replica_pin"))
+
+if DATABASE_REPLICA_URL:
+    DATABASES[DATABASE_REPLICA_ALIAS] = database_config(DATABASE_REPLICA_URL)
+    DATABASES[DATABASE_REPLICA_ALIAS]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["booklandapp.routers.ReplicaRouter"]
+
+# =====================================================
+# CACHE
+# =====================================================
+# "api" holds the rendered read-only API responses (booklandapp/cache.py).
+# locmem is per gunicorn worker, so other workers only see admin edits once
+# their entries time out; use "file" or "db" to share one store between
+# workers ("db" needs `python manage.py createcachetable`).
+API_CACHE_BACKEND = os.getenv("API_CACHE_BACKEND", "locmem").lower()
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", 60 * 5))
+
+API_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bookland-api",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("API_CACHE_LOCATION", str(BASE_DIR / "cache" / "api")),
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "bookland_api_cache",
+    },
+}
+if API_CACHE_BACKEND not in API_CACHE_BACKENDS:
+    raise ValueError(f"API_CACHE_BACKEND must be one of {', '.join(API_CACHE_BACKENDS)}")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "api": {
+        **API_CACHE_BACKENDS[API_CACHE_BACKEND],
+        "TIMEOUT": API_CACHE_TIMEOUT,
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    },
 }
 
 # =====================================================
@@ -174,6 +289,60 @@ else:
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Admin image uploads (booklandapp/uploads.py). Files wait in the staging
+# directory until a background thread or `manage.py process_image_uploads`
+# sends them through the transport.
+IMAGE_UPLOAD_TRANSPORT = os.getenv(
+    "IMAGE_UPLOAD_TRANSPORT",
+    "booklandapp.uploads.CloudinaryTransport"
+    if CLOUDINARY_CLOUD_NAME and CLOUDINARY_API_KEY and CLOUDINARY_API_SECRET
+    else "booklandapp.uploads.LocalTransport",
+)
+IMAGE_STAGING_DIR = os.getenv("IMAGE_STAGING_DIR", str(BASE_DIR / "staging"))
+IMAGE_UPLOAD_IN_PROCESS = os.getenv("IMAGE_UPLOAD_IN_PROCESS", "True").lower() == "true"
+IMAGE_UPLOAD_THREADS = int(os.getenv("IMAGE_UPLOAD_THREADS", 4))
+IMAGE_UPLOAD_MAX_ATTEMPTS = int(os.getenv("IMAGE_UPLOAD_MAX_ATTEMPTS", 6))
+# Widths offered in each image's srcset (booklandapp/images.py), and the
+# width of the inline placeholder preview.
+IMAGE_VARIANT_WIDTHS = [
+    int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "160,320,640,1024,1600").split(",") if width.strip()
+]
+IMAGE_PLACEHOLDER_WIDTH = int(os.getenv("IMAGE_PLACEHOLDER_WIDTH", 16))
+# Gallery bulk upload in the admin: images per request (zip members
+# included) and the extracted size allowed per zip archive.
+GALLERY_BULK_MAX_FILES = int(os.getenv("GALLERY_BULK_MAX_FILES", 500))
+GALLERY_BULK_MAX_ZIP_BYTES = int(os.getenv("GALLERY_BULK_MAX_ZIP_BYTES", 2 * 1024 ** 3))
+# Fee structure PDFs (booklandapp/feepdfs.py): with FEE_PDF_MIRROR on they
+# are copied from Cloudinary to FEE_PDF_MIRROR_DIR and served from there by
+# /api/fees/<id>/pdf/. PUBLIC_BASE_URL makes the links in /api/fees/ absolute.
+FEE_PDF_MIRROR = os.getenv("FEE_PDF_MIRROR", "False").lower() == "true"
+FEE_PDF_MIRROR_DIR = os.getenv("FEE_PDF_MIRROR_DIR", str(BASE_DIR / "fee_pdfs"))
+FEE_PDF_MAX_BYTES = int(os.getenv("FEE_PDF_MAX_BYTES", 20 * 1024 * 1024))
+FEE_PDF_MAX_AGE = int(os.getenv("FEE_PDF_MAX_AGE", 300))
+# It is this deployment's own origin: Render sets RENDER_EXTERNAL_URL for
+# each service, elsewhere set PUBLIC_BASE_URL. FEE_PDF_MIRROR and the
+# snapshot export need it outside DEBUG.
+PUBLIC_BASE_URL = (
+    os.getenv("PUBLIC_BASE_URL") or os.getenv("RENDER_EXTERNAL_URL") or ("http://localhost:8000" if DEBUG else "")
+).rstrip("/")
+if FEE_PDF_MIRROR and not PUBLIC_BASE_URL:
+    raise ValueError("PUBLIC_BASE_URL environment variable is required with FEE_PDF_MIRROR")
+# /api/search/ (booklandapp/search.py): longest accepted ?q=.
+SEARCH_MAX_QUERY_LENGTH = int(os.getenv("SEARCH_MAX_QUERY_LENGTH", 200))
+# Static snapshot of the read API (booklandapp/snapshots.py), written by
+# `manage.py export_snapshot` and, with SNAPSHOT_AUTO, after admin edits.
+SNAPSHOT_ROOT = os.getenv("SNAPSHOT_ROOT", str(BASE_DIR / "snapshot_root"))
+SNAPSHOT_AUTO = os.getenv("SNAPSHOT_AUTO", "False").lower() == "true"
+SNAPSHOT_DEBOUNCE = float(os.getenv("SNAPSHOT_DEBOUNCE", 10))
+if SNAPSHOT_AUTO and not PUBLIC_BASE_URL:
+    raise ValueError("PUBLIC_BASE_URL environment variable is required with SNAPSHOT_AUTO")
+# Serve the snapshot at /snapshot/ through WhiteNoise. WhiteNoise indexes
+# files when the server starts, so pair this with an export in the build
+# command rather than with SNAPSHOT_AUTO.
+SNAPSHOT_SERVE = os.getenv("SNAPSHOT_SERVE", "False").lower() == "true"
+if SNAPSHOT_SERVE:
+    WHITENOISE_ROOT = SNAPSHOT_ROOT
+
 # =====================================================
 # CORS / CSRF
 # =====================================================
@@ -219,16 +388,30 @@ REST_FRAMEWORK = {
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
     ],
-    "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
-    ],
+    # One limit per client and scope, shared by all workers (booklandapp/throttling.py).
+    "DEFAULT_THROTTLE_CLASSES": ["booklandapp.throttling.SQLiteScopedRateThrottle"],
     "DEFAULT_THROTTLE_RATES": {
-        "anon": "1000/hour",
-        "user": "5000/hour",
+        # Views without a @throttle_scope.
+        "anon": os.getenv("THROTTLE_RATE_ANON", "1000/hour"),
+        "user": os.getenv("THROTTLE_RATE_USER", "5000/hour"),
+        # Cached read endpoints.
+        "read": os.getenv("THROTTLE_RATE_READ", "3000/hour"),
+        # Admission / contact form submissions.
+        "submit": os.getenv("THROTTLE_RATE_SUBMIT", "20/hour"),
     },
+    # Proxies in front of the app that append to X-Forwarded-For (Render's
+    # load balancer is one). Clients are identified by the address the last
+    # of them saw; anything a client puts in the header itself is ignored.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 1 if "RENDER" in os.environ else 0)),
 }
 
+# Where SQLiteScopedRateThrottle keeps its counters: "sqlite" (a file every
+# worker on the host shares) or "memory" (this process only).
+THROTTLE_STORE = os.getenv("THROTTLE_STORE", "sqlite").lower()
+THROTTLE_DB_PATH = os.getenv("THROTTLE_DB_PATH", str(BASE_DIR / "throttle.sqlite3"))
+# Seconds to wait for another worker's write before letting the request through.
+THROTTLE_DB_TIMEOUT = float(os.getenv("THROTTLE_DB_TIMEOUT", 0.1))
+
 if DEBUG:
     REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
         "rest_framework.renderers.BrowsableAPIRenderer"
@@ -253,11 +436,24 @@ LOGGING = {
     },
 }
 
+# =====================================================
+# REQUEST TIMING (Server-Timing header + "booklandapp" log lines)
+# =====================================================
+# Fraction of requests instrumented (0.0 - 1.0).
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "1.0" if DEBUG else "0.05"))
+# Requests slower than this (ms) are always logged as warnings.
+SERVER_TIMING_SLOW_MS = float(os.getenv("SERVER_TIMING_SLOW_MS", 1000))
+
 # =====================================================
 # SESSION / SECURITY (ADMIN AUTO LOGOUT)
 # =====================================================
 SESSION_COOKIE_AGE = 60 * 5        # 5 minutes inactivity
 SESSION_SAVE_EVERY_REQUEST = True  # reset timer on each request
+# booklandapp/sessions.py only writes an unchanged session back once this
+# fraction of SESSION_COOKIE_AGE has passed since its last write, so admin
+# browsing stops UPDATE-ing django_session on every page view.
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "booklandapp.sessions")
+SESSION_REFRESH_FRACTION = float(os.getenv("SESSION_REFRESH_FRACTION", 0.2))
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
 SESSION_COOKIE_HTTPONLY = True
@@ -265,11 +461,19 @@ SESSION_COOKIE_SAMESITE = "Lax"
 CSRF_COOKIE_HTTPONLY = True
 CSRF_COOKIE_SAMESITE = "Lax"
 
+# =====================================================
+# API COMPRESSION
+# =====================================================
+# JSON bodies shorter than this are sent uncompressed.
+API_COMPRESSION_MIN_LENGTH = int(os.getenv("API_COMPRESSION_MIN_LENGTH", 200))
+
 # =====================================================
 # UPLOAD LIMITS
 # =====================================================
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
+# The gallery bulk upload takes a whole event's photos in one request.
+DATA_UPLOAD_MAX_NUMBER_FILES = GALLERY_BULK_MAX_FILES
 
 # =====================================================
 # EMAIL
@@ -279,10 +483,30 @@ EMAIL_BACKEND = (
     if DEBUG
     else "django.core.mail.backends.smtp.EmailBackend"
 )
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "webmaster@localhost")
+
+# =====================================================
+# SUBMISSION QUEUE (admission / contact forms)
+# =====================================================
+# When on, the form APIs only queue submissions (202 instead of 201) and
+# `python manage.py process_submissions --loop` saves them and sends
+# the notification emails. Off by default: nothing is deployed to run that
+# worker, so only enable it together with one.
+SUBMISSION_QUEUE_ENABLED = os.getenv("SUBMISSION_QUEUE_ENABLED", "False").lower() == "true"
+# Comma-separated; no notification emails when empty.
+SUBMISSION_NOTIFY_EMAILS = [
+    address.strip() for address in os.getenv("SUBMISSION_NOTIFY_EMAILS", "").split(",") if address.strip()
+]
+SUBMISSION_NOTIFY_MAX_ATTEMPTS = int(os.getenv("SUBMISSION_NOTIFY_MAX_ATTEMPTS", 6))
+# Items accepted by one /api/admissions/submit/bulk/ or /api/contact/submit/bulk/ call.
+BULK_SUBMISSION_MAX_ITEMS = int(os.getenv("BULK_SUBMISSION_MAX_ITEMS", 5000))
 
 # =====================================================
 # RENDER SPECIFIC
 # =====================================================
 RENDER_HEALTH_CHECK_URL = "/health/"
 if "RENDER" in os.environ:
-    MIDDLEWARE.insert(2, "whitenoise.middleware.WhiteNoiseMiddleware")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "booklandapp.middleware.WhiteNoiseMiddleware",
+    )
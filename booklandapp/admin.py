@@ -1,5 +1,19 @@
-from django.contrib import admin
+import os
+import uuid
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models.functions import Substr
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.functional import cached_property
 from django.utils.html import format_html
+from django.views.decorators.csrf import csrf_exempt
 
 from .models import (
     AdmissionMessage,
@@ -12,6 +26,10 @@ from .models import (
     FeaturedEvent,
     GalleryImage,
     KeyAdmissionDeadline,
+    PendingSubmission,
+    ImageAsset,
+    ImageModel,
+    ImageUpload,
 )
 from .forms import (
     TestimonialsMessageForm,
@@ -20,6 +38,16 @@ from .forms import (
     FeaturedEventForm,
     GalleryImageForm,
     FeeStructureForm,
+    GalleryBulkUploadForm,
+)
+from .images import smallest_variant
+from .uploads import (
+    StagingError,
+    queue_uploads,
+    remove_staged,
+    stage_image,
+    stage_zip_images,
+    submit_background,
 )
 
 
@@ -27,7 +55,10 @@ from .forms import (
 # Utility to display Cloudinary image previews
 # =====================================================
 def cloudinary_image_preview(obj, field_name="image"):
-    url = getattr(obj, field_name, None)
+    if getattr(obj, "image_status", ImageModel.IMAGE_READY) != ImageModel.IMAGE_READY:
+        return obj.get_image_status_display()
+    # A 2x-density copy of the 100px thumbnail is plenty.
+    url = smallest_variant(getattr(obj, "image_variants", None), 200) or getattr(obj, field_name, None)
     if url:
         return format_html(
             '<img src="{}" width="100" height="100" style="object-fit: cover; border-radius: 4px;" />',
@@ -49,31 +80,135 @@ class ImagePreviewAdminMixin(admin.ModelAdmin):
         return cloudinary_image_preview(obj)
 
 
+# =====================================================
+# Changelists for large tables
+# =====================================================
+class EstimatedCountPaginator(Paginator):
+    """
+    On PostgreSQL, take the row count of an unfiltered changelist from the
+    planner's statistics instead of a COUNT(*) over the whole table, once
+    the table is big enough for that to matter. Filtered and searched
+    changelists, and other databases, are counted exactly.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is not None and not query.where and connections[queryset.db].vendor == "postgresql":
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+
+def estimated_row_count(model, using):
+    """pg_class.reltuples for the model's table; -1 if never analyzed."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else -1
+
+
+class PreviewChangeList(ChangeList):
+    """
+    Fetches the page of results with each of the admin's ``preview_fields``
+    cut to ``preview_chars`` + 1 characters by the database, and the full text
+    deferred. Actions still get the plain queryset.
+    """
+
+    def get_results(self, request):
+        queryset = self.queryset
+        self.queryset = self.model_admin.with_previews(queryset)
+        try:
+            super().get_results(request)
+        finally:
+            self.queryset = queryset
+
+
+def text_preview(field_name, description=None):
+    """
+    A list_display column showing the start of the text field
+    ``field_name``; the admin lists the field in ``preview_fields``.
+    """
+    def preview(self, obj):
+        attname = f"{field_name}_preview"
+        # Outside PreviewChangeList there is only the field itself.
+        text = getattr(obj, attname) if hasattr(obj, attname) else getattr(obj, field_name)
+        text = text or ""
+        if len(text) > self.preview_chars:
+            return text[:self.preview_chars].rstrip() + "…"
+        return text
+
+    preview.short_description = description or field_name.replace("_", " ").capitalize()
+    preview.admin_order_field = field_name
+    return preview
+
+
+class TextPreviewAdmin(admin.ModelAdmin):
+    """Shows the long text columns in ``preview_fields`` as previews."""
+    preview_fields = ()
+    preview_chars = 80
+
+    def get_changelist(self, request, **kwargs):
+        return PreviewChangeList
+
+    def with_previews(self, queryset):
+        if not self.preview_fields:
+            return queryset
+        previews = {
+            f"{name}_preview": Substr(name, 1, self.preview_chars + 1) for name in self.preview_fields
+        }
+        return queryset.annotate(**previews).defer(*self.preview_fields)
+
+
+class LargeTableAdmin(TextPreviewAdmin):
+    """
+    Admin for tables that grow without bound (form submissions, queues):
+    smaller pages, no second COUNT(*) for the "n total" link and estimated
+    counts on Postgres.
+    """
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
 # =====================================================
 # Testimonials Admin
 # =====================================================
 @admin.register(TestimonialsMessage)
-class TestimonialsMessageAdmin(ImagePreviewAdminMixin):
+class TestimonialsMessageAdmin(TextPreviewAdmin, ImagePreviewAdminMixin):
     form = TestimonialsMessageForm
-    list_display = ("name", "title", "testimonial", "image_preview")
+    list_display = ("name", "title", "testimonial_preview", "image_preview")
+    preview_fields = ("testimonial",)
+    testimonial_preview = text_preview("testimonial")
 
 
 # =====================================================
 # Leadership Admin
 # =====================================================
 @admin.register(LeadershipMessage)
-class LeadershipMessageAdmin(ImagePreviewAdminMixin):
+class LeadershipMessageAdmin(TextPreviewAdmin, ImagePreviewAdminMixin):
     form = LeadershipMessageForm
-    list_display = ("salutation", "name", "designation", "message", "image_preview")
+    list_display = ("salutation", "name", "designation", "message_preview", "image_preview")
+    preview_fields = ("message",)
+    message_preview = text_preview("message")
 
 
 # =====================================================
 # Alumni Admin
 # =====================================================
 @admin.register(AlumniMessage)
-class AlumniMessageAdmin(ImagePreviewAdminMixin):
+class AlumniMessageAdmin(TextPreviewAdmin, ImagePreviewAdminMixin):
     form = AlumniMessageForm
-    list_display = ("name", "title", "year_of_completion", "message", "image_preview")
+    list_display = ("name", "title", "year_of_completion", "message_preview", "image_preview")
+    preview_fields = ("message",)
+    message_preview = text_preview("message")
 
 
 # =====================================================
@@ -83,6 +218,111 @@ class AlumniMessageAdmin(ImagePreviewAdminMixin):
 class GalleryImageAdmin(ImagePreviewAdminMixin):
     form = GalleryImageForm
     list_display = ("title", "image_preview")
+    change_list_template = "admin/booklandapp/galleryimage/change_list.html"
+
+    def get_urls(self):
+        return [
+            # csrf_exempt only defers the check: admin_view() applies
+            # csrf_protect after the upload handlers are swapped.
+            path("bulk-upload/", csrf_exempt(self.bulk_upload_entry), name="booklandapp_galleryimage_bulk_upload"),
+            path(
+                "bulk-upload/<uuid:batch>/",
+                self.admin_site.admin_view(self.bulk_upload_progress),
+                name="booklandapp_galleryimage_bulk_progress",
+            ),
+        ] + super().get_urls()
+
+    def bulk_upload_entry(self, request):
+        # Stream every file to a temporary file instead of holding it in RAM.
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return self.admin_site.admin_view(self.bulk_upload_view)(request)
+
+    def bulk_upload_view(self, request):
+        """
+        Stage many images (or zips of images) at once, create their rows with
+        bulk_create and hand them to the background upload pool.
+        """
+        if not self.has_add_permission(request):
+            return redirect("admin:booklandapp_galleryimage_changelist")
+        form = GalleryBulkUploadForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            staged, errors = self.stage_bulk_files(form.cleaned_data["files"])
+            if staged:
+                batch = uuid.uuid4()
+                title = form.cleaned_data["title"]
+                with transaction.atomic():
+                    images = GalleryImage.objects.bulk_create([
+                        GalleryImage(
+                            title=title or os.path.splitext(name)[0][:255],
+                            image_status=GalleryImage.IMAGE_PENDING,
+                        )
+                        for name, _ in staged
+                    ])
+                    queue_uploads(
+                        [(image, path) for image, (_, path) in zip(images, staged)],
+                        GalleryImageForm.upload_folder, batch=batch,
+                    )
+                for error in errors:
+                    messages.warning(request, error)
+                url = reverse("admin:booklandapp_galleryimage_bulk_progress", args=[batch])
+                return redirect(f"{url}?total={len(staged)}")
+            for error in errors:
+                form.add_error("files", error)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Bulk upload gallery images",
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/booklandapp/galleryimage/bulk_upload.html", context)
+
+    def stage_bulk_files(self, files):
+        """Returns ``([(name, staged path)], [error message])``."""
+        max_files = settings.GALLERY_BULK_MAX_FILES
+        staged, errors = [], []
+        try:
+            for uploaded in files:
+                if os.path.splitext(uploaded.name)[1].lower() == ".zip":
+                    members = stage_zip_images(
+                        uploaded, max_files - len(staged), settings.GALLERY_BULK_MAX_ZIP_BYTES
+                    )
+                    for name, staged_path, error in members:
+                        if error:
+                            errors.append(f"{uploaded.name}/{name}: {error}")
+                        else:
+                            staged.append((name, staged_path))
+                    continue
+                if len(staged) >= max_files:
+                    raise StagingError(f"At most {max_files} images per upload.")
+                try:
+                    staged.append((uploaded.name, stage_image(uploaded)))
+                except StagingError as exc:
+                    errors.append(f"{uploaded.name}: {exc}")
+        except StagingError as exc:
+            for _, staged_path in staged:
+                remove_staged(staged_path)
+            return [], [str(exc)]
+        return staged, errors
+
+    def bulk_upload_progress(self, request, batch):
+        queued = ImageUpload.objects.filter(batch=batch)
+        remaining = queued.filter(status=ImageUpload.STATUS_QUEUED).count()
+        failed = queued.filter(status=ImageUpload.STATUS_FAILED).count()
+        try:
+            total = max(int(request.GET.get("total", 0)), remaining + failed)
+        except ValueError:
+            total = remaining + failed
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Gallery upload progress",
+            "total": total,
+            "uploaded": total - remaining - failed,
+            "remaining": remaining,
+            "failed": failed,
+        }
+        return TemplateResponse(request, "admin/booklandapp/galleryimage/bulk_progress.html", context)
 
 
 # =====================================================
@@ -100,7 +340,7 @@ class FeaturedEventAdmin(ImagePreviewAdminMixin):
 @admin.register(FeeStructure)
 class FeeStructureAdmin(admin.ModelAdmin):
     list_display = ("level", "tuition_per_term", "meals_fee", "transport_fee", "total_fee", "download_link")
-    readonly_fields = ("download_link",)
+    readonly_fields = ("download_link", "pdf_sha256", "pdf_size")
     search_fields = ("level",)
     list_filter = ("level",)
 
@@ -109,7 +349,7 @@ class FeeStructureAdmin(admin.ModelAdmin):
             "fields": ("level", "tuition_per_term", "meals_fee", "transport_fee", "total_fee")
         }),
         ("PDF Document", {
-            "fields": ("fee_structure_file", "download_link"),
+            "fields": ("fee_structure_file", "download_link", "pdf_sha256", "pdf_size"),
             "description": "Upload PDF file (public). All PDFs will be publicly accessible."
         }),
     )
@@ -125,10 +365,71 @@ class FeeStructureAdmin(admin.ModelAdmin):
     download_link.short_description = "PDF Download"
 
 
+# =====================================================
+# Submission queue (filled by the form APIs, drained by process_submissions)
+# =====================================================
+@admin.register(PendingSubmission)
+class PendingSubmissionAdmin(LargeTableAdmin):
+    list_display = ("id", "kind", "status", "attempts", "next_attempt_at", "created_at", "last_error_preview")
+    list_filter = ("kind", "status")
+    readonly_fields = ("kind", "payload", "record_id", "created_at")
+    preview_fields = ("last_error",)
+    last_error_preview = text_preview("last_error")
+
+
+# =====================================================
+# Image upload queue (filled by the image forms, see booklandapp/uploads.py)
+# =====================================================
+@admin.register(ImageUpload)
+class ImageUploadAdmin(LargeTableAdmin):
+    list_display = ("id", "content_type", "object_id", "status", "attempts", "next_attempt_at", "last_error_preview")
+    list_filter = ("status", "content_type")
+    readonly_fields = ("content_type", "object_id", "folder", "staged_path", "created_at")
+    preview_fields = ("last_error",)
+    last_error_preview = text_preview("last_error")
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected uploads now")
+    def retry_now(self, request, queryset):
+        pks = list(queryset.values_list("pk", flat=True))
+        # A failed upload has used up its attempts; give it a fresh set.
+        queryset.update(status=ImageUpload.STATUS_QUEUED, next_attempt_at=None, attempts=0, last_error="")
+        if settings.IMAGE_UPLOAD_IN_PROCESS:
+            transaction.on_commit(lambda: [submit_background(pk) for pk in pks])
+        self.message_user(request, f"{len(pks)} upload(s) queued again.")
+
+
+@admin.register(ImageAsset)
+class ImageAssetAdmin(admin.ModelAdmin):
+    list_display = ("id", "public_id", "width", "height", "orientation", "format", "bytes", "created_at")
+    list_filter = ("orientation", "format")
+    search_fields = ("public_id", "url")
+    readonly_fields = ("url", "public_id", "width", "height", "bytes", "format", "orientation", "created_at")
+
+
+# =====================================================
+# Form submissions (name/email search is indexed, migration 0033)
+# =====================================================
+@admin.register(AdmissionMessage)
+class AdmissionMessageAdmin(LargeTableAdmin):
+    ordering = ("-id",)
+    list_display = ("name", "email", "phone", "message_preview")
+    search_fields = ("name", "email")
+    preview_fields = ("message",)
+    message_preview = text_preview("message")
+
+
+@admin.register(EnquiryMessages)
+class EnquiryMessagesAdmin(LargeTableAdmin):
+    ordering = ("-id",)
+    list_display = ("name", "email", "subject", "message_preview")
+    search_fields = ("name", "email")
+    preview_fields = ("message",)
+    message_preview = text_preview("message")
+
+
 # =====================================================
 # Standard models (no images or PDFs, default admin)
 # =====================================================
-admin.site.register(AdmissionMessage)
-admin.site.register(EnquiryMessages)
 admin.site.register(Event)
 admin.site.register(KeyAdmissionDeadline)
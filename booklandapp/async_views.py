@@ -0,0 +1,200 @@
+"""
+Native async versions of the read endpoints, for ASGI deployments.
+
+With ASYNC_READ_VIEWS on, booklandapp/urls.py serves the endpoints below
+with these coroutines instead of the DRF views in views.py. They share the
+filters, paginators and values serializers with those views and return the
+same bytes (and the same API cache entries), but fetch rows with the async
+ORM and run on the event loop, so a worker can hold many slow clients
+without a thread per request.
+
+Django still runs each query on a worker thread, because its async ORM wraps
+the sync database drivers: the gain is in concurrency, not in the cost of a
+single request. DRF has no async views, so ``async_api_view`` does the parts
+of ``@api_view`` these endpoints rely on: throttling, JSON error responses
+and the Allow/Vary headers. Any method other than GET is handed to the DRF
+view (405s, OPTIONS). Responses are always JSON; the browsable API needs
+the sync views.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseBase
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import APIException, Throttled
+
+from . import search, views
+from .cache import acache_api_response
+from .fast_serializers import (
+    AlumniMessageValuesSerializer,
+    EventValuesSerializer,
+    FeaturedEventValuesSerializer,
+    GalleryImageValuesSerializer,
+    KeyAdmissionDeadlineValuesSerializer,
+    LeadershipMessageValuesSerializer,
+    TestimonialsMessageValuesSerializer,
+    render_json,
+)
+from .models import (
+    AlumniMessage,
+    Event,
+    FeaturedEvent,
+    FeeStructure,
+    GalleryImage,
+    KeyAdmissionDeadline,
+    LeadershipMessage,
+    TestimonialsMessage,
+)
+from .pagination import RankedPagination
+from .serializers import FeeStructureSerializer
+
+
+# =====================================================
+# DRF stand-ins
+# =====================================================
+def json_response(data, status=200):
+    return HttpResponse(render_json(data), status=status, content_type="application/json")
+
+
+def error_response(exc):
+    """The response DRF's default exception handler gives ``exc``."""
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+    response = json_response(data, status=exc.status_code)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = "%d" % exc.wait
+    return response
+
+
+def check_throttles(request, view):
+    """APIView.check_throttles() for a plain Django request."""
+    durations = [throttle.wait() for throttle in view.get_throttles() if not throttle.allow_request(request, view)]
+    if durations:
+        raise Throttled(wait=max((duration for duration in durations if duration is not None), default=None))
+
+
+def async_api_view(sync_view):
+    """
+    Serve GET with the decorated coroutine and every other method with
+    ``sync_view``, the DRF view for the same URL. The coroutine returns the
+    data to render or a finished response.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapped(request, *args, **kwargs):
+            if request.method != "GET":
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            view = sync_view.cls()
+            try:
+                # Resolve the session's user here; the throttle store itself
+                # is a local SQLite file, quick enough for the event loop.
+                request.user = await request.auser()
+                check_throttles(request, view)
+                response = await view_func(request, *args, **kwargs)
+            except APIException as exc:
+                response = error_response(exc)
+            if not isinstance(response, HttpResponseBase):
+                response = json_response(response)
+            response["Allow"] = ", ".join(view.allowed_methods)
+            patch_vary_headers(response, ("Accept",))
+            return response
+
+        # The DRF view is what snapshots.py renders and inspects.
+        wrapped.sync_view = sync_view
+        # As for every DRF view; the POSTs it handles do their own checks.
+        wrapped.csrf_exempt = True
+        return wrapped
+
+    return decorator
+
+
+async def paginated_or_full(request, queryset, serializer_class, paginator):
+    """views.paginated_or_full() returning data instead of a Response."""
+    page = paginator.paginate_queryset(queryset, request)
+    if page is None:
+        return await serializer_class(queryset).adata()
+    serializer = serializer_class(page)
+    data = await serializer.adata()
+    return paginator.get_paginated_data(data, serializer.rows)
+
+
+# =====================================================
+# Read-only APIs
+# =====================================================
+@async_api_view(views.api_testimonials)
+@acache_api_response(TestimonialsMessage)
+async def api_testimonials(request):
+    queryset = views.filter_orientation(request, TestimonialsMessage.objects.all())
+    return await paginated_or_full(request, queryset, TestimonialsMessageValuesSerializer, views.id_pagination())
+
+
+@async_api_view(views.api_leadership)
+@acache_api_response(LeadershipMessage)
+async def api_leadership(request):
+    queryset = views.filter_orientation(request, LeadershipMessage.objects.all())
+    return await LeadershipMessageValuesSerializer(queryset).adata()
+
+
+@async_api_view(views.api_gallery)
+@acache_api_response(GalleryImage)
+async def api_gallery(request):
+    queryset = views.filter_orientation(request, GalleryImage.objects.all())
+    return await paginated_or_full(request, queryset, GalleryImageValuesSerializer, views.id_pagination())
+
+
+@async_api_view(views.api_fees)
+@acache_api_response(FeeStructure)
+async def api_fees(request):
+    fees = [fee async for fee in FeeStructure.objects.all().order_by("level")]
+    # file_url is computed from columns and settings, so this does no I/O.
+    return FeeStructureSerializer(fees, many=True).data
+
+
+# =====================================================
+# Events APIs
+# =====================================================
+@async_api_view(views.api_events)
+@acache_api_response(Event, vary=views.events_vary)
+async def api_events(request):
+    queryset = views.filter_events(request, Event.objects.all())
+    paginator = views.event_pagination()
+    if paginator.is_requested(request):
+        return await paginated_or_full(request, queryset, EventValuesSerializer, paginator)
+
+    queryset = queryset.order_by(*views.EVENT_ORDERING)
+    return await EventValuesSerializer(queryset).adata()
+
+
+@async_api_view(views.api_featured_events)
+@acache_api_response(FeaturedEvent)
+async def api_featured_events(request):
+    queryset = views.filter_orientation(request, FeaturedEvent.objects.all())
+    return await FeaturedEventValuesSerializer(queryset).adata()
+
+
+@async_api_view(views.api_alumni)
+@acache_api_response(AlumniMessage)
+async def api_alumni(request):
+    queryset = views.filter_orientation(request, AlumniMessage.objects.all())
+    return await paginated_or_full(request, queryset, AlumniMessageValuesSerializer, views.id_pagination())
+
+
+@async_api_view(views.api_admission_deadlines)
+@acache_api_response(KeyAdmissionDeadline)
+async def api_admission_deadlines(request):
+    queryset = KeyAdmissionDeadline.objects.all().order_by("deadline_date")
+    return await KeyAdmissionDeadlineValuesSerializer(queryset).adata()
+
+
+# =====================================================
+# Search
+# =====================================================
+@async_api_view(views.api_search)
+@acache_api_response(*search.KIND_FOR_MODEL)
+async def api_search(request):
+    query, kinds = views.search_params(request)
+    paginator = RankedPagination()
+    offset, limit = paginator.get_window(request)
+    # Raw SQL through a cursor: there is no async API for it.
+    hits = await sync_to_async(search.search)(query, kinds, offset, limit + 1)
+    return paginator.get_paginated_data(hits)
@@ -0,0 +1,419 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Everything here writes to whatever database is active, so the commands
+always switch to a throwaway test database first (see ``test_database``).
+"""
+import datetime
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from .models import (
+    TestimonialsMessage,
+    LeadershipMessage,
+    GalleryImage,
+    FeeStructure,
+    Event,
+    AlumniMessage,
+    FeaturedEvent,
+    KeyAdmissionDeadline,
+)
+from .search import rebuild_index
+
+# Non-ASCII and U+2028 make sure both renderers escape text the same way.
+SAMPLE_TEXT = (
+    "Our learners took part in the county music festival — café "
+    "talks, \"quoted\" speeches and a line\u2028separator. "
+)
+SAMPLE_IMAGE = "https://res.cloudinary.com/demo/image/upload/v1/bookland/gallery/sample-{}.jpg"
+
+
+@contextmanager
+def test_database(sqlite_file=None):
+    """
+    Run the block against a freshly migrated test database, with the test
+    environment (locmem email, "testserver" host) set up.
+
+    ``sqlite_file`` puts an SQLite test database in a file instead of memory
+    so another process, such as a local gunicorn, can open it too. The
+    throttles get a throwaway store and trust X-Forwarded-For, so that
+    fake_client_ip() addresses count as distinct clients; the replica pin
+    gets a throwaway file.
+    """
+    setup_test_environment()
+    state_dir = tempfile.mkdtemp(prefix="bookland-state-")
+    throttle_settings = override_settings(
+        THROTTLE_DB_PATH=os.path.join(state_dir, "throttle.sqlite3"),
+        DATABASE_REPLICA_PIN_PATH=os.path.join(state_dir, "replica_pin"),
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1},
+    )
+    throttle_settings.enable()
+    if sqlite_file and connection.vendor == "sqlite":
+        connection.settings_dict["TEST"]["NAME"] = sqlite_file
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    # Test mirrors (the read replica) point at the same test database.
+    mirrors = {}
+    for alias in connections:
+        mirror_of = connections[alias].settings_dict.get("TEST", {}).get("MIRROR")
+        if alias != DEFAULT_DB_ALIAS and mirror_of == DEFAULT_DB_ALIAS:
+            mirrors[alias] = connections[alias].settings_dict
+            connections[alias].close()
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield
+    finally:
+        for alias, settings_dict in mirrors.items():
+            connections[alias].close()
+            connections[alias].settings_dict = settings_dict
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        throttle_settings.disable()
+        teardown_test_environment()
+
+
+def database_url():
+    """DATABASE_URL pointing at the active (test) database, for child processes."""
+    db = connection.settings_dict
+    if connection.vendor == "sqlite":
+        return f"sqlite:///{db['NAME']}"
+    if connection.vendor == "postgresql":
+        credentials = quote(db["USER"] or "", safe="")
+        if db["PASSWORD"]:
+            credentials += ":" + quote(db["PASSWORD"], safe="")
+        return f"postgres://{credentials}@{db['HOST'] or 'localhost'}:{db['PORT'] or 5432}/{db['NAME']}"
+    raise ValueError(f"Unsupported database vendor for a child process: {connection.vendor}")
+
+
+def text(rng, sentences=3):
+    return SAMPLE_TEXT * rng.randint(1, sentences)
+
+
+def image(rng, i):
+    return SAMPLE_IMAGE.format(i) if rng.random() > 0.1 else None
+
+
+def seed_testimonials(rng, count):
+    TestimonialsMessage.objects.bulk_create(
+        [
+            TestimonialsMessage(name=f"Parent {i}", title="Parent", testimonial=text(rng, 6), image=image(rng, i))
+            for i in range(count)
+        ],
+        batch_size=500,
+    )
+
+
+def seed_leadership(rng, count):
+    LeadershipMessage.objects.bulk_create(
+        [
+            LeadershipMessage(
+                salutation="Mrs.", name=f"Leader {i}", designation="Principal",
+                message=text(rng, 8), image=image(rng, i),
+            )
+            for i in range(count)
+        ],
+        batch_size=500,
+    )
+
+
+def seed_gallery(rng, count):
+    GalleryImage.objects.bulk_create(
+        [GalleryImage(title=f"Sports day {i}", image=image(rng, i)) for i in range(count)],
+        batch_size=500,
+    )
+
+
+def seed_events(rng, count):
+    events = []
+    for i in range(count):
+        event = Event(
+            title=f"Event {i}",
+            category=rng.choice(Event.CATEGORY_CHOICES)[0],
+            month=rng.choice(Event.MONTH_CHOICES)[0],
+            day=rng.randint(1, 28),
+            year=rng.randint(2018, 2027),
+            start_time=datetime.time(rng.randint(7, 11), rng.choice((0, 15, 30, 45))),
+            end_time=datetime.time(rng.randint(12, 17), rng.choice((0, 30))),
+            location="Main Hall",
+            description=text(rng, 4),
+        )
+        # bulk_create skips save(), which normally fills event_date.
+        event.event_date = event.build_event_date()
+        events.append(event)
+    Event.objects.bulk_create(events, batch_size=500)
+
+
+def seed_featured_events(rng, count):
+    start = datetime.date(2025, 1, 1)
+    featured = []
+    for i in range(count):
+        start_date = start + datetime.timedelta(days=rng.randint(0, 700))
+        end_date = start_date + datetime.timedelta(days=rng.randint(1, 3)) if i % 2 else None
+        featured.append(FeaturedEvent(
+            title=f"Featured {i}", start_date=start_date, end_date=end_date,
+            image=image(rng, i), description=text(rng, 4),
+        ))
+    FeaturedEvent.objects.bulk_create(featured, batch_size=500)
+
+
+def seed_alumni(rng, count):
+    AlumniMessage.objects.bulk_create(
+        [
+            AlumniMessage(
+                name=f"Alumnus {i}", title="Engineer", year_of_completion=rng.randint(2014, 2025),
+                message=text(rng, 6), image=image(rng, i),
+            )
+            for i in range(count)
+        ],
+        batch_size=500,
+    )
+
+
+def seed_admission_deadlines(rng, count):
+    # name is unique and limited to the semester choices.
+    choices = KeyAdmissionDeadline.SEMESTER_CHOICES[:count]
+    KeyAdmissionDeadline.objects.bulk_create([
+        KeyAdmissionDeadline(name=name, deadline_date=datetime.date(2026, 1, 10) + datetime.timedelta(days=60 * i))
+        for i, (name, _) in enumerate(choices)
+    ])
+
+
+def seed_fees(rng, count):
+    # level is unique and limited to the level choices.
+    FeeStructure.objects.bulk_create([
+        FeeStructure(
+            level=level,
+            tuition_per_term=Decimal("25000.00") + i * 5000,
+            meals_fee=Decimal("6000.00"),
+            transport_fee=Decimal("4500.50"),
+            total_fee=Decimal("35500.50") + i * 5000,
+        )
+        for i, (level, _) in enumerate(FeeStructure.LEVEL_CHOICES[:count])
+    ])
+
+
+SEEDERS = {
+    TestimonialsMessage: seed_testimonials,
+    LeadershipMessage: seed_leadership,
+    GalleryImage: seed_gallery,
+    Event: seed_events,
+    FeaturedEvent: seed_featured_events,
+    AlumniMessage: seed_alumni,
+    KeyAdmissionDeadline: seed_admission_deadlines,
+    FeeStructure: seed_fees,
+}
+
+
+def seed(model, count, seed_value=0):
+    """Replace every row of ``model`` with ``count`` generated rows."""
+    model.objects.all().delete()
+    SEEDERS[model](random.Random(seed_value), count)
+
+
+def seed_all(count, seed_value=0):
+    for model in SEEDERS:
+        seed(model, count, seed_value)
+    # bulk_create skips the signals that keep the search index current.
+    rebuild_index()
+
+
+def best_of(func, repeat):
+    """Run ``func`` ``repeat`` times and return the fastest wall time in ms."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+class QueryCounter:
+    """
+    ``connection.execute_wrapper`` hook that counts queries. Unlike
+    CaptureQueriesContext it does not rely on the size-capped queries_log.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies_ms, elapsed_s):
+    return {
+        "requests": len(latencies_ms),
+        "throughput_rps": round(len(latencies_ms) / elapsed_s, 1) if elapsed_s else None,
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+    }
+
+
+def fake_client_ip(i):
+    """
+    A distinct X-Forwarded-For per request, so the benchmark measures the
+    throttles without tripping them.
+    """
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+# =====================================================
+# Local server
+# =====================================================
+def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Nothing listening on {host}:{port} after {timeout}s")
+
+
+@contextmanager
+def local_server(port, workers=2, worker_class="sync"):
+    """
+    Run gunicorn on the active test database and yield its base URL.
+
+    ``worker_class`` is passed to gunicorn's ``-k``; the application is the
+    WSGI one for "sync"/"gthread" and the ASGI one, with ASYNC_READ_VIEWS
+    on, otherwise (e.g. "uvicorn_worker.UvicornWorker").
+    """
+    asgi = worker_class not in ("sync", "gthread")
+    application = "BooklandSchools.asgi:application" if asgi else "BooklandSchools.wsgi:application"
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url(),
+        "DATABASE_SSL_REQUIRE": "False",
+        "ASYNC_READ_VIEWS": str(asgi),
+        # The throttle and replica pin setup of test_database().
+        "NUM_PROXIES": "1",
+        "THROTTLE_DB_PATH": settings.THROTTLE_DB_PATH,
+        "DATABASE_REPLICA_PIN_PATH": settings.DATABASE_REPLICA_PIN_PATH,
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", application,
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--worker-class", worker_class,
+            "--log-level", "warning",
+        ],
+        cwd=settings.BASE_DIR,
+        env=env,
+    )
+    try:
+        wait_for_port("127.0.0.1", port)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def http_load(base_url, method, path, body=None, total=200, concurrency=8):
+    """
+    Send ``total`` requests with ``concurrency`` client threads, one
+    connection per request. Returns ``(latencies_ms, elapsed_s, statuses)``;
+    a status is None when the request failed at the socket level.
+    """
+    target = urlsplit(base_url)
+    payload = body.encode() if isinstance(body, str) else body
+
+    def send(i):
+        headers = {
+            "X-Forwarded-For": fake_client_ip(i),
+            # Keeps SECURE_SSL_REDIRECT from bouncing plain HTTP when DEBUG is off.
+            "X-Forwarded-Proto": "https",
+            "Accept-Encoding": "br, gzip",
+            "Content-Type": "application/json",
+        }
+        conn = http.client.HTTPConnection(target.hostname, target.port, timeout=60)
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except OSError:
+            status = None
+        finally:
+            conn.close()
+        return (time.perf_counter() - started) * 1000, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(send, range(total)))
+    elapsed = time.perf_counter() - started
+    return [latency for latency, _ in outcomes], elapsed, [status for _, status in outcomes]
+
+
+@contextmanager
+def slow_clients(base_url, count, path, hold=5.0):
+    """
+    Keep ``count`` connections open the way slow mobile clients do while the
+    block runs: each one trickles its request headers out over ``hold``
+    seconds, reads the response and starts again. A sync worker is tied up
+    for the whole time; an event loop is not.
+    """
+    if not count:
+        yield
+        return
+    target = urlsplit(base_url)
+    stop = threading.Event()
+
+    def trickle():
+        while not stop.is_set():
+            try:
+                with socket.create_connection((target.hostname, target.port), timeout=60) as sock:
+                    sock.sendall(f"GET {path} HTTP/1.1\r\nHost: {target.netloc}\r\n".encode())
+                    deadline = time.monotonic() + hold
+                    line = 0
+                    while time.monotonic() < deadline and not stop.is_set():
+                        sock.sendall(f"X-Slow-{line}: 1\r\n".encode())
+                        line += 1
+                        stop.wait(0.5)
+                    sock.sendall(b"X-Forwarded-Proto: https\r\nConnection: close\r\n\r\n")
+                    while sock.recv(65536):
+                        pass
+            except OSError:
+                stop.wait(0.5)
+
+    threads = [threading.Thread(target=trickle, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    # Let them all get a connection in before the timed requests start.
+    time.sleep(1)
+    try:
+        yield
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
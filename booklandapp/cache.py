@@ -0,0 +1,275 @@
+"""
+Server-side response cache for the read-only API.
+
+Rendered JSON bodies are stored in the "api" cache alias, keyed by endpoint,
+query string and a version token for every model the endpoint reads. The
+receivers in signals.py replace a model's token whenever a row is saved or
+deleted, so stale bodies are simply never looked up again and age out of the
+backend on their own.
+
+Every response also carries an ETag derived from the models' row count and
+latest ``updated_at``, so conditional requests are answered with 304 before
+the serializer runs. The ETag is weak because it names a content version,
+not the exact bytes. There is no Last-Modified: the latest ``updated_at``
+stays put or goes back when rows are deleted, so If-Modified-Since alone
+would get a stale 304.
+
+Brotli/gzip variants of a body are compressed on first demand and stored in
+the same entry, so each content version is compressed once per encoding.
+
+``acache_api_response`` does the same for the async views in
+async_views.py, through the cache's and the ORM's async APIs.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from .compression import choose_encoding, compress, min_length
+from .fast_serializers import render_json
+from .instrumentation import timed
+
+API_CACHE_ALIAS = "api"
+
+
+def get_api_cache():
+    return caches[API_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return f"api:version:{model._meta.label_lower}"
+
+
+def get_model_versions(models):
+    """
+    Return the current version token of each model, creating missing ones.
+
+    Tokens are random rather than counters so that an evicted version key can
+    never come back with a value that matches an old cached body.
+    """
+    cache = get_api_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def aget_model_versions(models):
+    keys = [_version_key(model) for model in models]
+    versions = await _acall("get_many", keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        await _acall("set_many", missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_model(model):
+    """Drop every cached response that depends on ``model``."""
+    get_api_cache().set(_version_key(model), uuid.uuid4().hex, timeout=None)
+
+
+def _canonical_query(query_params):
+    return "&".join(
+        f"{key}={value}"
+        for key, values in sorted(query_params.lists())
+        for value in values
+    )
+
+
+def build_cache_key(name, query_params, models, extra=""):
+    return _response_key(name, query_params, extra, get_model_versions(models))
+
+
+def _response_key(name, query_params, extra, versions):
+    parts = [name, _canonical_query(query_params), extra, *versions]
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()
+    return f"api:response:{name}:{digest}"
+
+
+def get_content_etag(name, query_params, models, extra=""):
+    """
+    Return the ETag of an endpoint without serializing it.
+
+    One aggregate query per model: the row count catches deletes, the latest
+    ``updated_at`` catches inserts and edits.
+    """
+    stats = [model.objects.aggregate(**_content_stats()) for model in models]
+    return _etag(name, query_params, models, extra, stats)
+
+
+def _content_stats():
+    return {"count": Count("pk"), "latest": Max("updated_at")}
+
+
+def _etag(name, query_params, models, extra, stats_per_model):
+    parts = [name, _canonical_query(query_params), extra]
+    for model, stats in zip(models, stats_per_model):
+        parts.append(f"{model._meta.label_lower}:{stats['count']}:{stats['latest']}")
+    return "W/" + quote_etag(hashlib.sha256("|".join(parts).encode()).hexdigest()[:32])
+
+
+def set_validators(response, entry):
+    response["ETag"] = entry["etag"]
+    # Let browsers and the CDN keep a copy but revalidate it every time.
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def get_cached_entry(name, query_params, models, extra=""):
+    """
+    Return ``(key, entry)`` for an endpoint.
+
+    ``entry`` always holds the ``etag``; it also holds the
+    rendered ``body`` on a cache hit. On a miss, fill it in with store_entry().
+    """
+    key = build_cache_key(name, query_params, models, extra)
+    with timed("cache"):
+        entry = get_api_cache().get(key)
+    if entry is None:
+        entry = {"etag": get_content_etag(name, query_params, models, extra)}
+    return key, entry
+
+
+def store_entry(key, entry, data):
+    with timed("serialize"):
+        entry["body"] = render_json(data)
+    get_api_cache().set(key, entry)
+    return entry
+
+
+def entry_response(request, key, entry):
+    """
+    Build the 200 response for a cached entry, in the best encoding the
+    client accepts. A missing compressed variant is made now and written
+    back to the entry.
+    """
+    encoding, added = _add_variant(request, entry)
+    if added:
+        get_api_cache().set(key, entry)
+    return _build_response(entry, encoding)
+
+
+def _add_variant(request, entry):
+    """``(encoding, added)``: the encoding to send and whether ``entry`` gained it."""
+    encoding = choose_encoding(request) if len(entry["body"]) >= min_length() else None
+    if encoding is None or f"body_{encoding}" in entry:
+        return encoding, False
+    with timed("compress"):
+        entry[f"body_{encoding}"] = compress(entry["body"], encoding, mode="cached")
+    return encoding, True
+
+
+def _build_response(entry, encoding):
+    body = entry[f"body_{encoding}"] if encoding is not None else entry["body"]
+    response = HttpResponse(body, content_type="application/json")
+    if encoding is not None:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return set_validators(response, entry)
+
+
+def cache_api_response(*models, vary=None):
+    """
+    Cache the rendered JSON of a read-only ``@api_view``.
+
+    Apply it below ``@api_view`` so throttling and content negotiation still
+    run on every request. Only successful JSON responses are stored; the
+    browsable API (DEBUG) always goes through the view. Every model listed
+    must have an ``updated_at`` column.
+
+    ``vary`` is an optional ``vary(request) -> str`` for responses that also
+    depend on something other than the query string and the rows, such as
+    today's date; its value goes into both the cache key and the ETag.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.accepted_renderer.format != "json":
+                return view_func(request, *args, **kwargs)
+
+            extra = vary(request) if vary else ""
+            key, entry = get_cached_entry(view_func.__name__, request.GET, models, extra)
+            not_modified = get_conditional_response(request, etag=entry["etag"])
+            if not_modified is not None:
+                return set_validators(not_modified, entry)
+
+            if "body" not in entry:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                store_entry(key, entry, response.data)
+
+            return entry_response(request, key, entry)
+
+        return wrapped
+
+    return decorator
+
+
+# =====================================================
+# Async views
+# =====================================================
+async def _acall(method, *args, **kwargs):
+    """
+    Call an api cache method from a coroutine. LocMemCache never waits on
+    I/O, so it is called inline; its async methods would only add a trip
+    through a worker thread. Other backends use their async API.
+    """
+    cache = get_api_cache()
+    if isinstance(cache, LocMemCache):
+        return getattr(cache, method)(*args, **kwargs)
+    return await getattr(cache, f"a{method}")(*args, **kwargs)
+
+
+async def aget_cached_entry(name, query_params, models, extra=""):
+    """get_cached_entry() for async views."""
+    key = _response_key(name, query_params, extra, await aget_model_versions(models))
+    with timed("cache"):
+        entry = await _acall("get", key)
+    if entry is None:
+        stats = [await model.objects.aaggregate(**_content_stats()) for model in models]
+        entry = {"etag": _etag(name, query_params, models, extra, stats)}
+    return key, entry
+
+
+async def aentry_response(request, key, entry):
+    encoding, added = _add_variant(request, entry)
+    if added:
+        await _acall("set", key, entry)
+    return _build_response(entry, encoding)
+
+
+def acache_api_response(*models, vary=None):
+    """
+    cache_api_response() for the async views: the view returns the data to
+    render rather than a Response. Apply it below ``async_api_view``.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapped(request, *args, **kwargs):
+            extra = vary(request) if vary else ""
+            key, entry = await aget_cached_entry(view_func.__name__, request.GET, models, extra)
+            not_modified = get_conditional_response(request, etag=entry["etag"])
+            if not_modified is not None:
+                return set_validators(not_modified, entry)
+
+            if "body" not in entry:
+                data = await view_func(request, *args, **kwargs)
+                with timed("serialize"):
+                    entry["body"] = render_json(data)
+                await _acall("set", key, entry)
+
+            return await aentry_response(request, key, entry)
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,75 @@
+"""
+Content-Encoding negotiation and compression for API JSON.
+
+Brotli is used when the ``brotli`` package is installed and the client
+accepts it; gzip is always available as the fallback.
+"""
+import gzip
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Cached bodies are compressed once per content version, so they can afford
+# the slow, high ratio levels; per-request compression uses faster ones.
+LEVELS = {
+    "br": {"dynamic": 5, "cached": 11},
+    "gzip": {"dynamic": 6, "cached": 9},
+}
+
+
+def available_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def parse_accept_encoding(header):
+    """Return ``{coding: qvalue}`` from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(request):
+    """Pick the best encoding the client accepts, or None for identity."""
+    accepted = parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    best, best_quality = None, 0.0
+    for coding in available_encodings():
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body, encoding, mode="dynamic"):
+    level = LEVELS[encoding][mode]
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    # mtime=0 keeps the output stable for identical input.
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def min_length():
+    return getattr(settings, "API_COMPRESSION_MIN_LENGTH", 200)
+
+
+def weaken_etag(response):
+    """A compressed body is a different representation of the same content."""
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response["ETag"] = "W/" + etag
+    return response
@@ -0,0 +1,50 @@
+"""
+Connection pool statistics (DB_POOL=True, see BooklandSchools/settings.py).
+
+psycopg's pool counts checkouts (``requests_num``), checkouts that had to
+wait (``requests_waiting``, ``requests_wait_ms``), timeouts and errors, and
+the time connections spend checked out (``usage_ms``). Each worker logs and
+resets them as one ``db_pool`` line per pool, at the end of the first
+request after every DB_POOL_STATS_INTERVAL seconds.
+"""
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_last_logged = time.monotonic()
+_lock = threading.Lock()
+
+
+def pool_stats(reset=False):
+    """``{alias: stats}`` for every pooled connection in this process."""
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.pop_stats() if reset else pool.get_stats()
+    return stats
+
+
+def log_pool_stats(**kwargs):
+    global _last_logged
+    if not settings.DB_POOL:
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_logged < settings.DB_POOL_STATS_INTERVAL:
+            return
+        _last_logged = now
+    for alias, stats in pool_stats(reset=True).items():
+        checkouts = stats.get("requests_num", 0)
+        record = {
+            "alias": alias,
+            **stats,
+            "avg_wait_ms": round(stats.get("requests_wait_ms", 0) / checkouts, 2) if checkouts else 0,
+        }
+        logger.info("db_pool %s", json.dumps(record), extra={"db_pool": record})
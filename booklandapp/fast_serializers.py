@@ -0,0 +1,164 @@
+"""
+values()-based serializers for the read endpoints.
+
+The ModelSerializers in serializers.py build a model instance per row and
+dispatch every field through DRF. These classes fetch only the needed columns
+with ``.values()``, apply a precomputed getter per output key and render the
+result with orjson when it is installed. Their output is byte-for-byte the
+same as ``JSONRenderer().render(ModelSerializer(queryset, many=True).data)``;
+``python manage.py bench_serializers`` checks that and times both paths.
+
+FeeStructure stays on FeeStructureSerializer: its file URL depends on the
+mirror settings, not just on columns.
+"""
+import json
+from operator import itemgetter
+
+from rest_framework.renderers import JSONRenderer
+
+from .instrumentation import timed
+from .models import FeaturedEvent
+from .serializers import format_time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def render_json(data):
+    """
+    Render ``data`` exactly like DRF's JSONRenderer with default settings:
+    compact separators, raw UTF-8 and escaped U+2028/U+2029.
+    """
+    if orjson is not None:
+        try:
+            body = orjson.dumps(data)
+        except TypeError:
+            # Types orjson does not know (Decimal, lazy strings...).
+            return JSONRenderer().render(data)
+    else:
+        body = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+    return body.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+# ==============================
+# BASE
+# ==============================
+class ValuesSerializer:
+    """
+    ``fields`` lists the output keys in output order. A key with an entry in
+    ``formatters`` is computed from the row by that function instead of being
+    copied; ``source_fields`` are the extra columns the formatters (or a
+    paginator's cursor) read. After ``data``, ``rows`` holds the values()
+    rows it was built from.
+    """
+    fields = ()
+    formatters = {}
+    source_fields = ()
+
+    def __init__(self, queryset, many=True):
+        self.queryset = queryset
+        self.rows = None
+
+    @classmethod
+    def get_columns(cls):
+        columns = [name for name in cls.fields if name not in cls.formatters]
+        return columns + [name for name in cls.source_fields if name not in columns]
+
+    @classmethod
+    def get_getters(cls):
+        return [(name, cls.formatters.get(name) or itemgetter(name)) for name in cls.fields]
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            getters = self.get_getters()
+            self.rows = list(self.queryset.values(*self.get_columns()))
+            return [{name: get(row) for name, get in getters} for row in self.rows]
+
+    async def adata(self):
+        """``data`` for the async views: the rows come from the async ORM."""
+        self.rows = [row async for row in self.queryset.values(*self.get_columns())]
+        with timed("serialize"):
+            getters = self.get_getters()
+            return [{name: get(row) for name, get in getters} for row in self.rows]
+
+
+# ==============================
+# READ SERIALIZERS
+# ==============================
+# image_width / image_height come from the joined ImageAsset.
+IMAGE_FORMATTERS = {
+    "image_width": itemgetter("image_asset__width"),
+    "image_height": itemgetter("image_asset__height"),
+}
+IMAGE_SOURCE_FIELDS = ("image_asset__width", "image_asset__height")
+
+
+class TestimonialsMessageValuesSerializer(ValuesSerializer):
+    fields = ("id", "name", "title", "testimonial", "image", "image_variants", "image_width", "image_height")
+    formatters = IMAGE_FORMATTERS
+    source_fields = IMAGE_SOURCE_FIELDS
+
+
+class LeadershipMessageValuesSerializer(ValuesSerializer):
+    fields = (
+        "id", "salutation", "name", "designation", "message",
+        "image", "image_variants", "image_width", "image_height",
+    )
+    formatters = IMAGE_FORMATTERS
+    source_fields = IMAGE_SOURCE_FIELDS
+
+
+class GalleryImageValuesSerializer(ValuesSerializer):
+    fields = ("id", "title", "image", "image_variants", "image_width", "image_height")
+    formatters = IMAGE_FORMATTERS
+    source_fields = IMAGE_SOURCE_FIELDS
+
+
+class EventValuesSerializer(ValuesSerializer):
+    fields = (
+        "id",
+        "title",
+        "category",
+        "month",
+        "day",
+        "year",
+        "start_time",
+        "end_time",
+        "location",
+        "description",
+    )
+    formatters = {
+        "start_time": lambda row: format_time(row["start_time"]),
+        "end_time": lambda row: format_time(row["end_time"]),
+    }
+    # event_date is not part of the output; it is the events' cursor key.
+    source_fields = ("start_time", "end_time", "event_date")
+
+
+class FeaturedEventValuesSerializer(ValuesSerializer):
+    fields = ("id", "title", "date", "image", "image_variants", "image_width", "image_height", "description")
+    formatters = {
+        **IMAGE_FORMATTERS,
+        "date": lambda row: FeaturedEvent.format_date_range(row["start_date"], row["end_date"]),
+    }
+    source_fields = ("start_date", "end_date", *IMAGE_SOURCE_FIELDS)
+
+
+class AlumniMessageValuesSerializer(ValuesSerializer):
+    fields = (
+        "id", "name", "title", "year_of_completion", "message",
+        "image", "image_variants", "image_width", "image_height",
+    )
+    formatters = IMAGE_FORMATTERS
+    source_fields = IMAGE_SOURCE_FIELDS
+
+
+class KeyAdmissionDeadlineValuesSerializer(ValuesSerializer):
+    fields = ("id", "name", "deadline_date")
+    formatters = {
+        "deadline_date": lambda row: row["deadline_date"].strftime("%Y-%m-%d"),
+    }
+    source_fields = ("deadline_date",)
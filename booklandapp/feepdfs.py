@@ -0,0 +1,163 @@
+"""
+Local mirror of the fee structure PDFs.
+
+With FEE_PDF_MIRROR on, each FeeStructure PDF is downloaded once from
+Cloudinary into FEE_PDF_MIRROR_DIR, stored under its SHA-256 and served by
+``api_fee_pdf`` with a strong ETag and HTTP Range support, so repeat
+downloads (and PDF viewers fetching pages in ranges) never leave the
+server. ``FeeStructure.file_url`` points at the mirror once
+``pdf_sha256`` is set, and at Cloudinary until then.
+
+New files are mirrored on a background thread after the commit; a mirror
+that has gone missing (e.g. after a redeploy on ephemeral disk) is fetched
+again on the next download. ``python manage.py mirror_fee_pdfs`` does the
+same for every row.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import urllib.request
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .cache import invalidate_model
+from .models import FeeStructure
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_TIMEOUT = 30
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class MirrorError(Exception):
+    pass
+
+
+def mirror_path(sha256):
+    return os.path.join(settings.FEE_PDF_MIRROR_DIR, f"{sha256}.pdf")
+
+
+def download(url):
+    """Fetch ``url`` into the mirror directory; returns (sha256, size)."""
+    os.makedirs(settings.FEE_PDF_MIRROR_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=settings.FEE_PDF_MIRROR_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as fh, urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                if size == 0 and not chunk.startswith(b"%PDF-"):
+                    raise MirrorError("not a PDF")
+                size += len(chunk)
+                if size > settings.FEE_PDF_MAX_BYTES:
+                    raise MirrorError("larger than FEE_PDF_MAX_BYTES")
+                digest.update(chunk)
+                fh.write(chunk)
+        sha256 = digest.hexdigest()
+        # Named by content, so a finished file never changes.
+        os.replace(tmp_path, mirror_path(sha256))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return sha256, size
+
+
+def mirror_fee_pdf(fee):
+    """Mirror ``fee``'s current PDF; returns whether the row was updated."""
+    if not fee.pdf_url:
+        return False
+    sha256, size = download(fee.pdf_url)
+    # Only record it if the file was not replaced while we were downloading.
+    updated = FeeStructure.objects.filter(pk=fee.pk, pdf_url=fee.pdf_url).update(
+        pdf_sha256=sha256, pdf_size=size, updated_at=timezone.now()
+    )
+    if updated:
+        transaction.on_commit(lambda: invalidate_model(FeeStructure))
+    if fee.pdf_sha256 and fee.pdf_sha256 != sha256:
+        remove_unused(fee.pdf_sha256)
+    return bool(updated)
+
+
+def remove_unused(sha256):
+    if FeeStructure.objects.filter(pdf_sha256=sha256).exists():
+        return
+    try:
+        os.unlink(mirror_path(sha256))
+    except FileNotFoundError:
+        pass
+
+
+# =====================================================
+# Background mirroring
+# =====================================================
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def schedule_mirror(pk):
+    """Mirror row ``pk`` on a background thread unless that is already under way."""
+    with _in_flight_lock:
+        if pk in _in_flight:
+            return
+        _in_flight.add(pk)
+    threading.Thread(target=run_background, args=(pk,), name=f"fee-pdf-{pk}", daemon=True).start()
+
+
+def run_background(pk):
+    try:
+        fee = FeeStructure.objects.filter(pk=pk).first()
+        if fee is not None:
+            mirror_fee_pdf(fee)
+    except Exception:
+        logger.exception("Mirroring fee PDF %s failed", pk)
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(pk)
+        connections.close_all()
+
+
+# =====================================================
+# Range requests
+# =====================================================
+def parse_range(header, size):
+    """
+    The (start, end) byte positions, end inclusive, asked for by a Range
+    header, or None to send the whole file. Multiple ranges and malformed
+    headers get the whole file; raises ValueError when nothing is satisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    elif last:
+        start, end = max(size - int(last), 0), size - 1
+        if int(last) == 0:
+            raise ValueError("empty suffix range")
+    else:
+        return None
+    if start >= size:
+        raise ValueError("range starts after the end of the file")
+    return start, end
+
+
+def read_range(path, start, end):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = fh.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
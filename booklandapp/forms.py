@@ -1,5 +1,5 @@
 from django import forms
-import cloudinary.uploader
+
 from .models import (
     AdmissionMessage,
     EnquiryMessages,
@@ -10,6 +10,39 @@ from .models import (
     FeaturedEvent,
     FeeStructure,
 )
+from .uploads import queue_upload, stage_file
+
+
+# =========================
+# Staged image uploads
+# =========================
+class StagedImageUploadMixin:
+    """
+    Stage ``upload_image`` on local disk and queue it for upload instead of
+    uploading during the request. The row is saved with a pending image
+    status; booklandapp.uploads fills in ``image`` later.
+    """
+    upload_folder = None
+
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        image_file = self.cleaned_data.get("upload_image")
+        if image_file:
+            instance.image_status = instance.IMAGE_PENDING
+            staged_path = stage_file(image_file)
+            save_m2m = self.save_m2m
+
+            # The upload needs the row's pk, which commit=False callers
+            # (the admin) only have by the time they call save_m2m().
+            def save_m2m_and_queue():
+                save_m2m()
+                queue_upload(instance, staged_path, self.upload_folder)
+
+            self.save_m2m = save_m2m_and_queue
+        if commit:
+            instance.save()
+            self.save_m2m()
+        return instance
 
 
 # =========================
@@ -33,132 +66,89 @@ class EnquiryMessagesForm(forms.ModelForm):
 # =========================
 # Testimonials Form
 # =========================
-class TestimonialsMessageForm(forms.ModelForm):
+class TestimonialsMessageForm(StagedImageUploadMixin, forms.ModelForm):
+    upload_folder = "bookland/testimonials"
     upload_image = forms.ImageField(required=False, label="Upload Image")
 
     class Meta:
         model = TestimonialsMessage
         fields = ["name", "title", "testimonial", "upload_image"]
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        image_file = self.cleaned_data.get("upload_image")
-        if image_file:
-            upload_result = cloudinary.uploader.upload(
-                image_file,
-                folder="bookland/testimonials",
-                quality="auto",
-                fetch_format="auto",
-            )
-            instance.image = upload_result.get("secure_url")
-        if commit:
-            instance.save()
-        return instance
-
 
 # =========================
 # Leadership Form
 # =========================
-class LeadershipMessageForm(forms.ModelForm):
+class LeadershipMessageForm(StagedImageUploadMixin, forms.ModelForm):
+    upload_folder = "bookland/leadership"
     upload_image = forms.ImageField(required=False, label="Upload Image")
 
     class Meta:
         model = LeadershipMessage
         fields = ["salutation", "name", "designation", "message", "upload_image"]
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        image_file = self.cleaned_data.get("upload_image")
-        if image_file:
-            upload_result = cloudinary.uploader.upload(
-                image_file,
-                folder="bookland/leadership",
-                quality="auto",
-                fetch_format="auto",
-            )
-            instance.image = upload_result.get("secure_url")
-        if commit:
-            instance.save()
-        return instance
-
 
 # =========================
 # Alumni Form
 # =========================
-class AlumniMessageForm(forms.ModelForm):
+class AlumniMessageForm(StagedImageUploadMixin, forms.ModelForm):
+    upload_folder = "bookland/alumni"
     upload_image = forms.ImageField(required=False, label="Upload Image")
 
     class Meta:
         model = AlumniMessage
         fields = ["name", "title", "year_of_completion", "message", "upload_image"]
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        image_file = self.cleaned_data.get("upload_image")
-        if image_file:
-            upload_result = cloudinary.uploader.upload(
-                image_file,
-                folder="bookland/alumni",
-                quality="auto",
-                fetch_format="auto",
-            )
-            instance.image = upload_result.get("secure_url")
-        if commit:
-            instance.save()
-        return instance
-
 
 # =========================
 # Gallery Image Form
 # =========================
-class GalleryImageForm(forms.ModelForm):
+class GalleryImageForm(StagedImageUploadMixin, forms.ModelForm):
+    upload_folder = "bookland/gallery"
     upload_image = forms.ImageField(required=True, label="Upload Image")
 
     class Meta:
         model = GalleryImage
         fields = ["title", "upload_image"]
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        image_file = self.cleaned_data.get("upload_image")
-        if image_file:
-            upload_result = cloudinary.uploader.upload(
-                image_file,
-                folder="bookland/gallery",
-                quality="auto",
-                fetch_format="auto",
-            )
-            instance.image = upload_result.get("secure_url")
-        if commit:
-            instance.save()
-        return instance
+
+# =========================
+# Gallery Bulk Upload Form
+# =========================
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    widget = MultipleFileInput
+
+    def clean(self, data, initial=None):
+        if isinstance(data, (list, tuple)):
+            return [super(MultipleFileField, self).clean(item, initial) for item in data]
+        return [super().clean(data, initial)]
+
+
+class GalleryBulkUploadForm(forms.Form):
+    title = forms.CharField(
+        max_length=255, required=False,
+        help_text="Used for every image; leave blank to use each file name.",
+    )
+    files = MultipleFileField(
+        label="Images or zip archives",
+        help_text="Select many photos at once, or zip files of photos.",
+    )
 
 
 # =========================
 # Featured Event Form
 # =========================
-class FeaturedEventForm(forms.ModelForm):
+class FeaturedEventForm(StagedImageUploadMixin, forms.ModelForm):
+    upload_folder = "bookland/featured_events"
     upload_image = forms.ImageField(required=False, label="Upload Image")
 
     class Meta:
         model = FeaturedEvent
         fields = ["title", "start_date", "end_date", "description", "upload_image"]
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        image_file = self.cleaned_data.get("upload_image")
-        if image_file:
-            upload_result = cloudinary.uploader.upload(
-                image_file,
-                folder="bookland/featured_events",
-                quality="auto",
-                fetch_format="auto",
-            )
-            instance.image = upload_result.get("secure_url")
-        if commit:
-            instance.save()
-        return instance
-
 
 # =========================
 # Fee Structure Form
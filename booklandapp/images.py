@@ -0,0 +1,76 @@
+"""
+Responsive image metadata stored in ``ImageModel.image_variants``:
+
+    {
+        "width": 1600, "height": 1200,
+        "placeholder": "data:image/webp;base64,...",
+        "srcset": [{"width": 320, "height": 240, "url": "..."}, ...]
+    }
+
+``placeholder`` is a tiny blurred-up preview (LQIP) clients can inline
+while the real image loads; ``srcset`` lists the widths from
+IMAGE_VARIANT_WIDTHS narrower than the original, plus the original itself,
+smallest first. The files or URLs behind them come from the upload
+transport (booklandapp/uploads.py).
+"""
+import base64
+import io
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+PLACEHOLDER_QUALITY = 40
+
+
+def open_upright(path):
+    """Open an image with its EXIF orientation applied."""
+    image = Image.open(path)
+    return ImageOps.exif_transpose(image)
+
+
+def scaled_size(size, width):
+    original_width, original_height = size
+    return width, max(1, round(original_height * width / original_width))
+
+
+def variant_sizes(size):
+    """The (width, height) pairs to offer for an image of ``size``, ending with the original."""
+    widths = sorted(width for width in settings.IMAGE_VARIANT_WIDTHS if width < size[0])
+    return [scaled_size(size, width) for width in widths] + [tuple(size)]
+
+
+def build_placeholder(image):
+    """A data: URI of ``image`` shrunk to IMAGE_PLACEHOLDER_WIDTH pixels wide."""
+    preview = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    preview = preview.resize(
+        scaled_size(image.size, min(settings.IMAGE_PLACEHOLDER_WIDTH, image.width)), Image.LANCZOS
+    )
+    buffer = io.BytesIO()
+    preview.save(buffer, "WEBP", quality=PLACEHOLDER_QUALITY)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def build_image_variants(path, transport, result):
+    """Describe the image at ``path``, uploaded by ``transport`` as ``result``."""
+    with open_upright(path) as image:
+        sizes = variant_sizes(image.size)
+        placeholder = build_placeholder(image)
+        width, height = image.size
+    urls = transport.variant_urls(path, result, sizes)
+    return {
+        "width": width,
+        "height": height,
+        "placeholder": placeholder,
+        "srcset": [
+            {"width": variant_width, "height": variant_height, "url": url}
+            for (variant_width, variant_height), url in zip(sizes, urls)
+        ],
+    }
+
+
+def smallest_variant(variants, min_width):
+    """URL of the narrowest srcset entry at least ``min_width`` wide, if any."""
+    for variant in (variants or {}).get("srcset", []):
+        if variant["width"] >= min_width:
+            return variant["url"]
+    return None
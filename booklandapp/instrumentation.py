@@ -0,0 +1,94 @@
+"""
+Per-request timings collected by ServerTimingMiddleware.
+
+Code anywhere in a request can wrap a step in ``timed("name")``. The time is
+added to the current request's timings, or ignored when the request is not
+instrumented (unsampled requests, management commands, workers). Queries run
+inside a timed block are reported under "db" only, so "serialize" is the
+Python side of serialization.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("bookland_request_timings", default=None)
+
+# Server-Timing descriptions, shown by browser dev tools.
+DESCRIPTIONS = {
+    "db": "Database",
+    "cache": "API cache lookup",
+    "serialize": "Serialization",
+    "compress": "Compression",
+    "cloudinary": "Cloudinary",
+    "view": "View",
+    "total": "Total",
+}
+
+
+class RequestTimings:
+    def __init__(self):
+        self.durations = {}  # name -> total ms
+        self.counts = {}  # name -> number of timed steps
+        self.active = set()
+
+    def add(self, name, duration_ms):
+        self.durations[name] = self.durations.get(name, 0.0) + duration_ms
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook that times every query as "db"."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add("db", (time.perf_counter() - started) * 1000)
+
+    def as_dict(self):
+        data = {name: round(duration, 2) for name, duration in self.durations.items()}
+        data["queries"] = self.counts.get("db", 0)
+        return data
+
+    def header(self):
+        """Value for the Server-Timing response header."""
+        metrics = []
+        for name, duration in self.durations.items():
+            description = DESCRIPTIONS.get(name, name)
+            if name == "db":
+                description = f"{self.counts['db']} queries"
+            metrics.append(f'{name};dur={duration:.2f};desc="{description}"')
+        return ", ".join(metrics)
+
+
+def start_request():
+    """Start collecting for the current context; returns ``(timings, token)``."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the block's duration to ``name``, less any query time inside it.
+    Nested blocks with the same name are only counted once.
+    """
+    timings = _current.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    db_before = timings.durations.get("db", 0.0)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        timings.active.discard(name)
+        timings.add(name, elapsed - (timings.durations.get("db", 0.0) - db_before))
@@ -0,0 +1,331 @@
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.contrib.auth import get_user_model
+from django.test import Client, override_settings
+from django.urls import NoReverseMatch, reverse
+
+from booklandapp import urls as app_urls
+from booklandapp.benchmark import (
+    QueryCounter,
+    fake_client_ip,
+    http_load,
+    local_server,
+    seed_all,
+    slow_clients,
+    summarize,
+    test_database,
+)
+from booklandapp.cache import get_api_cache
+
+# Extra query strings worth measuring on top of the bare URL.
+GET_VARIANTS = {
+    "api_events": ["?month=May", "?category=Arts", "?upcoming=true", "?limit=20"],
+    "api_gallery": ["?limit=20"],
+    "api_alumni": ["?limit=20"],
+    "api_testimonials": ["?limit=20"],
+    "api_bundle": ["?sections=testimonials,gallery,events"],
+    # The seeded testimonials and events all mention the music festival (benchmark.SAMPLE_TEXT).
+    "api_search": ["?q=festival", "?q=music+fest&type=event"],
+}
+
+POST_PAYLOADS = {
+    "api_admissions": {
+        "name": "Jane Wanjiru",
+        "email": "jane@example.com",
+        "phone": "0712345678",
+        "message": "I would like to enrol my daughter in Grade 4 next term.",
+    },
+    "api_contact": {
+        "name": "John Otieno",
+        "email": "john@example.com",
+        "subject": "Transport routes",
+        "message": "Does the school bus cover the Kilimani route?",
+    },
+}
+
+
+def discover_cases():
+    """
+    One case per (URL, method) in booklandapp/urls.py, plus GET_VARIANTS.
+    Patterns that need URL arguments are skipped. Returns the cases and the
+    names of the POST endpoints left out for want of a POST_PAYLOADS entry.
+    """
+    cases = []
+    skipped = []
+    for pattern in app_urls.urlpatterns:
+        try:
+            url = reverse(pattern.name)
+        except NoReverseMatch:
+            continue
+        view_class = getattr(pattern.callback, "cls", None)
+        methods = [m for m in ("get", "post") if view_class is None or hasattr(view_class, m)]
+        if view_class is None:
+            methods = ["get"]
+        for method in methods:
+            if method == "get":
+                for query in ["", *GET_VARIANTS.get(pattern.name, [])]:
+                    cases.append({"name": pattern.name, "method": "GET", "url": url + query, "body": None})
+            elif pattern.name in POST_PAYLOADS:
+                cases.append({
+                    "name": pattern.name, "method": "POST", "url": url,
+                    "body": json.dumps(POST_PAYLOADS[pattern.name]),
+                })
+            else:
+                skipped.append(pattern.name)
+    return cases, skipped
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result):
+    return (result["transport"], result["method"], result["url"], result["cache"], result["rows"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and measure every URL in booklandapp/urls.py "
+        "through the Django test client (and optionally a local gunicorn): "
+        "throughput, p50/p95/p99 latency, query count and allocations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000], help="Rows per model.")
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per case.")
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument(
+            "--cache", choices=["warm", "cold", "both"], default="both",
+            help="warm: API cache kept between requests; cold: cleared before each one.",
+        )
+        parser.add_argument("--alloc-samples", type=int, default=20, help="Requests traced with tracemalloc.")
+        parser.add_argument(
+            "--fast-path", choices=["on", "off", "both"], default="on",
+            help="PUBLIC_API_FAST_PATH for the test client runs; 'both' measures the "
+                 "session/auth/CSRF middleware it skips.",
+        )
+        parser.add_argument(
+            "--session", action="store_true",
+            help="Send the test client requests with a logged-in admin session cookie.",
+        )
+        parser.add_argument("--only", nargs="+", help="Limit to these URL names, e.g. api_events.")
+        parser.add_argument("--gunicorn", action="store_true", help="Also load-test a local gunicorn.")
+        parser.add_argument(
+            "--worker-class", nargs="+", default=["sync"],
+            help="gunicorn -k values, one server each; e.g. sync uvicorn_worker.UvicornWorker "
+                 "to compare WSGI with the async views under ASGI.",
+        )
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=8, help="Client threads for --gunicorn.")
+        parser.add_argument(
+            "--slow-clients", type=int, default=0,
+            help="Connections that trickle their requests in, held open during the --gunicorn runs.",
+        )
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--json", dest="json_path", help="Write the results to this file.")
+        parser.add_argument("--compare", help="Print the change against a previous --json file.")
+
+    def handle(self, *args, **options):
+        cases, skipped = discover_cases()
+        if options["only"]:
+            cases = [case for case in cases if case["name"] in options["only"]]
+            skipped = [name for name in skipped if name in options["only"]]
+        if skipped:
+            self.stderr.write(f"Skipping POST to {', '.join(skipped)}: no entry in POST_PAYLOADS.")
+        if not cases:
+            raise CommandError("No URLs to benchmark.")
+        cache_modes = ["warm", "cold"] if options["cache"] == "both" else [options["cache"]]
+        fast_paths = {"on": [True], "off": [False], "both": [True, False]}[options["fast_path"]]
+        if settings.DEBUG:
+            self.stderr.write("DEBUG is on: query logging inflates every timing. Run with DEBUG=False.")
+
+        results = []
+        sqlite_file = None
+        if options["gunicorn"]:
+            sqlite_file = os.path.join(tempfile.mkdtemp(prefix="bookland-bench-"), "bench.sqlite3")
+        with test_database(sqlite_file=sqlite_file):
+            for size in options["sizes"]:
+                seed_all(size)
+                for case in cases:
+                    modes = cache_modes if case["method"] == "GET" else ["n/a"]
+                    for cache_mode in modes:
+                        for fast_path in fast_paths:
+                            with override_settings(PUBLIC_API_FAST_PATH=fast_path):
+                                results.append(self.run_client_case(case, size, cache_mode, options))
+                if options["gunicorn"]:
+                    for worker_class in options["worker_class"]:
+                        results.extend(self.run_server_cases(cases, size, worker_class, options))
+
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "api_cache_backend": settings.API_CACHE_BACKEND,
+            },
+            "results": results,
+        }
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Wrote {options['json_path']}")
+        if options["compare"]:
+            self.print_comparison(options["compare"], results)
+
+    # -------------------------------------------------
+    # Django test client
+    # -------------------------------------------------
+    def run_client_case(self, case, size, cache_mode, options):
+        client = Client()
+        if options["session"]:
+            admin, _ = get_user_model().objects.get_or_create(
+                username="bench-admin", defaults={"is_staff": True, "is_superuser": True}
+            )
+            client.force_login(admin)
+        counter = iter(range(10 ** 9))
+
+        def send():
+            return client.generic(
+                case["method"], case["url"], data=case["body"] or "",
+                content_type="application/json",
+                secure=True,
+                HTTP_X_FORWARDED_FOR=fake_client_ip(next(counter)),
+                HTTP_ACCEPT_ENCODING="br, gzip",
+            )
+
+        def prepare():
+            if cache_mode == "cold":
+                get_api_cache().clear()
+
+        for _ in range(options["warmup"]):
+            prepare()
+            send()
+
+        latencies = []
+        elapsed = 0.0
+        statuses = set()
+        for _ in range(options["requests"]):
+            prepare()
+            started = time.perf_counter()
+            response = send()
+            duration = time.perf_counter() - started
+            elapsed += duration
+            latencies.append(duration * 1000)
+            statuses.add(response.status_code)
+
+        prepare()
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            send()
+
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(options["alloc_samples"]):
+                prepare()
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                send()
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+
+        transport = "client" if settings.PUBLIC_API_FAST_PATH else "client:full-mw"
+        result = {
+            "transport": transport,
+            "endpoint": case["name"],
+            "method": case["method"],
+            "url": case["url"],
+            "cache": cache_mode,
+            "rows": size,
+            **summarize(latencies, elapsed),
+            "queries": queries.count,
+            "alloc_peak_kib": round(sorted(peaks)[len(peaks) // 2] / 1024, 1) if peaks else None,
+            "statuses": sorted(statuses),
+        }
+        self.write_result(result)
+        return result
+
+    # -------------------------------------------------
+    # Local gunicorn
+    # -------------------------------------------------
+    def run_server_cases(self, cases, size, worker_class, options):
+        results = []
+        transport = f"gunicorn:{worker_class.rsplit('.', 1)[-1]}x{options['workers']}"
+        if options["slow_clients"]:
+            transport += f"+{options['slow_clients']}slow"
+        with local_server(options["port"], options["workers"], worker_class) as base_url:
+            for case in cases:
+                http_load(base_url, case["method"], case["url"], case["body"], options["warmup"], 1)
+                with slow_clients(base_url, options["slow_clients"], case["url"]):
+                    latencies, elapsed, statuses = http_load(
+                        base_url, case["method"], case["url"], case["body"],
+                        options["requests"], options["concurrency"],
+                    )
+                result = {
+                    "transport": transport,
+                    "endpoint": case["name"],
+                    "method": case["method"],
+                    "url": case["url"],
+                    "cache": "warm" if case["method"] == "GET" else "n/a",
+                    "rows": size,
+                    "concurrency": options["concurrency"],
+                    "slow_clients": options["slow_clients"],
+                    **summarize(latencies, elapsed),
+                    "errors": sum(1 for status in statuses if status is None or status >= 400),
+                    "statuses": sorted({status for status in statuses if status is not None}),
+                }
+                self.write_result(result)
+                results.append(result)
+        return results
+
+    # -------------------------------------------------
+    # Output
+    # -------------------------------------------------
+    def write_result(self, result):
+        extra = ""
+        if "queries" in result:
+            extra = f"  {result['queries']:>3} queries  {result['alloc_peak_kib']:>9} KiB"
+        elif result.get("errors"):
+            extra = f"  {result['errors']} errors"
+        self.stdout.write(
+            f"{result['transport']:<18} {result['method']:<4} {result['url']:<52} "
+            f"{result['cache']:<4} {result['rows']:>6} rows  "
+            f"{result['throughput_rps']:>9} req/s  p50 {result['p50_ms']:>8} ms  "
+            f"p95 {result['p95_ms']:>8} ms  p99 {result['p99_ms']:>8} ms{extra}"
+        )
+
+    def print_comparison(self, path, results):
+        with open(path) as fh:
+            previous = {result_key(result): result for result in json.load(fh)["results"]}
+        self.stdout.write(f"\nChange against {path} (negative latency / positive throughput is better):")
+        for result in results:
+            before = previous.get(result_key(result))
+            if not before:
+                continue
+            changes = []
+            for metric in ("throughput_rps", "p50_ms", "p99_ms"):
+                if before.get(metric) and result.get(metric) is not None:
+                    changes.append(f"{metric} {100 * (result[metric] - before[metric]) / before[metric]:+.1f}%")
+            self.stdout.write(
+                f"{result['transport']:<18} {result['method']:<4} {result['url']:<52} "
+                f"{result['cache']:<4} {result['rows']:>6} rows  " + "  ".join(changes)
+            )
@@ -0,0 +1,108 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from booklandapp.benchmark import best_of, seed, test_database
+from booklandapp.fast_serializers import (
+    TestimonialsMessageValuesSerializer,
+    LeadershipMessageValuesSerializer,
+    GalleryImageValuesSerializer,
+    EventValuesSerializer,
+    FeaturedEventValuesSerializer,
+    AlumniMessageValuesSerializer,
+    render_json,
+)
+from booklandapp.models import (
+    TestimonialsMessage,
+    LeadershipMessage,
+    GalleryImage,
+    Event,
+    AlumniMessage,
+    FeaturedEvent,
+)
+from booklandapp.serializers import (
+    TestimonialsMessageSerializer,
+    LeadershipMessageSerializer,
+    GalleryImageSerializer,
+    EventSerializer,
+    FeaturedEventSerializer,
+    AlumniMessageSerializer,
+)
+
+# name -> (queryset, ModelSerializer, values serializer), using the same
+# ordering as the views.
+CASES = {
+    "testimonials": (
+        lambda: TestimonialsMessage.objects.all(),
+        TestimonialsMessageSerializer,
+        TestimonialsMessageValuesSerializer,
+    ),
+    "leadership": (
+        lambda: LeadershipMessage.objects.all(),
+        LeadershipMessageSerializer,
+        LeadershipMessageValuesSerializer,
+    ),
+    "gallery": (lambda: GalleryImage.objects.all(), GalleryImageSerializer, GalleryImageValuesSerializer),
+    "events": (
+        lambda: Event.objects.order_by("-year", "event_date", "id"),
+        EventSerializer,
+        EventValuesSerializer,
+    ),
+    "featured-events": (
+        lambda: FeaturedEvent.objects.all(),
+        FeaturedEventSerializer,
+        FeaturedEventValuesSerializer,
+    ),
+    "alumni": (lambda: AlumniMessage.objects.all(), AlumniMessageSerializer, AlumniMessageValuesSerializer),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ModelSerializer + JSONRenderer against the values() serializers "
+        "on a throwaway test database, and check both produce the same bytes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the fastest is reported.")
+        parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="Limit to these endpoints.")
+        parser.add_argument("--json", dest="json_path", help="Also write the results to this file.")
+
+    def handle(self, *args, **options):
+        names = options["only"] or list(CASES)
+        results = []
+        with test_database():
+            for size in options["sizes"]:
+                for name in names:
+                    get_queryset, drf_serializer, values_serializer = CASES[name]
+                    seed(get_queryset().model, size)
+
+                    def drf_path():
+                        return JSONRenderer().render(drf_serializer(get_queryset(), many=True).data)
+
+                    def values_path():
+                        return render_json(values_serializer(get_queryset()).data)
+
+                    if drf_path() != values_path():
+                        raise CommandError(f"{name}: values() output differs from the ModelSerializer at {size} rows")
+
+                    drf_ms = best_of(drf_path, options["repeat"])
+                    values_ms = best_of(values_path, options["repeat"])
+                    results.append({
+                        "endpoint": name,
+                        "rows": size,
+                        "model_serializer_ms": round(drf_ms, 3),
+                        "values_serializer_ms": round(values_ms, 3),
+                        "speedup": round(drf_ms / values_ms, 2) if values_ms else None,
+                    })
+                    self.stdout.write(
+                        f"{name:<16} {size:>7} rows  ModelSerializer {drf_ms:9.2f} ms  "
+                        f"values() {values_ms:9.2f} ms  x{drf_ms / values_ms:.1f}"
+                    )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(results, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS("Outputs identical for every case."))
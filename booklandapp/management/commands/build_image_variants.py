@@ -0,0 +1,95 @@
+import os
+import tempfile
+import urllib.request
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from PIL import Image
+
+from booklandapp.images import build_image_variants
+from booklandapp.models import ImageAsset, ImageModel
+from booklandapp.signals import CACHED_MODELS
+from booklandapp.uploads import CloudinaryTransport, LocalTransport, create_asset
+
+DOWNLOAD_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in image_variants (sizes, srcset and placeholder) and the "
+        "ImageAsset record for images uploaded before they existed. Each image "
+        "is read once; Cloudinary images get transformation URLs, local ones "
+        "resized copies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild rows that already have variants.")
+        parser.add_argument("--max-bytes", type=int, default=20 * 1024 * 1024, help="Skip larger downloads.")
+
+    def handle(self, *args, **options):
+        transports = [CloudinaryTransport(), LocalTransport()]
+        models = [model for model in CACHED_MODELS if issubclass(model, ImageModel)]
+        for model in models:
+            queryset = model.objects.exclude(image__isnull=True).exclude(image="")
+            if not options["all"]:
+                queryset = queryset.filter(Q(image_variants={}) | Q(image_asset__isnull=True))
+            built = failed = 0
+            for row in queryset.only("pk", "image", "image_asset").iterator():
+                try:
+                    built_row = self.build(row.image, transports, options["max_bytes"])
+                except Exception as exc:  # one bad image must not stop the backfill
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {row.pk}: {exc}")
+                    continue
+                if built_row is None:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {row.pk}: unrecognised image URL {row.image}")
+                    continue
+                variants, result = built_row
+                old_asset_id = row.image_asset_id
+                try:
+                    # One transaction, so a failed save leaves no orphan ImageAsset.
+                    with transaction.atomic():
+                        row.image_variants = variants
+                        row.image_asset = create_asset(result, variants)
+                        # save() rather than update() so the API cache is invalidated.
+                        row.save(update_fields=["image_variants", "image_asset", "updated_at"])
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {row.pk}: {exc}")
+                    continue
+                if old_asset_id:
+                    ImageAsset.objects.filter(pk=old_asset_id).delete()
+                built += 1
+            self.stdout.write(f"{model.__name__}: built {built}, failed {failed}")
+
+    def build(self, url, transports, max_bytes):
+        """(variants, upload result) for ``url``, or None if no transport owns it."""
+        for transport in transports:
+            result = transport.parse_url(url)
+            if result is None:
+                continue
+            if isinstance(transport, LocalTransport):
+                return self.describe(transport.storage.path(result["storage_name"]), transport, result)
+            with tempfile.NamedTemporaryFile(suffix=os.path.splitext(url)[1]) as fh:
+                self.download(url, fh, max_bytes)
+                return self.describe(fh.name, transport, result)
+        return None
+
+    def describe(self, path, transport, result):
+        # parse_url() only knows the URL; size and format come from the file.
+        with Image.open(path) as image:
+            image_format = (image.format or "").lower()
+        result = {**result, "bytes": os.path.getsize(path), "format": image_format}
+        return build_image_variants(path, transport, result), result
+
+    def download(self, url, fh, max_bytes):
+        received = 0
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            for chunk in iter(lambda: response.read(64 * 1024), b""):
+                received += len(chunk)
+                if received > max_bytes:
+                    raise ValueError("image is larger than --max-bytes")
+                fh.write(chunk)
+        fh.flush()
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from booklandapp.snapshots import export_snapshot, snapshot_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every public GET endpoint to precompressed JSON files plus a "
+        "manifest under SNAPSHOT_ROOT/snapshot/. Only endpoints whose data "
+        "changed since the last export are rewritten, unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rewrite every file.")
+
+    def handle(self, *args, **options):
+        if not settings.PUBLIC_BASE_URL:
+            raise CommandError("Set PUBLIC_BASE_URL to the site's public origin, e.g. https://example.com")
+        written, unchanged, failed = export_snapshot(force=options["force"])
+        self.stdout.write(f"{snapshot_dir()}: written {written}, unchanged {unchanged}, failed {failed}")
+        if failed:
+            raise CommandError(f"{failed} endpoint(s) could not be exported")
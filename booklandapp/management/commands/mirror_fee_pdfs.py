@@ -0,0 +1,53 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from booklandapp.feepdfs import mirror_fee_pdf, mirror_path
+from booklandapp.models import FeeStructure
+
+
+class Command(BaseCommand):
+    help = (
+        "Cache each fee structure's Cloudinary URL and copy its PDF into "
+        "FEE_PDF_MIRROR_DIR. Rows whose mirror file exists are skipped unless "
+        "--all is given; --prune removes files no row refers to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Download every PDF again.")
+        parser.add_argument("--prune", action="store_true", help="Delete unreferenced mirror files.")
+
+    def handle(self, *args, **options):
+        mirrored = skipped = failed = 0
+        for fee in FeeStructure.objects.exclude(fee_structure_file__isnull=True).exclude(fee_structure_file=""):
+            if not fee.pdf_url:
+                # Rows from before pdf_url existed; save() fills it in.
+                fee.save(update_fields=["updated_at"])
+            if not options["all"] and fee.pdf_sha256 and os.path.exists(mirror_path(fee.pdf_sha256)):
+                skipped += 1
+                continue
+            try:
+                mirror_fee_pdf(fee)
+            except Exception as exc:  # one bad file must not stop the rest
+                failed += 1
+                self.stderr.write(f"{fee.level}: {exc}")
+                continue
+            mirrored += 1
+        self.stdout.write(f"mirrored {mirrored}, up to date {skipped}, failed {failed}")
+        if options["prune"]:
+            self.prune()
+
+    def prune(self):
+        directory = settings.FEE_PDF_MIRROR_DIR
+        if not os.path.isdir(directory):
+            return
+        keep = {f"{sha256}.pdf" for sha256 in FeeStructure.objects.exclude(pdf_sha256="").values_list(
+            "pdf_sha256", flat=True
+        )}
+        removed = 0
+        for name in os.listdir(directory):
+            if name not in keep and (name.endswith(".pdf") or name.endswith(".part")):
+                os.unlink(os.path.join(directory, name))
+                removed += 1
+        self.stdout.write(f"removed {removed} unreferenced file(s)")
@@ -0,0 +1,40 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from booklandapp.uploads import due_uploads, process_upload
+
+logger = logging.getLogger("booklandapp.uploads")
+
+
+class Command(BaseCommand):
+    help = (
+        "Upload staged admin images that are due (new, or waiting to retry) "
+        "and patch their rows. Runs once, or forever with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting.")
+        parser.add_argument("--interval", type=float, default=30.0, help="Seconds between polls.")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                self.run_once(options["batch_size"])
+            except Exception:
+                if not options["loop"]:
+                    raise
+                logger.exception("Image upload worker pass failed")
+            if not options["loop"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
+
+    def run_once(self, batch_size):
+        pks = list(due_uploads().values_list("pk", flat=True)[:batch_size])
+        uploaded = sum(1 for pk in pks if process_upload(pk))
+        if pks:
+            self.stdout.write(f"uploaded {uploaded} of {len(pks)} due images")
@@ -0,0 +1,49 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from booklandapp.submissions import save_queued, send_notifications
+
+logger = logging.getLogger("booklandapp.submissions")
+
+
+class Command(BaseCommand):
+    help = (
+        "Save queued admission/contact submissions in batches and send their "
+        "notification emails. Runs once, or forever with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls when idle.")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                busy = self.run_once(options["batch_size"])
+            except Exception:
+                if not options["loop"]:
+                    raise
+                logger.exception("Submission worker pass failed")
+                busy = False
+            if not options["loop"]:
+                return
+            close_old_connections()
+            if not busy:
+                time.sleep(options["interval"])
+
+    def run_once(self, batch_size):
+        """Drain the queue; returns whether anything was processed."""
+        busy = False
+        while True:
+            saved = save_queued(batch_size)
+            sent, failed = send_notifications(batch_size)
+            if saved or sent or failed:
+                busy = True
+                self.stdout.write(f"saved {saved}, notified {sent}, notification failures {failed}")
+            # Failed emails wait for their backoff, so only loop on progress.
+            if saved < batch_size and sent + failed < batch_size:
+                return busy
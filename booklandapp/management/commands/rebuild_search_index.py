@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from booklandapp.search import SOURCES, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the /api/search/ documents from the source tables, e.g. "
+        "after bulk imports or updates that bypassed save()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", action="append", choices=list(SOURCES), help="Only these kinds (repeatable).")
+
+    def handle(self, *args, **options):
+        # One transaction, so searches never see a half-built index.
+        with transaction.atomic():
+            count = rebuild_index(options["kind"])
+        self.stdout.write(f"indexed {count} document(s)")
@@ -0,0 +1,361 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.db import InterfaceError, OperationalError, connections
+from django.middleware import csrf
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from . import routers
+from .compression import choose_encoding, compress, min_length, weaken_etag
+from .instrumentation import current_timings, end_request, start_request, timed
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# WSGI and ASGI
+# =====================================================
+class DualModeMiddleware:
+    """
+    Base for middleware that runs natively under both WSGI and ASGI, so an
+    async view is not forced back onto a thread. Subclasses implement
+    ``__call__`` and ``__acall__`` and start ``__call__`` with
+    ``if self.async_mode: return self.__acall__(request)``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            if hasattr(self, "process_view"):
+                # Our process_view hooks only note things on the request; Django
+                # would otherwise run them through sync_to_async.
+                self.process_view = inline_coroutine(self.process_view)
+
+
+def inline_coroutine(func):
+    async def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """WhiteNoise that stays out of the way of async views (it is sync-only)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+# =====================================================
+# Server-Timing / request timing logs
+# =====================================================
+class ServerTimingMiddleware(DualModeMiddleware):
+    """
+    Time DB queries, serialization, Cloudinary calls, the view and the whole
+    request, and report them in a Server-Timing header and a log line.
+
+    Only a SERVER_TIMING_SAMPLE_RATE fraction of requests is instrumented.
+    Any request slower than SERVER_TIMING_SLOW_MS is logged as a warning,
+    sampled or not (unsampled ones with their total time only). Put it
+    first in MIDDLEWARE so "total" covers the other middleware too.
+
+    Under ASGI, queries run on Django's database thread, outside the hooks
+    installed here, so "db" is not broken out of the other metrics there.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        self.slow_ms = settings.SERVER_TIMING_SLOW_MS
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        if random.random() >= self.sample_rate:
+            response = self.get_response(request)
+            total_ms = (time.perf_counter() - started) * 1000
+            if total_ms >= self.slow_ms:
+                self.log(request, response, {"total": round(total_ms, 2)}, sampled=False)
+            return response
+
+        timings, token = start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        if random.random() >= self.sample_rate:
+            response = await self.get_response(request)
+            total_ms = (time.perf_counter() - started) * 1000
+            if total_ms >= self.slow_ms:
+                self.log(request, response, {"total": round(total_ms, 2)}, sampled=False)
+            return response
+
+        timings, token = start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, timings, started)
+
+    def finish(self, request, response, timings, started):
+        finished = time.perf_counter()
+        view_started = getattr(request, "_timing_view_started", None)
+        if view_started is not None:
+            timings.add("view", (finished - view_started) * 1000)
+        timings.add("total", (finished - started) * 1000)
+        response["Server-Timing"] = timings.header()
+        self.log(request, response, timings.as_dict(), sampled=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if current_timings() is not None:
+            request._timing_view_started = time.perf_counter()
+
+    def log(self, request, response, metrics, sampled):
+        slow = metrics["total"] >= self.slow_ms
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "sampled": sampled,
+            "slow": slow,
+            **metrics,
+        }
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            "request_timing %s", json.dumps(record), extra={"timing": record},
+        )
+
+
+# =====================================================
+# Brotli / gzip for API JSON
+# =====================================================
+class APICompressionMiddleware(DualModeMiddleware):
+    """
+    Compress JSON responses with br or gzip, whichever the client prefers.
+
+    Responses that already carry a Content-Encoding (the pre-compressed
+    variants served by booklandapp.cache) pass through untouched. Static
+    files are left to WhiteNoise.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("application/json")
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < min_length():
+            return response
+
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+
+        with timed("compress"):
+            compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        return weaken_etag(response)
+
+
+# =====================================================
+# Read replica routing (see booklandapp/routers.py)
+# =====================================================
+class ReplicaRoutingMiddleware(DualModeMiddleware):
+    """
+    Send GET/HEAD requests under /api/ to the read replica when one is
+    configured and reachable, unless this client or any content edit wrote
+    within the pin window. A request that writes sets the client's pin
+    cookie. If the replica fails mid-request, the view runs again on the
+    primary.
+    """
+    SAFE_METHODS = ("GET", "HEAD")
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not routers.replica_configured():
+            return self.get_response(request)
+
+        state, token = routers.start_request(self.use_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.end_request(token)
+        return self.pin_writer(request, response, state)
+
+    async def __acall__(self, request):
+        if not routers.replica_configured():
+            return await self.get_response(request)
+
+        # replica_available() connects, which has to happen on the database thread.
+        state, token = routers.start_request(await sync_to_async(self.use_replica)(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.end_request(token)
+        return self.pin_writer(request, response, state)
+
+    def use_replica(self, request):
+        return (
+            request.method in self.SAFE_METHODS
+            and request.path.startswith("/api/")
+            and routers.PIN_COOKIE not in request.COOKIES
+            and not routers.primary_pinned()
+            and routers.replica_available()
+        )
+
+    def pin_writer(self, request, response, state):
+        if state.wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE, "1",
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                secure=request.is_secure(), httponly=True, samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._replica_view = (view_func, view_args, view_kwargs)
+
+    def process_exception(self, request, exception):
+        state = routers.current_state()
+        if state is None or not state.used_replica or not isinstance(exception, (OperationalError, InterfaceError)):
+            return None
+        routers.mark_replica_down(exception)
+        state.use_replica = False
+        # Safe to repeat: only read-only requests are routed to the replica.
+        view_func, view_args, view_kwargs = request._replica_view
+        if iscoroutinefunction(view_func):
+            # Django calls process_exception on a worker thread under ASGI too.
+            return async_to_sync(view_func)(request, *view_args, **view_kwargs)
+        return view_func(request, *view_args, **view_kwargs)
+
+
+# =====================================================
+# Session-free public API
+# =====================================================
+PUBLIC_API_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def is_public_api_read(request):
+    return (
+        settings.PUBLIC_API_FAST_PATH
+        and request.method in PUBLIC_API_METHODS
+        and request.path_info.startswith(settings.PUBLIC_API_PREFIX)
+    )
+
+
+class PublicAPIBypassMixin:
+    """
+    Hand safe requests under PUBLIC_API_PREFIX straight to the next
+    middleware. The session, auth, messages and CSRF middleware below use
+    it: the public API is AllowAny and cookie-free, so those reads neither
+    load nor save a session (which SESSION_SAVE_EVERY_REQUEST would
+    otherwise write back) and their responses do not vary on Cookie.
+    Everything else, the admin included, gets the full treatment.
+    """
+
+    def __call__(self, request):
+        if is_public_api_read(request):
+            self.bypass(request)
+            return self.get_response(request)
+        return super().__call__(request)
+
+    def bypass(self, request):
+        pass
+
+
+class SessionMiddleware(PublicAPIBypassMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class AuthenticationMiddleware(PublicAPIBypassMixin, auth_middleware.AuthenticationMiddleware):
+    def bypass(self, request):
+        # Every public API read is anonymous, whatever cookies it carries.
+        request.user = AnonymousUser()
+
+        async def auser():
+            return request.user
+
+        request.auser = auser
+
+
+class MessageMiddleware(PublicAPIBypassMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(PublicAPIBypassMixin, csrf.CsrfViewMiddleware):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(self):
+            # Under ASGI Django would run process_view on a thread for every
+            # request; skip that for the public reads, which need no check.
+            sync_process_view = self.process_view
+
+            async def process_view(request, *args):
+                if is_public_api_read(request):
+                    return None
+                return await sync_to_async(sync_process_view)(request, *args)
+
+            self.process_view = process_view
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_public_api_read(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
@@ -0,0 +1,47 @@
+import calendar
+import datetime
+
+from django.db import migrations, models
+
+
+MONTH_NUMBERS = {name: number for number, name in enumerate(calendar.month_name) if name}
+
+
+def populate_event_date(apps, schema_editor):
+    Event = apps.get_model("booklandapp", "Event")
+    events = list(Event.objects.only("id", "month", "day", "year"))
+    for event in events:
+        month = MONTH_NUMBERS.get(event.month, 1)
+        # Rows saved before validation existed may hold e.g. February 30.
+        day = min(max(event.day, 1), calendar.monthrange(event.year, month)[1])
+        event.event_date = datetime.date(event.year, month, day)
+    Event.objects.bulk_update(events, ["event_date"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booklandapp', '0024_add_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='event_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_event_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='event',
+            name='event_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_date', 'id'], name='event_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'event_date'], name='event_category_date_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booklandapp', '0026_pendingsubmission'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumnimessage',
+            name='image_status',
+            field=models.CharField(choices=[('ready', 'Ready'), ('pending', 'Uploading'), ('failed', 'Upload failed')], default='ready', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='featuredevent',
+            name='image_status',
+            field=models.CharField(choices=[('ready', 'Ready'), ('pending', 'Uploading'), ('failed', 'Upload failed')], default='ready', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='image_status',
+            field=models.CharField(choices=[('ready', 'Ready'), ('pending', 'Uploading'), ('failed', 'Upload failed')], default='ready', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='leadershipmessage',
+            name='image_status',
+            field=models.CharField(choices=[('ready', 'Ready'), ('pending', 'Uploading'), ('failed', 'Upload failed')], default='ready', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='testimonialsmessage',
+            name='image_status',
+            field=models.CharField(choices=[('ready', 'Ready'), ('pending', 'Uploading'), ('failed', 'Upload failed')], default='ready', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('folder', models.CharField(max_length=100)),
+                ('staged_path', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='imageupload_status_idx'), models.Index(fields=['content_type', 'object_id'], name='imageupload_target_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booklandapp', '0027_image_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageupload',
+            name='batch',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booklandapp', '0030_image_asset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feestructure',
+            name='pdf_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='feestructure',
+            name='pdf_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='feestructure',
+            name='pdf_url',
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:17
+
+from django.db import migrations, models
+
+
+# kind -> (model, title fields, body fields), as in booklandapp/search.py.
+SOURCES = {
+    "event": ("Event", ("title",), ("description", "location")),
+    "testimonial": ("TestimonialsMessage", ("name",), ("testimonial",)),
+    "alumni": ("AlumniMessage", ("name",), ("message",)),
+    "leadership": ("LeadershipMessage", ("salutation", "name"), ("message",)),
+}
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE booklandapp_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig, coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX searchdocument_vector_idx ON booklandapp_searchdocument USING gin (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS searchdocument_vector_idx",
+    "ALTER TABLE booklandapp_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+# External-content FTS5 table: it stores only the index, the triggers keep
+# it in step with booklandapp_searchdocument.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE booklandapp_searchdocument_fts USING fts5(
+        title, body,
+        content='booklandapp_searchdocument', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER booklandapp_searchdocument_fts_insert AFTER INSERT ON booklandapp_searchdocument BEGIN
+        INSERT INTO booklandapp_searchdocument_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER booklandapp_searchdocument_fts_delete AFTER DELETE ON booklandapp_searchdocument BEGIN
+        INSERT INTO booklandapp_searchdocument_fts (booklandapp_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER booklandapp_searchdocument_fts_update AFTER UPDATE ON booklandapp_searchdocument BEGIN
+        INSERT INTO booklandapp_searchdocument_fts (booklandapp_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO booklandapp_searchdocument_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS booklandapp_searchdocument_fts_insert",
+    "DROP TRIGGER IF EXISTS booklandapp_searchdocument_fts_delete",
+    "DROP TRIGGER IF EXISTS booklandapp_searchdocument_fts_update",
+    "DROP TABLE IF EXISTS booklandapp_searchdocument_fts",
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def populate_documents(apps, schema_editor):
+    SearchDocument = apps.get_model("booklandapp", "SearchDocument")
+    documents = []
+    for kind, (model_name, title_fields, body_fields) in SOURCES.items():
+        model = apps.get_model("booklandapp", model_name)
+        for values in model.objects.values("pk", *title_fields, *body_fields).iterator():
+            documents.append(SearchDocument(
+                kind=kind,
+                object_id=values["pk"],
+                title=" ".join(str(values[name]) for name in title_fields if values[name])[:255],
+                body="\n".join(str(values[name]) for name in body_fields if values[name]),
+            ))
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booklandapp', '0031_fee_pdf_mirror'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('event', 'Event'), ('testimonial', 'Testimonial'), ('alumni', 'Alumni message'), ('leadership', 'Leadership message')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='searchdocument_target_uniq')],
+            },
+        ),
+        migrations.RunPython(
+            run_vendor_sql({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            run_vendor_sql({"postgresql": POSTGRES_REVERSE, "sqlite": SQLITE_REVERSE}),
+        ),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:37
+
+from django.db import DatabaseError, migrations, models, transaction
+
+
+# The admin searches with icontains, which Postgres runs as
+# UPPER(column::text) LIKE UPPER('%term%'): no btree index can serve that,
+# a trigram index on the same expression can.
+TRIGRAM_INDEXES = [
+    ("admissionmessage_name_trgm", "booklandapp_admissionmessage", "name"),
+    ("admissionmessage_email_trgm", "booklandapp_admissionmessage", "email"),
+    ("enquirymessages_name_trgm", "booklandapp_enquirymessages", "name"),
+    ("enquirymessages_email_trgm", "booklandapp_enquirymessages", "email"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError:
+        # Creating extensions needs privileges the role may not have; the
+        # admin search still works, only without these indexes.
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booklandapp', '0032_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='admissionmessage',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='admissionmessage',
+            name='name',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='enquirymessages',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='enquirymessages',
+            name='name',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
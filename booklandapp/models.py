@@ -1,5 +1,10 @@
 import datetime
-from django.db import models
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.urls import reverse
 from cloudinary.models import CloudinaryField
 
 
@@ -7,21 +12,22 @@ from cloudinary.models import CloudinaryField
 # Admission Messages
 # =========================
 class AdmissionMessage(models.Model):
-    name = models.CharField(max_length=50)
-    email = models.EmailField()
+    name = models.CharField(max_length=50, db_index=True)
+    email = models.EmailField(db_index=True)
     phone = models.IntegerField()
     message = models.TextField()
 
     def __str__(self):
-        return f"{self.name} - {self.message}"
+        # Not the message: the admin labels every changelist row with this.
+        return f"{self.name} - {self.email}"
 
 
 # =========================
 # Enquiry Messages
 # =========================
 class EnquiryMessages(models.Model):
-    name = models.CharField(max_length=50)
-    email = models.EmailField()
+    name = models.CharField(max_length=50, db_index=True)
+    email = models.EmailField(db_index=True)
     subject = models.CharField(max_length=50)
     message = models.TextField()
 
@@ -29,14 +35,155 @@ class EnquiryMessages(models.Model):
         return f"{self.name} - {self.subject}"
 
 
+# =========================
+# Submission Queue
+# =========================
+class PendingSubmission(models.Model):
+    """
+    A validated admission/contact form waiting for the process_submissions
+    worker to save it and send the notification email.
+    """
+    KIND_ADMISSION = "admission"
+    KIND_ENQUIRY = "enquiry"
+    KIND_CHOICES = [
+        (KIND_ADMISSION, "Admission"),
+        (KIND_ENQUIRY, "Enquiry"),
+    ]
+
+    STATUS_QUEUED = "queued"  # not saved yet
+    STATUS_SAVED = "saved"  # saved, notification pending
+    STATUS_FAILED = "failed"  # gave up; see last_error
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_SAVED, "Saved"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    record_id = models.BigIntegerField(null=True, blank=True)  # saved AdmissionMessage / EnquiryMessages id
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="submission_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+
+# =========================
+# Images (uploaded off-request, see booklandapp/uploads.py)
+# =========================
+class ImageAsset(models.Model):
+    """What an uploaded image is, recorded once so nothing has to fetch it to find out."""
+    LANDSCAPE = "landscape"
+    PORTRAIT = "portrait"
+    SQUARE = "square"
+    ORIENTATION_CHOICES = [
+        (LANDSCAPE, "Landscape"),
+        (PORTRAIT, "Portrait"),
+        (SQUARE, "Square"),
+    ]
+
+    url = models.URLField(max_length=500)
+    public_id = models.CharField(max_length=255, blank=True)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    bytes = models.PositiveBigIntegerField(null=True, blank=True)
+    format = models.CharField(max_length=10, blank=True)
+    orientation = models.CharField(max_length=10, choices=ORIENTATION_CHOICES, db_index=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.public_id or self.url} ({self.width}x{self.height})"
+
+    @classmethod
+    def orientation_for(cls, width, height):
+        if width > height:
+            return cls.LANDSCAPE
+        if height > width:
+            return cls.PORTRAIT
+        return cls.SQUARE
+
+    def save(self, *args, **kwargs):
+        self.orientation = self.orientation_for(self.width, self.height)
+        super().save(*args, **kwargs)
+
+
+class ImageModel(models.Model):
+    """Base for models whose ``image`` URL is filled in by an ImageUpload."""
+    IMAGE_READY = "ready"
+    IMAGE_PENDING = "pending"
+    IMAGE_FAILED = "failed"
+    IMAGE_STATUS_CHOICES = [
+        (IMAGE_READY, "Ready"),
+        (IMAGE_PENDING, "Uploading"),
+        (IMAGE_FAILED, "Upload failed"),
+    ]
+
+    image_status = models.CharField(max_length=10, choices=IMAGE_STATUS_CHOICES, default=IMAGE_READY)
+    # Sizes, srcset and placeholder for ``image``; see booklandapp/images.py.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    image_asset = models.ForeignKey(
+        ImageAsset, null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="+"
+    )
+
+    class Meta:
+        abstract = True
+
+
+class ImageUpload(models.Model):
+    """
+    A staged image file waiting to be uploaded and written to
+    ``target.image``. Deleted once the upload succeeds.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_FAILED = "failed"  # gave up; see last_error
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    target = GenericForeignKey("content_type", "object_id")
+    folder = models.CharField(max_length=100)
+    staged_path = models.CharField(max_length=500)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Not picked up before this; also set while a worker holds the upload.
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    batch = models.UUIDField(null=True, blank=True, db_index=True)  # admin bulk upload it came from
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="imageupload_status_idx"),
+            models.Index(fields=["content_type", "object_id"], name="imageupload_target_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.folder} upload #{self.pk} ({self.status})"
+
+
 # =========================
 # Testimonials
 # =========================
-class TestimonialsMessage(models.Model):
+class TestimonialsMessage(ImageModel):
     name = models.CharField(max_length=50)
     image = models.URLField(blank=True, null=True)  # Cloudinary URL
     title = models.CharField(max_length=50)
     testimonial = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} - {self.title}"
@@ -45,12 +192,13 @@ class TestimonialsMessage(models.Model):
 # =========================
 # Leadership Messages
 # =========================
-class LeadershipMessage(models.Model):
+class LeadershipMessage(ImageModel):
     salutation = models.CharField(max_length=10)
     name = models.CharField(max_length=50)
     image = models.URLField(blank=True, null=True)  # Cloudinary URL
     designation = models.CharField(max_length=50)
     message = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} - {self.designation}"
@@ -67,7 +215,7 @@ def year_choices():
     return [(r, r) for r in range(2014, current_year() + 1)]
 
 
-class AlumniMessage(models.Model):
+class AlumniMessage(ImageModel):
     name = models.CharField(max_length=50)
     image = models.URLField(blank=True, null=True)  # Cloudinary URL
     title = models.CharField(max_length=100)
@@ -76,6 +224,7 @@ class AlumniMessage(models.Model):
         default=current_year
     )
     message = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} - {self.title}"
@@ -107,16 +256,41 @@ class FeeStructure(models.Model):
         null=True,
         help_text="Upload PDF file (public)"
     )
+    # Cloudinary URL of fee_structure_file, built once when the file changes.
+    pdf_url = models.URLField(max_length=500, blank=True, editable=False)
+    # Set once the PDF is mirrored to FEE_PDF_MIRROR_DIR (booklandapp/feepdfs.py).
+    pdf_sha256 = models.CharField(max_length=64, blank=True, editable=False)
+    pdf_size = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     @property
     def file_url(self):
-        """Return fully public PDF URL"""
+        """Return fully public PDF URL: the local mirror when there is one, else Cloudinary"""
+        if self.pdf_sha256 and settings.FEE_PDF_MIRROR:
+            path = reverse("api_fee_pdf", args=[self.pk])
+            return f"{settings.PUBLIC_BASE_URL}{path}?v={self.pdf_sha256[:16]}"
+        if self.pdf_url:
+            return self.pdf_url
         if self.fee_structure_file:
             return self.fee_structure_file.url  # Cloudinary public URL
         return None
 
+    def save(self, *args, **kwargs):
+        # The field uploads new files in super().save(), so the URL is only known after it.
+        super().save(*args, **kwargs)
+        field = self._meta.get_field("fee_structure_file")
+        resource = field.to_python(self.fee_structure_file)
+        url = resource.url if resource else ""
+        if url != self.pdf_url:
+            # A new file: its mirror (if any) is now stale.
+            self.pdf_url, self.pdf_sha256, self.pdf_size = url, "", None
+            FeeStructure.objects.filter(pk=self.pk).update(pdf_url=url, pdf_sha256="", pdf_size=None)
+            if url and settings.FEE_PDF_MIRROR:
+                from .feepdfs import schedule_mirror  # feepdfs imports this module
+                transaction.on_commit(lambda: schedule_mirror(self.pk))
+
     def __str__(self):
         return self.level
 
@@ -150,6 +324,9 @@ class Event(models.Model):
         ('December', 'December'),
     ]
 
+    # Calendar order of the month names, for sorting and date arithmetic.
+    MONTH_NUMBERS = {name: number for number, (name, _) in enumerate(MONTH_CHOICES, start=1)}
+
     title = models.CharField(max_length=255)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
     month = models.CharField(max_length=20, choices=MONTH_CHOICES)
@@ -159,20 +336,51 @@ class Event(models.Model):
     end_time = models.TimeField()
     location = models.CharField(max_length=255)
     description = models.TextField()
+    # Derived from month/day/year in save() so date ranges can use an index.
+    event_date = models.DateField(editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["event_date", "id"], name="event_date_id_idx"),
+            # The order of the events list and its pages.
+            models.Index(fields=["-year", "event_date", "id"], name="event_year_date_id_idx"),
+            models.Index(fields=["category", "event_date"], name="event_category_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.month} {self.day}, {self.year}"
 
+    def build_event_date(self):
+        return datetime.date(self.year, self.MONTH_NUMBERS[self.month], self.day)
+
+    def clean(self):
+        super().clean()
+        if self.year is None or self.day is None:
+            return  # already reported by the field validation
+        try:
+            self.build_event_date()
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError({"day": f"{self.month} {self.day}, {self.year} is not a valid date."})
+
+    def save(self, *args, **kwargs):
+        self.event_date = self.build_event_date()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "event_date"}
+        super().save(*args, **kwargs)
+
 
 # =========================
 # Featured Events
 # =========================
-class FeaturedEvent(models.Model):
+class FeaturedEvent(ImageModel):
     title = models.CharField(max_length=255)
     start_date = models.DateField()
     end_date = models.DateField(blank=True, null=True)
     image = models.URLField(blank=True, null=True)  # Cloudinary URL
     description = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Featured Event"
@@ -181,18 +389,23 @@ class FeaturedEvent(models.Model):
     def __str__(self):
         return self.title
 
+    @staticmethod
+    def format_date_range(start_date, end_date):
+        if end_date:
+            return f"{start_date.strftime('%B %d')} - {end_date.strftime('%d, %Y')}"
+        return start_date.strftime('%B %d, %Y')
+
     def get_date_range_display(self):
-        if self.end_date:
-            return f"{self.start_date.strftime('%B %d')} - {self.end_date.strftime('%d, %Y')}"
-        return self.start_date.strftime('%B %d, %Y')
+        return self.format_date_range(self.start_date, self.end_date)
 
 
 # =========================
 # Gallery Images
 # =========================
-class GalleryImage(models.Model):
+class GalleryImage(ImageModel):
     title = models.CharField(max_length=255, blank=True)
     image = models.URLField(blank=True, null=True)  # Cloudinary URL
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title or "Gallery Image"
@@ -219,6 +432,7 @@ class KeyAdmissionDeadline(models.Model):
     deadline_date = models.DateField(
         help_text="Deadline date"
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Key Admission Deadline"
@@ -227,3 +441,39 @@ class KeyAdmissionDeadline(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.deadline_date.strftime('%B %d, %Y')}"
+
+
+# =========================
+# Search index (see booklandapp/search.py)
+# =========================
+class SearchDocument(models.Model):
+    """
+    The searchable text of one event, testimonial, alumni or leadership
+    message. The full-text index over it is database specific and created
+    in migration 0032: a generated tsvector column with a GIN index on
+    Postgres, an FTS5 table kept in step by triggers on SQLite.
+    """
+    KIND_EVENT = "event"
+    KIND_TESTIMONIAL = "testimonial"
+    KIND_ALUMNI = "alumni"
+    KIND_LEADERSHIP = "leadership"
+    KIND_CHOICES = [
+        (KIND_EVENT, "Event"),
+        (KIND_TESTIMONIAL, "Testimonial"),
+        (KIND_ALUMNI, "Alumni message"),
+        (KIND_LEADERSHIP, "Leadership message"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="searchdocument_target_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
@@ -0,0 +1,165 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+from django.db import models
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+# =====================================================
+# Keyset (cursor) pagination
+# =====================================================
+class KeysetPagination(BasePagination):
+    """
+    Opt-in cursor pagination that seeks past the last row instead of using
+    OFFSET, so every page costs the same as the first one.
+
+    Pagination only kicks in when the request has a ``limit`` or ``cursor``
+    parameter; otherwise the view keeps returning the plain list. ``ordering``
+    is a tuple of columns ending in a unique one, each ascending or, with a
+    leading "-", descending, and ``get_key`` reads the same values back from
+    the last row of the page to build the cursor: the values() row it was
+    serialized from when the view passes ``rows``, else the serialized item.
+    """
+    default_limit = 20
+    max_limit = 100
+
+    def __init__(self, ordering, get_key):
+        self.ordering = ordering
+        self.get_key = get_key
+        self.limit = self.default_limit
+
+    def is_requested(self, request):
+        return "limit" in request.GET or "cursor" in request.GET
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return the page as a lazy queryset, or None when not requested.
+
+        It holds one row more than ``limit`` so get_paginated_response() can
+        tell whether there is a next page; serialize it as is.
+        """
+        if not self.is_requested(request):
+            return None
+
+        self.limit = self.get_limit(request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.GET.get("cursor")
+        if cursor:
+            key = self.parse_key(self.decode_cursor(cursor), queryset.model)
+            queryset = queryset.filter(self.seek_filter(key))
+        return queryset[:self.limit + 1]
+
+    def get_paginated_response(self, data, rows=None):
+        return Response(self.get_paginated_data(data, rows))
+
+    def get_paginated_data(self, data, rows=None):
+        """The response body for a page; the async views render it themselves."""
+        has_next = len(data) > self.limit
+        data = list(data[:self.limit])
+        next_cursor = None
+        if has_next:
+            last = rows[self.limit - 1] if rows is not None else data[-1]
+            next_cursor = self.encode_cursor(self.get_key(last))
+        return {"next": next_cursor, "results": data}
+
+    def get_limit(self, request):
+        raw = request.GET.get("limit")
+        if not raw:
+            return self.default_limit
+        try:
+            limit = int(raw)
+        except ValueError:
+            raise ValidationError({"limit": ["A valid integer is required."]})
+        if limit < 1:
+            raise ValidationError({"limit": ["Ensure this value is greater than or equal to 1."]})
+        return min(limit, self.max_limit)
+
+    def seek_filter(self, key):
+        """
+        Build ``(c1, c2, ...) > (v1, v2, ...)`` as OR-ed equality prefixes,
+        with ``<`` in place of ``>`` for the descending columns.
+
+        The leading ``c1 >= v1`` is redundant but lets the planner use an
+        index range scan on the first column.
+        """
+        names = [field.lstrip("-") for field in self.ordering]
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            prefix = {name: value for name, value in zip(names[:i], key)}
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**prefix, **{f"{names[i]}__{lookup}": key[i]})
+        lookup = "lte" if self.ordering[0].startswith("-") else "gte"
+        return Q(**{f"{names[0]}__{lookup}": key[0]}) & condition
+
+    def encode_cursor(self, key):
+        raw = json.dumps(list(key), separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            key = None
+        if (
+            not isinstance(key, list)
+            or len(key) != len(self.ordering)
+            or not all(isinstance(value, (int, str)) for value in key)
+        ):
+            raise ValidationError({"cursor": ["Invalid cursor."]})
+        return key
+
+    def parse_key(self, key, model):
+        """
+        Check each cursor value against its ordering column: an ISO date for
+        a DateField, an int for an integer column (id, year). A cursor that
+        decodes but does not fit would otherwise fail in the query.
+        """
+        parsed = []
+        for name, value in zip(self.ordering, key):
+            field = model._meta.get_field(name.lstrip("-"))
+            try:
+                if isinstance(field, models.DateField):
+                    value = date.fromisoformat(value)
+                elif isinstance(field, models.IntegerField) and not isinstance(value, int):
+                    raise TypeError(value)
+            except (TypeError, ValueError):
+                raise ValidationError({"cursor": ["Invalid cursor."]})
+            parsed.append(value)
+        return parsed
+
+
+# =====================================================
+# Ranked results (search)
+# =====================================================
+class RankedPagination(KeysetPagination):
+    """
+    Cursor pagination for results ordered by a computed rank, which has no
+    column to seek on, so the cursor holds an offset. ``max_offset`` caps how
+    deep a client can page, since each page re-ranks every match before it.
+    """
+    max_offset = 1000
+
+    def __init__(self):
+        super().__init__(ordering=("offset",), get_key=None)
+        self.offset = 0
+
+    def get_window(self, request):
+        """(offset, limit) for this page; fetch ``limit + 1`` results."""
+        self.limit = self.get_limit(request)
+        cursor = request.GET.get("cursor")
+        self.offset = self.decode_cursor(cursor)[0] if cursor else 0
+        if not isinstance(self.offset, int) or not 0 <= self.offset <= self.max_offset:
+            raise ValidationError({"cursor": ["Invalid cursor."]})
+        return self.offset, self.limit
+
+    def get_paginated_data(self, data, rows=None):
+        has_next = len(data) > self.limit and self.offset + self.limit <= self.max_offset
+        data = list(data[:self.limit])
+        next_cursor = self.encode_cursor([self.offset + self.limit]) if has_next else None
+        return {"next": next_cursor, "results": data}
@@ -0,0 +1,31 @@
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+# =====================================================
+# NDJSON (one JSON value per line)
+# =====================================================
+class NDJSONParser(BaseParser):
+    """
+    Parse ``application/x-ndjson`` into a list, one item per non-blank line.
+    The body is decoded line by line, so it is never held twice in memory.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        items = []
+        try:
+            for number, line in enumerate(codecs.getreader(encoding)(stream), start=1):
+                if line.strip():
+                    items.append(json.loads(line))
+        except UnicodeDecodeError as exc:
+            raise ParseError(f"NDJSON parse error - {exc}")
+        except ValueError as exc:
+            raise ParseError(f"NDJSON parse error on line {number} - {exc}")
+        return items
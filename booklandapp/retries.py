@@ -0,0 +1,49 @@
+"""
+Leases and exponential backoff for the background queues: image uploads
+(uploads.py) and submission notifications (submissions.py).
+
+Queued rows have ``status``, ``attempts``, ``next_attempt_at`` and
+``last_error`` columns. A worker leases the due rows it takes, pushing
+``next_attempt_at`` LEASE ahead and counting the attempt, so no transaction
+stays open while it works and a worker that dies leaves its rows to a later
+retry. A failed attempt is retried after ``retry_delay()``, until
+``max_attempts`` have been used up.
+"""
+from datetime import timedelta
+
+from django.db.models import F, Q
+
+# How long a leased row is left to its worker before another may retry it.
+LEASE = timedelta(minutes=10)
+
+# Columns record_failure() changes.
+FAILURE_FIELDS = ["status", "next_attempt_at", "last_error"]
+
+
+def retry_delay(attempts):
+    return timedelta(minutes=2 ** min(attempts, 8))
+
+
+def due(queryset, now):
+    """Rows of ``queryset`` not waiting out a backoff or another worker's lease."""
+    return queryset.filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+
+
+def lease(queryset, now):
+    """Lease the rows of ``queryset`` and count the attempt. Returns how many."""
+    return queryset.update(attempts=F("attempts") + 1, next_attempt_at=now + LEASE)
+
+
+def record_failure(item, exc, max_attempts, failed_status, now):
+    """
+    Set FAILURE_FIELDS on ``item`` after its leased attempt failed with
+    ``exc``: due again after the backoff, or ``failed_status`` once it has
+    had ``max_attempts``. Returns True when it gave up. The caller saves.
+    """
+    item.last_error = str(exc)
+    if item.attempts >= max_attempts:
+        item.status = failed_status
+        item.next_attempt_at = None
+        return True
+    item.next_attempt_at = now + retry_delay(item.attempts)
+    return False
@@ -0,0 +1,140 @@
+"""
+Read-replica routing for the public API.
+
+ReplicaRoutingMiddleware (middleware.py) opts a request in with
+``start_request(True)`` when it is a GET/HEAD under /api/ and nothing asks
+for the primary; ReplicaRouter then sends that request's reads of this
+app's models to the DATABASE_REPLICA_ALIAS connection. Everything else
+(writes, the admin, management commands, background threads) uses
+"default".
+
+Reads go back to the primary:
+
+* for the rest of a request once it has written anything;
+* for DATABASE_REPLICA_PIN_SECONDS after a write, for the client that made
+  it (a cookie) and, after any content change, for every request on the
+  host (the modification time of DATABASE_REPLICA_PIN_PATH, which all
+  workers see), so the API cache is never refilled from a replica that has
+  not caught up;
+* for DATABASE_REPLICA_RETRY_SECONDS after the replica failed to connect
+  or errored mid-request.
+
+The replica connection is tested at most every
+DATABASE_REPLICA_CHECK_SECONDS, not on every request; a failure in between
+is caught by ReplicaRoutingMiddleware, which reruns the view on the primary.
+"""
+import contextvars
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+ROUTED_APPS = {"booklandapp"}
+PIN_COOKIE = "db_primary"
+
+_state = contextvars.ContextVar("db_routing", default=None)
+_down_until = 0.0
+_checked_until = 0.0
+
+
+class RoutingState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.used_replica = False
+        self.wrote = False
+
+
+def replica_configured():
+    return settings.DATABASE_REPLICA_ALIAS in settings.DATABASES
+
+
+def start_request(use_replica):
+    """Begin routing for the current context; returns ``(state, token)``."""
+    state = RoutingState(use_replica)
+    return state, _state.set(state)
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+def current_state():
+    return _state.get()
+
+
+# =====================================================
+# Replica health and primary pins
+# =====================================================
+def replica_available():
+    global _checked_until
+    now = time.monotonic()
+    if now < _down_until:
+        return False
+    if now < _checked_until:
+        return True
+    connection = connections[settings.DATABASE_REPLICA_ALIAS]
+    try:
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
+        connection.ensure_connection()
+    except DatabaseError as exc:
+        mark_replica_down(exc)
+        return False
+    _checked_until = now + settings.DATABASE_REPLICA_CHECK_SECONDS
+    return True
+
+
+def mark_replica_down(exc):
+    global _down_until
+    _down_until = time.monotonic() + settings.DATABASE_REPLICA_RETRY_SECONDS
+    logger.warning(
+        "Read replica unavailable, using the primary for %ss: %s", settings.DATABASE_REPLICA_RETRY_SECONDS, exc
+    )
+
+
+def pin_primary():
+    """Keep every request's reads on the primary for the pin window."""
+    until = time.time() + settings.DATABASE_REPLICA_PIN_SECONDS
+    path = settings.DATABASE_REPLICA_PIN_PATH
+    try:
+        with open(path, "a"):
+            pass
+        os.utime(path, (until, until))
+    except OSError as exc:
+        logger.warning("Could not pin reads to the primary: %s", exc)
+
+
+def primary_pinned():
+    try:
+        return os.stat(settings.DATABASE_REPLICA_PIN_PATH).st_mtime > time.time()
+    except FileNotFoundError:
+        return False
+    except OSError:
+        # Unreadable pin: the primary is always up to date.
+        return True
+
+
+# =====================================================
+# Router
+# =====================================================
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote or model._meta.app_label not in ROUTED_APPS:
+            return None
+        state.used_replica = True
+        return settings.DATABASE_REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label in ROUTED_APPS:
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
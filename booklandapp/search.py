@@ -0,0 +1,179 @@
+"""
+Full-text search over events, testimonials, alumni and leadership messages.
+
+Each searchable row has a SearchDocument (title + body) kept current by the
+post_save/post_delete handlers in signals.py; bulk changes need
+``python manage.py rebuild_search_index``. The database does the matching:
+a GIN-indexed tsvector on Postgres, FTS5 on SQLite (migration 0032).
+
+A query matches documents containing every word, the last one as a prefix
+so results appear while the user is still typing. Hits are ranked with
+title matches above body matches and come with an HTML snippet of the body
+in which the matched words are wrapped in ``<mark>``.
+"""
+import html
+import re
+
+from django.db import connection
+
+from .models import AlumniMessage, Event, LeadershipMessage, SearchDocument, TestimonialsMessage
+
+# kind -> (model, title fields, body fields). Migration 0032 builds the
+# initial documents the same way.
+SOURCES = {
+    SearchDocument.KIND_EVENT: (Event, ("title",), ("description", "location")),
+    SearchDocument.KIND_TESTIMONIAL: (TestimonialsMessage, ("name",), ("testimonial",)),
+    SearchDocument.KIND_ALUMNI: (AlumniMessage, ("name",), ("message",)),
+    SearchDocument.KIND_LEADERSHIP: (LeadershipMessage, ("salutation", "name"), ("message",)),
+}
+KIND_FOR_MODEL = {model: kind for kind, (model, _, _) in SOURCES.items()}
+
+TEXT_SEARCH_CONFIG = "english"  # must match the generated column in 0032
+MAX_TERMS = 8
+SNIPPET_WORDS = 24
+# Placeholders for the highlight tags, swapped in after escaping the snippet.
+MARK_START = "\x02"
+MARK_END = "\x03"
+TERM_RE = re.compile(r"\w+")
+
+
+# =====================================================
+# Indexing
+# =====================================================
+def build_document(kind, values):
+    """Title and body for a row, given its field values by name."""
+    _, title_fields, body_fields = SOURCES[kind]
+    title = " ".join(str(values[name]) for name in title_fields if values[name])
+    body = "\n".join(str(values[name]) for name in body_fields if values[name])
+    return title[:255], body
+
+
+def index_instance(instance, update_fields=None):
+    """
+    Create or refresh the document of a saved row. A save limited by
+    ``update_fields`` to columns the document does not use changes nothing.
+    """
+    kind = KIND_FOR_MODEL[type(instance)]
+    _, title_fields, body_fields = SOURCES[kind]
+    fields = {*title_fields, *body_fields}
+    if update_fields is not None and not fields & set(update_fields):
+        return
+    if fields & instance.get_deferred_fields():
+        # Loaded with only()/defer(): fetch the text in one query, not one per field.
+        values = type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+        if values is None:
+            return
+    else:
+        values = {name: getattr(instance, name) for name in fields}
+    title, body = build_document(kind, values)
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=instance.pk, defaults={"title": title, "body": body}
+    )
+
+
+def remove_instance(instance):
+    SearchDocument.objects.filter(kind=KIND_FOR_MODEL[type(instance)], object_id=instance.pk).delete()
+
+
+def rebuild_index(kinds=None, batch_size=500):
+    """Recreate the documents for ``kinds`` (default: all); returns how many."""
+    total = 0
+    for kind in kinds or SOURCES:
+        model, title_fields, body_fields = SOURCES[kind]
+        SearchDocument.objects.filter(kind=kind).delete()
+        rows = model.objects.values("pk", *title_fields, *body_fields).order_by("pk")
+        batch = []
+        for values in rows.iterator(chunk_size=batch_size):
+            title, body = build_document(kind, values)
+            batch.append(SearchDocument(kind=kind, object_id=values["pk"], title=title, body=body))
+            if len(batch) >= batch_size:
+                SearchDocument.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+# =====================================================
+# Querying
+# =====================================================
+def query_terms(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def search(query, kinds=None, offset=0, limit=20):
+    """
+    Ranked hits for ``query``: dicts with type, id, title (plain text),
+    snippet (HTML) and rank, best first. ``kinds`` limits the document kinds
+    searched. Ranks only compare hits of the same query and backend.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    if connection.vendor == "postgresql":
+        sql, params = postgres_sql(terms, kinds, offset, limit)
+    elif connection.vendor == "sqlite":
+        sql, params = sqlite_sql(terms, kinds, offset, limit)
+    else:
+        raise NotImplementedError(f"Search is not available on {connection.vendor}")
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {"type": kind, "id": object_id, "title": title, "snippet": highlight(snippet), "rank": rank}
+        for kind, object_id, title, snippet, rank in rows
+    ]
+
+
+def kind_filter(kinds, column):
+    if not kinds:
+        return "", []
+    return f" AND {column} IN ({', '.join(['%s'] * len(kinds))})", list(kinds)
+
+
+def postgres_sql(terms, kinds, offset, limit):
+    # Rank and page first, so ts_headline() only runs on the returned rows.
+    tsquery = " & ".join(terms[:-1] + [terms[-1] + ":*"])
+    kind_sql, kind_params = kind_filter(kinds, "d.kind")
+    sql = f"""
+        SELECT hit.kind, hit.object_id, hit.title,
+               ts_headline(%s, hit.body, hit.query, %s) AS snippet, hit.rank
+        FROM (
+            SELECT d.id, d.kind, d.object_id, d.title, d.body, q.query,
+                   ts_rank_cd(d.search_vector, q.query) AS rank
+            FROM booklandapp_searchdocument d, to_tsquery(%s, %s) AS q(query)
+            WHERE d.search_vector @@ q.query{kind_sql}
+            ORDER BY rank DESC, d.id
+            LIMIT %s OFFSET %s
+        ) hit
+        ORDER BY hit.rank DESC, hit.id
+    """
+    options = f'StartSel="{MARK_START}", StopSel="{MARK_END}", MaxWords={SNIPPET_WORDS}, MinWords=8'
+    params = [TEXT_SEARCH_CONFIG, options, TEXT_SEARCH_CONFIG, tsquery, *kind_params, limit, offset]
+    return sql, params
+
+
+def sqlite_sql(terms, kinds, offset, limit):
+    # Quoted terms are taken literally by FTS5, whatever the user typed.
+    match = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+    kind_sql, kind_params = kind_filter(kinds, "d.kind")
+    # bm25() is lower for better matches; the weights favour the title column.
+    sql = f"""
+        SELECT d.kind, d.object_id, d.title,
+               snippet(booklandapp_searchdocument_fts, 1, %s, %s, '…', %s) AS snippet,
+               -bm25(booklandapp_searchdocument_fts, 10.0, 1.0) AS rank
+        FROM booklandapp_searchdocument_fts
+        JOIN booklandapp_searchdocument d ON d.id = booklandapp_searchdocument_fts.rowid
+        WHERE booklandapp_searchdocument_fts MATCH %s{kind_sql}
+        ORDER BY rank DESC, d.id
+        LIMIT %s OFFSET %s
+    """
+    params = [MARK_START, MARK_END, SNIPPET_WORDS, match, *kind_params, limit, offset]
+    return sql, params
+
+
+def highlight(snippet):
+    """Escape a snippet and turn the match placeholders into <mark> tags."""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
@@ -15,25 +15,36 @@ from .models import (
     KeyAdmissionDeadline,
 )
 
+
+def format_time(value):
+    return value.strftime("%I:%M %p") if value else None
+
+
 # ==============================
 # READ SERIALIZERS
 # ==============================
-class TestimonialsMessageSerializer(serializers.ModelSerializer):
+class ImageAssetFieldsMixin(serializers.Serializer):
+    """Dimensions of ``image`` from its ImageAsset, or null when unknown."""
+    image_width = serializers.IntegerField(source="image_asset.width", read_only=True, allow_null=True)
+    image_height = serializers.IntegerField(source="image_asset.height", read_only=True, allow_null=True)
+
+
+class TestimonialsMessageSerializer(ImageAssetFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TestimonialsMessage
-        fields = ["id", "name", "title", "testimonial", "image"]
+        fields = ["id", "name", "title", "testimonial", "image", "image_variants", "image_width", "image_height"]
 
 
-class LeadershipMessageSerializer(serializers.ModelSerializer):
+class LeadershipMessageSerializer(ImageAssetFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = LeadershipMessage
-        fields = ["id", "salutation", "name", "designation", "message", "image"]
+        fields = ["id", "salutation", "name", "designation", "message", "image", "image_variants", "image_width", "image_height"]
 
 
-class GalleryImageSerializer(serializers.ModelSerializer):
+class GalleryImageSerializer(ImageAssetFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = GalleryImage
-        fields = ["id", "title", "image"]
+        fields = ["id", "title", "image", "image_variants", "image_width", "image_height"]
 
 
 class FeeStructureSerializer(serializers.ModelSerializer):
@@ -78,27 +89,27 @@ class EventSerializer(serializers.ModelSerializer):
         ]
 
     def get_start_time(self, obj):
-        return obj.start_time.strftime("%I:%M %p") if obj.start_time else None
+        return format_time(obj.start_time)
 
     def get_end_time(self, obj):
-        return obj.end_time.strftime("%I:%M %p") if obj.end_time else None
+        return format_time(obj.end_time)
 
 
-class FeaturedEventSerializer(serializers.ModelSerializer):
+class FeaturedEventSerializer(ImageAssetFieldsMixin, serializers.ModelSerializer):
     date = serializers.SerializerMethodField()
 
     class Meta:
         model = FeaturedEvent
-        fields = ["id", "title", "date", "image", "description"]
+        fields = ["id", "title", "date", "image", "image_variants", "image_width", "image_height", "description"]
 
     def get_date(self, obj):
         return obj.get_date_range_display()
 
 
-class AlumniMessageSerializer(serializers.ModelSerializer):
+class AlumniMessageSerializer(ImageAssetFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = AlumniMessage
-        fields = ["id", "name", "title", "year_of_completion", "message", "image"]
+        fields = ["id", "name", "title", "year_of_completion", "message", "image", "image_variants", "image_width", "image_height"]
 
 
 class KeyAdmissionDeadlineSerializer(serializers.ModelSerializer):
@@ -0,0 +1,48 @@
+"""
+Session store that does not write on every admin request.
+
+The admin's inactivity logout comes from SESSION_SAVE_EVERY_REQUEST with a
+short SESSION_COOKIE_AGE: each request saves the session to push its expiry
+forward, which made every admin page view UPDATE django_session. This store
+(SESSION_ENGINE = "booklandapp.sessions") is Django's database store,
+except that a save that changes nothing is skipped until
+SESSION_REFRESH_FRACTION of the expiry window has passed since the session
+was last written. Saves that change the session's contents always go
+through.
+
+It builds on the plain database store rather than cached_db: the default
+cache is per gunicorn worker, so a logout on one worker would leave the
+session cached, and the cookie working, on the others.
+
+The session still ends at most SESSION_COOKIE_AGE after the last request,
+never later; it may end up to the skipped fraction of the window earlier.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+# Session key holding when the session was last written (POSIX seconds).
+WRITTEN_AT_KEY = "_written_at"
+
+
+class SessionStore(DBStore):
+    def save(self, must_create=False):
+        if not must_create and not self.modified and self.session_key and not self.refresh_due(self._session):
+            return
+        self._session[WRITTEN_AT_KEY] = int(time.time())
+        super().save(must_create)
+
+    async def asave(self, must_create=False):
+        session = await self._aget_session()
+        if not must_create and not self.modified and self.session_key and not self.refresh_due(session):
+            return
+        session[WRITTEN_AT_KEY] = int(time.time())
+        await super().asave(must_create)
+
+    def refresh_due(self, session):
+        written_at = session.get(WRITTEN_AT_KEY)
+        if written_at is None:
+            return True
+        window = self.get_expiry_age(expiry=session.get("_session_expiry"))
+        return time.time() - written_at >= window * settings.SESSION_REFRESH_FRACTION
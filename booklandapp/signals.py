@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db import transaction
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save
+
+from . import dbpool, routers, search, snapshots
+from .cache import invalidate_model
+from .models import (
+    TestimonialsMessage,
+    LeadershipMessage,
+    GalleryImage,
+    FeeStructure,
+    Event,
+    AlumniMessage,
+    FeaturedEvent,
+    KeyAdmissionDeadline,
+)
+
+# =========================
+# API cache invalidation
+# =========================
+CACHED_MODELS = (
+    TestimonialsMessage,
+    LeadershipMessage,
+    GalleryImage,
+    FeeStructure,
+    Event,
+    AlumniMessage,
+    FeaturedEvent,
+    KeyAdmissionDeadline,
+)
+
+
+def invalidate_api_cache(sender, **kwargs):
+    # Wait for the commit so a concurrent read cannot cache the old rows
+    # under the new version.
+    transaction.on_commit(lambda: invalidate_model(sender))
+    if routers.replica_configured():
+        transaction.on_commit(routers.pin_primary)
+    if settings.SNAPSHOT_AUTO:
+        transaction.on_commit(snapshots.schedule_export)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_api_cache, sender=model, dispatch_uid=f"api_cache_save_{model.__name__}")
+    post_delete.connect(invalidate_api_cache, sender=model, dispatch_uid=f"api_cache_delete_{model.__name__}")
+
+
+# =========================
+# Search index
+# =========================
+def index_search_document(sender, instance, update_fields=None, **kwargs):
+    search.index_instance(instance, update_fields)
+
+
+def remove_search_document(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+for model in search.KIND_FOR_MODEL:
+    post_save.connect(index_search_document, sender=model, dispatch_uid=f"search_save_{model.__name__}")
+    post_delete.connect(remove_search_document, sender=model, dispatch_uid=f"search_delete_{model.__name__}")
+
+
+# =========================
+# Connection pool stats
+# =========================
+request_finished.connect(dbpool.log_pool_stats, dispatch_uid="db_pool_stats")
@@ -0,0 +1,219 @@
+"""
+Static snapshot of the public read API, for serving without Django.
+
+``export_snapshot()`` renders every GET endpoint in booklandapp/urls.py
+(plus the month/category filters of /api/events/) into
+``SNAPSHOT_ROOT/snapshot/``, each as ``.json`` with ``.json.gz`` and, when
+brotli is installed, ``.json.br`` siblings, and writes ``manifest.json``
+mapping each API URL to its file, ETag and SHA-256. WhiteNoise (see
+SNAPSHOT_SERVE) and most static hosts pick the precompressed files up on
+their own.
+
+Exports are incremental: each endpoint is requested with the ETag from the
+previous manifest and only rewritten when it answers with a new body, so an
+edit to one model rewrites just the files that read it. With SNAPSHOT_AUTO
+on, saving any cached model schedules an export after a short debounce.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import URLPattern, resolve, reverse
+from django.utils import timezone
+
+from . import urls as api_urls
+from .compression import available_encodings, compress
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "snapshot"
+MANIFEST_NAME = "manifest.json"
+# Endpoints that only make sense with client input.
+EXCLUDED_VIEWS = {"api_search"}
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+# =====================================================
+# Targets
+# =====================================================
+def query_variants(name):
+    """Extra query strings worth exporting for the endpoint ``name``."""
+    if name != "api_events":
+        return []
+    months = [month for month, _ in Event.MONTH_CHOICES]
+    categories = [category for category, _ in Event.CATEGORY_CHOICES]
+    variants = [{"month": month} for month in months]
+    variants += [{"category": category} for category in categories]
+    variants += [{"category": category, "month": month} for category in categories for month in months]
+    return variants
+
+
+def sync_view(callback):
+    """The DRF view behind a URL, also when it is served by async_views.py."""
+    return getattr(callback, "sync_view", callback)
+
+
+def snapshot_targets():
+    """``(url, file name)`` for every exported request."""
+    targets = []
+    for pattern in api_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or pattern.pattern.converters:
+            continue
+        view_class = getattr(sync_view(pattern.callback), "cls", None)
+        methods = getattr(view_class, "http_method_names", ())
+        if "get" not in methods or "post" in methods or pattern.name in EXCLUDED_VIEWS:
+            continue
+        path = reverse(pattern.name)
+        base = path.strip("/")
+        targets.append((path, f"{base}.json"))
+        for params in query_variants(pattern.name):
+            query = urlencode(sorted(params.items()))
+            suffix = ".".join(f"{key}-{value}" for key, value in sorted(params.items()))
+            targets.append((f"{path}?{query}", f"{base}/{suffix}.json"))
+    return targets
+
+
+# =====================================================
+# Export
+# =====================================================
+def snapshot_dir():
+    return os.path.join(settings.SNAPSHOT_ROOT, SNAPSHOT_PREFIX)
+
+
+def load_manifest():
+    try:
+        with open(os.path.join(snapshot_dir(), MANIFEST_NAME), "rb") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return {"files": {}}
+
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def remove_files(name):
+    for suffix in ("", *SUFFIXES.values()):
+        try:
+            os.unlink(os.path.join(snapshot_dir(), name + suffix))
+        except FileNotFoundError:
+            pass
+
+
+def render(url, etag=None):
+    """Run ``url`` through its view; returns the response."""
+    host = urlsplit(settings.PUBLIC_BASE_URL)
+    headers = {"HTTP_ACCEPT": "application/json", "HTTP_HOST": host.netloc}
+    if etag:
+        headers["HTTP_IF_NONE_MATCH"] = etag
+    request = RequestFactory().get(url, secure=host.scheme == "https", **headers)
+    match = resolve(urlsplit(url).path)
+    # A fresh view without throttles: the exporter is not a client.
+    view = sync_view(match.func).cls.as_view(throttle_classes=())
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+def export_snapshot(force=False):
+    """
+    Bring the snapshot up to date; returns ``(written, unchanged, failed)``.
+    ``force`` rewrites every file.
+    """
+    manifest = load_manifest()
+    old_files = manifest.get("files", {})
+    files = {}
+    written = unchanged = failed = 0
+    for url, name in snapshot_targets():
+        previous = old_files.get(url)
+        have_file = previous is not None and os.path.exists(os.path.join(snapshot_dir(), name))
+        etag = previous["etag"] if previous and have_file and not force else None
+        try:
+            response = render(url, etag)
+        except Exception:
+            logger.exception("Snapshot of %s failed", url)
+            failed += 1
+            if previous:
+                files[url] = previous
+            continue
+        if response.status_code == 304:
+            files[url] = previous
+            unchanged += 1
+            continue
+        if response.status_code != 200:
+            logger.warning("Snapshot of %s skipped: status %s", url, response.status_code)
+            failed += 1
+            continue
+        body = response.content
+        sha256 = hashlib.sha256(body).hexdigest()
+        entry = {"file": name, "etag": response.get("ETag"), "sha256": sha256, "bytes": len(body)}
+        if previous and have_file and previous.get("sha256") == sha256 and not force:
+            # Same bytes under a new ETag (e.g. an edit that was undone).
+            files[url] = entry
+            unchanged += 1
+            continue
+        write_atomic(os.path.join(snapshot_dir(), name), body)
+        for encoding in available_encodings():
+            write_atomic(os.path.join(snapshot_dir(), name + SUFFIXES[encoding]), compress(body, encoding, "cached"))
+        files[url] = entry
+        written += 1
+
+    current_names = {entry["file"] for entry in files.values()}
+    for url, entry in old_files.items():
+        if url not in files and entry["file"] not in current_names:
+            remove_files(entry["file"])
+    if files != old_files:
+        manifest = {"generated_at": timezone.now().isoformat(), "files": files}
+        write_atomic(
+            os.path.join(snapshot_dir(), MANIFEST_NAME),
+            json.dumps(manifest, indent=2, sort_keys=True).encode(),
+        )
+    return written, unchanged, failed
+
+
+# =====================================================
+# Automatic export after edits
+# =====================================================
+_timer = None
+_timer_lock = threading.Lock()
+_export_lock = threading.Lock()
+
+
+def schedule_export():
+    """Export once no further edit has arrived for SNAPSHOT_DEBOUNCE seconds."""
+    global _timer
+    with _timer_lock:
+        if _timer is not None:
+            _timer.cancel()
+        _timer = threading.Timer(settings.SNAPSHOT_DEBOUNCE, run_background)
+        _timer.daemon = True
+        _timer.start()
+
+
+def run_background():
+    try:
+        with _export_lock:
+            written, unchanged, failed = export_snapshot()
+        logger.info("Snapshot export: %s written, %s unchanged, %s failed", written, unchanged, failed)
+    except Exception:
+        logger.exception("Snapshot export crashed")
+    finally:
+        connections.close_all()
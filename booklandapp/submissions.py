@@ -0,0 +1,167 @@
+"""
+Queued handling of the admission and contact forms.
+
+With SUBMISSION_QUEUE_ENABLED on, the views validate a submission, store it
+as a PendingSubmission and return 202. ``python manage.py
+process_submissions`` then saves queued submissions in batches and emails
+SUBMISSION_NOTIFY_EMAILS, retrying failed emails with exponential backoff.
+"""
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage, get_connection
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from . import retries
+from .models import AdmissionMessage, EnquiryMessages, PendingSubmission
+
+logger = logging.getLogger(__name__)
+
+# Errors that fail one queued row rather than the whole batch: the payload
+# may not fit the model, e.g. one queued before submit() checked it.
+ROW_ERRORS = (DatabaseError, ValueError, TypeError, ValidationError)
+
+# kind -> (model, notification subject)
+SUBMISSION_KINDS = {
+    PendingSubmission.KIND_ADMISSION: (AdmissionMessage, "New admission request from {name}"),
+    PendingSubmission.KIND_ENQUIRY: (EnquiryMessages, "New enquiry from {name}: {subject}"),
+}
+
+
+def enqueue_submission(kind, validated_data):
+    return PendingSubmission.objects.create(kind=kind, payload=dict(validated_data))
+
+
+# =====================================================
+# Saving
+# =====================================================
+def claim(queryset, batch_size):
+    """
+    Lock up to ``batch_size`` rows of ``queryset``. Call inside a transaction;
+    concurrent workers skip each other's rows on Postgres.
+    """
+    return list(queryset.select_for_update(skip_locked=True).order_by("id")[:batch_size])
+
+
+def save_queued(batch_size=100):
+    """
+    Save one batch of queued submissions with a bulk INSERT per kind.
+    Returns the number saved.
+    """
+    with transaction.atomic():
+        pending = claim(PendingSubmission.objects.filter(status=PendingSubmission.STATUS_QUEUED), batch_size)
+        saved = 0
+        for kind, (model, _) in SUBMISSION_KINDS.items():
+            items = [item for item in pending if item.kind == kind]
+            if items:
+                saved += save_kind(model, items)
+    return saved
+
+
+def save_kind(model, items):
+    try:
+        with transaction.atomic():
+            records = model.objects.bulk_create([model(**item.payload) for item in items])
+    except ROW_ERRORS:
+        # One bad row fails the whole INSERT; retry row by row to isolate it.
+        records = []
+        for item in items:
+            try:
+                record = model(**item.payload)
+                record.clean_fields()
+                with transaction.atomic():
+                    record.save(force_insert=True)
+                records.append(record)
+            except ROW_ERRORS as exc:
+                logger.exception("Could not save %s submission %s", item.kind, item.pk)
+                records.append(None)
+                item.status = PendingSubmission.STATUS_FAILED
+                item.last_error = str(exc)
+                item.save(update_fields=["status", "last_error"])
+
+    saved = [(item, record) for item, record in zip(items, records) if record is not None]
+    if not notify_recipients():
+        PendingSubmission.objects.filter(pk__in=[item.pk for item, _ in saved]).delete()
+        return len(saved)
+    for item, record in saved:
+        item.status = PendingSubmission.STATUS_SAVED
+        item.record_id = record.pk
+    PendingSubmission.objects.bulk_update([item for item, _ in saved], ["status", "record_id"])
+    return len(saved)
+
+
+# =====================================================
+# Notifications
+# =====================================================
+def notify_recipients():
+    return settings.SUBMISSION_NOTIFY_EMAILS
+
+
+def build_notification(item):
+    _, subject = SUBMISSION_KINDS[item.kind]
+    body = "\n".join(f"{name}: {value}" for name, value in item.payload.items())
+    return EmailMessage(
+        subject=subject.format(**item.payload),
+        body=body,
+        to=notify_recipients(),
+        reply_to=[item.payload["email"]] if item.payload.get("email") else None,
+    )
+
+
+def claim_notifications(batch_size, now):
+    """
+    Take up to ``batch_size`` due notifications and lease them (see
+    retries.py), so no transaction stays open while mail is sent.
+    """
+    due = retries.due(PendingSubmission.objects.filter(status=PendingSubmission.STATUS_SAVED), now)
+    with transaction.atomic():
+        items = claim(due, batch_size)
+        retries.lease(PendingSubmission.objects.filter(pk__in=[item.pk for item in items]), now)
+    for item in items:
+        item.attempts += 1
+    return items
+
+
+def record_failure(item, exc, now):
+    max_attempts = settings.SUBMISSION_NOTIFY_MAX_ATTEMPTS
+    if retries.record_failure(item, exc, max_attempts, PendingSubmission.STATUS_FAILED, now):
+        logger.error("Giving up on notification for submission %s: %s", item.pk, exc)
+    item.save(update_fields=retries.FAILURE_FIELDS)
+
+
+def send_notifications(batch_size=100):
+    """
+    Email one batch of saved submissions over a single SMTP connection,
+    deleting each row as soon as its email is sent. Returns
+    ``(sent, failed)``.
+    """
+    now = timezone.now()
+    items = claim_notifications(batch_size, now)
+    if not items:
+        return 0, 0
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as exc:  # SMTP, socket and TLS errors alike
+        for item in items:
+            record_failure(item, exc, now)
+        return 0, len(items)
+
+    sent = failed = 0
+    try:
+        for item in items:
+            message = build_notification(item)
+            message.connection = connection
+            try:
+                message.send()
+            except Exception as exc:
+                failed += 1
+                record_failure(item, exc, now)
+            else:
+                sent += 1
+                item.delete()
+    finally:
+        connection.close()
+    return sent, failed
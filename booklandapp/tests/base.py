@@ -0,0 +1,58 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from booklandapp.cache import get_api_cache
+from booklandapp.models import Event
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SUBMISSION_QUEUE_ENABLED=False)
+class BooklandTestCase(TestCase):
+    """
+    TestCase with an empty API cache and throwaway throttle and replica pin
+    files, as benchmark.test_database() sets up for the benchmarks.
+
+    Reads stay on the primary even with DATABASE_REPLICA_URL set: the
+    replica, a TEST MIRROR, is another connection and cannot see rows the
+    test has not committed. Routing tests set ``replica_reads``.
+    """
+    replica_reads = False
+
+    def setUp(self):
+        super().setUp()
+        self.state_dir = tempfile.mkdtemp(prefix="bookland-test-")
+        self.addCleanup(shutil.rmtree, self.state_dir, ignore_errors=True)
+        state_settings = override_settings(
+            THROTTLE_DB_PATH=os.path.join(self.state_dir, "throttle.sqlite3"),
+            DATABASE_REPLICA_PIN_PATH=os.path.join(self.state_dir, "replica_pin"),
+        )
+        state_settings.enable()
+        self.addCleanup(state_settings.disable)
+        if not self.replica_reads:
+            patcher = mock.patch("booklandapp.routers.replica_available", return_value=False)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        get_api_cache().clear()
+        self.addCleanup(get_api_cache().clear)
+
+    def get_json(self, path, data=None, **extra):
+        return self.client.get(path, data, HTTP_ACCEPT="application/json", **extra)
+
+    def save(self, instance, **kwargs):
+        """Save ``instance`` and run the on_commit hooks (cache invalidation)."""
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save(**kwargs)
+        return instance
+
+
+def make_event(title="Sports day", month="March", day=14, year=2025, **fields):
+    fields.setdefault("category", "Sports")
+    fields.setdefault("start_time", datetime.time(9))
+    fields.setdefault("end_time", datetime.time(12))
+    fields.setdefault("location", "Main field")
+    fields.setdefault("description", "Races and games for every class.")
+    return Event.objects.create(title=title, month=month, day=day, year=year, **fields)
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from booklandapp.admin import EstimatedCountPaginator
+from booklandapp.models import AdmissionMessage, TestimonialsMessage
+
+from .base import BooklandTestCase
+
+LONG_MESSAGE = "My daughter is joining grade four next term. " * 20
+
+
+class ChangeListTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+
+    def add_admissions(self, count):
+        AdmissionMessage.objects.bulk_create([
+            AdmissionMessage(
+                name=f"Parent {i}", email=f"parent{i}@example.com", phone=700000000 + i, message=LONG_MESSAGE
+            )
+            for i in range(count)
+        ])
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_the_page(self):
+        self.add_admissions(2)
+        few = self.changelist_queries("/admin/booklandapp/admissionmessage/")
+        self.add_admissions(40)
+        self.assertEqual(self.changelist_queries("/admin/booklandapp/admissionmessage/"), few)
+
+    def test_long_text_is_shown_as_a_preview(self):
+        self.add_admissions(1)
+        response = self.client.get("/admin/booklandapp/admissionmessage/")
+        preview = LONG_MESSAGE[:80].rstrip() + "…"
+        self.assertContains(response, preview)
+        self.assertNotContains(response, LONG_MESSAGE[:120])
+
+    def test_preview_columns_are_cut_by_the_database(self):
+        TestimonialsMessage.objects.create(name="Ann", title="Parent", testimonial=LONG_MESSAGE)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/admin/booklandapp/testimonialsmessage/")
+        selects = [q["sql"] for q in context.captured_queries if "booklandapp_testimonialsmessage" in q["sql"]]
+        self.assertTrue(any("SUBSTR" in sql.upper() for sql in selects))
+
+    def test_search_by_email(self):
+        self.add_admissions(3)
+        response = self.client.get("/admin/booklandapp/admissionmessage/", {"q": "parent1@example.com"})
+        self.assertContains(response, "Parent 1 - parent1@example.com")
+        self.assertNotContains(response, "Parent 2 - parent2@example.com")
+
+
+class EstimatedCountPaginatorTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        AdmissionMessage.objects.create(name="Tom", email="tom@example.com", phone=712345678, message="Hi")
+
+    def test_other_databases_count_exactly(self):
+        self.assertEqual(EstimatedCountPaginator(AdmissionMessage.objects.order_by("pk"), 50).count, 1)
+
+    def test_large_unfiltered_postgres_tables_use_the_estimate(self):
+        with mock.patch.object(connection, "vendor", "postgresql"), \
+                mock.patch("booklandapp.admin.estimated_row_count", return_value=250000):
+            self.assertEqual(EstimatedCountPaginator(AdmissionMessage.objects.order_by("pk"), 50).count, 250000)
+            # Filtered lists and small tables are still counted.
+            filtered = AdmissionMessage.objects.filter(name="Tom").order_by("pk")
+            self.assertEqual(EstimatedCountPaginator(filtered, 50).count, 1)
+        with mock.patch.object(connection, "vendor", "postgresql"), \
+                mock.patch("booklandapp.admin.estimated_row_count", return_value=-1):
+            self.assertEqual(EstimatedCountPaginator(AdmissionMessage.objects.order_by("pk"), 50).count, 1)
@@ -0,0 +1,62 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory
+
+from booklandapp import async_views
+from booklandapp.benchmark import seed_all
+
+from .base import BooklandTestCase
+
+# async view -> (URL of the sync view, query string)
+CASES = [
+    (async_views.api_testimonials, "/api/testimonials/", {}),
+    (async_views.api_testimonials, "/api/testimonials/", {"limit": "2"}),
+    (async_views.api_gallery, "/api/gallery/", {"limit": "2"}),
+    (async_views.api_leadership, "/api/leadership/", {}),
+    (async_views.api_events, "/api/events/", {}),
+    (async_views.api_events, "/api/events/", {"limit": "3", "category": "Conferences"}),
+    (async_views.api_featured_events, "/api/featured-events/", {}),
+    (async_views.api_alumni, "/api/alumni/", {}),
+    (async_views.api_admission_deadlines, "/api/admission-deadlines/", {}),
+    (async_views.api_fees, "/api/fees/", {}),
+    (async_views.api_search, "/api/search/", {"q": "festival"}),
+]
+
+
+def anonymous_request(path, data=None, **extra):
+    request = AsyncRequestFactory().get(path, data, secure=True, **extra)
+    request.user = AnonymousUser()
+
+    async def auser():
+        return AnonymousUser()
+
+    request.auser = auser
+    return request
+
+
+class AsyncReadViewTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        seed_all(8)
+
+    async def test_responses_match_the_sync_views(self):
+        for view, url, params in CASES:
+            with self.subTest(url=url, params=params):
+                expected = await self.async_client.get(url, params, secure=True, headers={"Accept": "application/json"})
+                response = await view(anonymous_request(url, params))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response["ETag"], expected["ETag"])
+
+    async def test_validation_errors_use_the_drf_error_body(self):
+        response = await async_views.api_gallery(anonymous_request("/api/gallery/", {"cursor": "bad"}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn(b"cursor", response.content)
+        response = await async_views.api_events(anonymous_request("/api/events/", {"to": "2025-02-30"}))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(b"to", response.content)
+
+    async def test_other_methods_go_to_the_drf_view(self):
+        request = AsyncRequestFactory().post("/api/testimonials/", secure=True)
+        response = await async_views.api_testimonials(request)
+        self.assertEqual(response.status_code, 405)
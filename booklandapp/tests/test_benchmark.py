@@ -0,0 +1,66 @@
+from io import StringIO
+
+from booklandapp.benchmark import SEEDERS, fake_client_ip, percentile, seed, seed_all, summarize
+from booklandapp.management.commands.bench_api import GET_VARIANTS, Command, discover_cases
+from booklandapp.models import GalleryImage, SearchDocument
+
+from .base import BooklandTestCase
+
+
+class BenchmarkHelperTests(BooklandTestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual([percentile(values, pct) for pct in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(percentile([7.0], 99), 7.0)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarize(self):
+        self.assertEqual(
+            summarize([1.0, 2.0, 3.0, 4.0], 0.5),
+            {"requests": 4, "throughput_rps": 8.0, "p50_ms": 2.0, "p95_ms": 4.0, "p99_ms": 4.0},
+        )
+
+    def test_fake_client_ips_are_distinct(self):
+        self.assertEqual(len({fake_client_ip(i) for i in range(70000)}), 70000)
+
+    def test_seed_replaces_the_rows(self):
+        GalleryImage.objects.create(title="Old")
+        seed(GalleryImage, 5)
+        self.assertEqual(GalleryImage.objects.count(), 5)
+        self.assertFalse(GalleryImage.objects.filter(title="Old").exists())
+
+    def test_seed_all_fills_every_model_and_the_search_index(self):
+        seed_all(3)
+        for model in SEEDERS:
+            with self.subTest(model.__name__):
+                self.assertTrue(model.objects.exists())
+        self.assertTrue(SearchDocument.objects.exists())
+
+
+class BenchAPICommandTests(BooklandTestCase):
+    def test_discover_cases(self):
+        cases, skipped = discover_cases()
+        cases = {(case["method"], case["url"]) for case in cases}
+        self.assertIn(("GET", "/api/testimonials/"), cases)
+        self.assertIn(("GET", "/api/events/?limit=20"), cases)
+        self.assertIn(("POST", "/api/contact/submit/"), cases)
+        # Needs a URL argument.
+        self.assertFalse([url for _, url in cases if "/pdf/" in url])
+        self.assertEqual(skipped, ["api_admissions_bulk", "api_contact_bulk"])
+
+    def test_search_variants_find_the_seeded_rows(self):
+        seed_all(5)
+        for query in GET_VARIANTS["api_search"]:
+            response = self.get_json("/api/search/" + query)
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertTrue(response.json()["results"], query)
+
+    def test_client_case(self):
+        seed_all(5)
+        case = {"name": "api_testimonials", "method": "GET", "url": "/api/testimonials/", "body": None}
+        command = Command(stdout=StringIO())
+        options = {"session": False, "warmup": 1, "requests": 5, "alloc_samples": 2}
+        result = command.run_client_case(case, 5, "cold", options)
+        self.assertEqual((result["requests"], result["statuses"]), (5, [200]))
+        self.assertGreater(result["queries"], 0)
+        self.assertIn("/api/testimonials/", command.stdout.getvalue())
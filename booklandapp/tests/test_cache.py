@@ -0,0 +1,97 @@
+import gzip
+
+from booklandapp.models import AlumniMessage, TestimonialsMessage
+
+from .base import BooklandTestCase
+
+TESTIMONIALS_URL = "/api/testimonials/"
+
+
+class APIResponseCacheTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        self.testimonial = TestimonialsMessage.objects.create(
+            name="Grace", title="Parent", testimonial="A caring school with great teachers."
+        )
+
+    def test_second_request_is_served_from_the_cache(self):
+        first = self.get_json(TESTIMONIALS_URL)
+        with self.assertNumQueries(0):
+            second = self.get_json(TESTIMONIALS_URL)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.content, first.content)
+
+    def test_saving_a_row_invalidates_the_cached_response(self):
+        self.get_json(TESTIMONIALS_URL)
+        self.testimonial.name = "Grace W."
+        self.save(self.testimonial)
+        response = self.get_json(TESTIMONIALS_URL)
+        self.assertEqual(response.json()[0]["name"], "Grace W.")
+
+    def test_edit_to_another_model_keeps_the_cached_response(self):
+        self.get_json(TESTIMONIALS_URL)
+        self.save(AlumniMessage(name="Brian", title="Engineer", year_of_completion=2010, message="Thanks!"))
+        with self.assertNumQueries(0):
+            self.get_json(TESTIMONIALS_URL)
+
+
+class ConditionalRequestTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        self.testimonials = [
+            TestimonialsMessage.objects.create(name=name, title="Parent", testimonial="Great school.")
+            for name in ("Ann", "Ben")
+        ]
+
+    def test_matching_etag_gets_304(self):
+        etag = self.get_json(TESTIMONIALS_URL)["ETag"]
+        response = self.get_json(TESTIMONIALS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_delete_changes_the_etag(self):
+        etag = self.get_json(TESTIMONIALS_URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.testimonials[-1].delete()
+        response = self.get_json(TESTIMONIALS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_if_modified_since_alone_is_not_answered_with_304(self):
+        # updated_at cannot tell that a row was deleted, so there is no
+        # Last-Modified to validate against.
+        response = self.get_json(TESTIMONIALS_URL)
+        self.assertNotIn("Last-Modified", response)
+        response = self.get_json(TESTIMONIALS_URL, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+        self.assertEqual(response.status_code, 200)
+
+
+class CompressionTests(BooklandTestCase):
+    def test_gzip_variant_decompresses_to_the_plain_body(self):
+        for i in range(20):
+            TestimonialsMessage.objects.create(name=f"Parent {i}", title="Parent", testimonial="Great school. " * 5)
+        plain = self.get_json(TESTIMONIALS_URL)
+        compressed = self.get_json(TESTIMONIALS_URL, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+
+    def test_small_bodies_are_not_compressed(self):
+        response = self.get_json(TESTIMONIALS_URL, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class BundleTests(BooklandTestCase):
+    def test_bundle_matches_the_single_endpoints(self):
+        TestimonialsMessage.objects.create(name="Ann", title="Parent", testimonial="Great school.")
+        response = self.get_json("/api/bundle/", {"sections": "testimonials,alumni"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.json()), ["testimonials", "alumni"])
+        self.assertEqual(response.json()["testimonials"], self.get_json(TESTIMONIALS_URL).json())
+
+    def test_bundle_answers_304(self):
+        etag = self.get_json("/api/bundle/")["ETag"]
+        self.assertEqual(self.get_json("/api/bundle/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_unknown_section_is_rejected(self):
+        self.assertEqual(self.get_json("/api/bundle/", {"sections": "nope"}).status_code, 400)
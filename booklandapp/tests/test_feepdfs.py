@@ -0,0 +1,99 @@
+import hashlib
+import os
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from booklandapp import feepdfs
+from booklandapp.models import FeeStructure
+
+from .base import BooklandTestCase
+
+PDF = b"%PDF-1.4\n" + b"fee structure " * 100 + b"\n%%EOF\n"
+SHA256 = hashlib.sha256(PDF).hexdigest()
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = [
+            ("bytes=0-99", (0, 99)),
+            ("bytes=100-", (100, 999)),
+            ("bytes=900-5000", (900, 999)),
+            ("bytes=-100", (900, 999)),
+            ("bytes=-5000", (0, 999)),
+        ]
+        for header, expected in cases:
+            with self.subTest(header):
+                self.assertEqual(feepdfs.parse_range(header, 1000), expected)
+
+    def test_whole_file(self):
+        for header in (None, "", "bytes=0-1,5-6", "items=0-1", "bytes=50-10", "bytes=-"):
+            with self.subTest(header):
+                self.assertIsNone(feepdfs.parse_range(header, 1000))
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=1000-", "bytes=-0"):
+            with self.subTest(header):
+                with self.assertRaises(ValueError):
+                    feepdfs.parse_range(header, 1000)
+
+
+@override_settings(FEE_PDF_MIRROR=True, PUBLIC_BASE_URL="https://school.example.com")
+class FeePDFViewTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        mirror_settings = override_settings(FEE_PDF_MIRROR_DIR=os.path.join(self.state_dir, "fee_pdfs"))
+        mirror_settings.enable()
+        self.addCleanup(mirror_settings.disable)
+        self.fee = FeeStructure.objects.create(
+            level="Play Group", tuition_per_term=Decimal("10000"), meals_fee=Decimal("2000"),
+            transport_fee=Decimal("1500"), total_fee=Decimal("13500"),
+        )
+        FeeStructure.objects.filter(pk=self.fee.pk).update(
+            pdf_url="https://res.cloudinary.com/demo/raw/upload/v1/fee_structures/play.pdf",
+            pdf_sha256=SHA256, pdf_size=len(PDF),
+        )
+        os.makedirs(os.path.join(self.state_dir, "fee_pdfs"))
+        with open(feepdfs.mirror_path(SHA256), "wb") as fh:
+            fh.write(PDF)
+        self.url = f"/api/fees/{self.fee.pk}/pdf/"
+
+    def test_whole_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), PDF)
+        self.assertEqual(response["ETag"], f'"{SHA256}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-8")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), PDF[:9])
+        self.assertEqual(response["Content-Range"], f"bytes 0-8/{len(PDF)}")
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-8", HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(PDF)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(PDF)}")
+
+    def test_matching_etag_gets_304(self):
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{SHA256}"').status_code, 304)
+
+    def test_versioned_url_is_immutable(self):
+        response = self.client.get(self.url, {"v": SHA256[:16]})
+        self.assertIn("immutable", response["Cache-Control"])
+        listed = self.get_json("/api/fees/").json()[0]
+        self.assertEqual(listed["file_url"], f"https://school.example.com{self.url}?v={SHA256[:16]}")
+
+    def test_redirects_to_cloudinary_until_mirrored(self):
+        os.unlink(feepdfs.mirror_path(SHA256))
+        with mock.patch("booklandapp.feepdfs.schedule_mirror") as schedule:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].startswith("https://res.cloudinary.com/"))
+        schedule.assert_called_once_with(self.fee.pk)
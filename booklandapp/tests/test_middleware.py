@@ -0,0 +1,54 @@
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from booklandapp.models import TestimonialsMessage
+
+from .base import BooklandTestCase
+
+
+class PublicAPIFastPathTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        TestimonialsMessage.objects.create(name="Ann", title="Parent", testimonial="Great school.")
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+
+    def test_public_reads_skip_the_session(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_json("/api/testimonials/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if "django_session" in query["sql"]])
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+        self.assertFalse(response.cookies)
+
+    def test_public_reads_are_anonymous_even_with_a_session_cookie(self):
+        response = self.get_json("/api/contact/submit/bulk/")
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_admin_still_gets_its_session(self):
+        response = self.client.get("/admin/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user.username, "admin")
+        self.assertEqual(Session.objects.count(), 1)
+
+    @override_settings(PUBLIC_API_FAST_PATH=False)
+    def test_fast_path_can_be_turned_off(self):
+        response = self.get_json("/api/testimonials/")
+        self.assertIn("Cookie", response["Vary"])
+
+
+class ServerTimingTests(BooklandTestCase):
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_sampled_requests_get_the_header(self):
+        TestimonialsMessage.objects.create(name="Ann", title="Parent", testimonial="Great school.")
+        with self.assertLogs("booklandapp", "INFO"):
+            response = self.get_json("/api/testimonials/")
+        metrics = [entry.split(";")[0] for entry in response["Server-Timing"].split(", ")]
+        self.assertIn("db", metrics)
+        self.assertIn("total", metrics)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_do_not(self):
+        self.assertNotIn("Server-Timing", self.get_json("/api/testimonials/"))
@@ -0,0 +1,116 @@
+import datetime
+
+from booklandapp.models import Event, GalleryImage
+from booklandapp.pagination import KeysetPagination
+
+from .base import BooklandTestCase, make_event
+
+
+class KeysetPaginationTests(BooklandTestCase):
+    def walk(self, url, limit, **params):
+        """Titles of every page of ``url``, following the cursors."""
+        titles, cursor = [], None
+        while True:
+            query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+            response = self.get_json(url, query)
+            self.assertEqual(response.status_code, 200, response.content)
+            body = response.json()
+            titles += [item["title"] for item in body["results"]]
+            cursor = body["next"]
+            if cursor is None:
+                return titles
+
+    def test_pages_cover_every_row_once_in_id_order(self):
+        for i in range(6):
+            GalleryImage.objects.create(title=f"Image {i}")
+        self.assertEqual(self.walk("/api/gallery/", 3), [f"Image {i}" for i in range(6)])
+
+    def test_short_last_page(self):
+        for i in range(7):
+            GalleryImage.objects.create(title=f"Image {i}")
+        self.assertEqual(self.walk("/api/gallery/", 3), [f"Image {i}" for i in range(7)])
+
+    def test_without_limit_or_cursor_the_plain_list_is_returned(self):
+        GalleryImage.objects.create(title="Only")
+        self.assertIsInstance(self.get_json("/api/gallery/").json(), list)
+
+    def test_events_are_paged_by_date(self):
+        make_event("Late", day=20)
+        make_event("Early", day=2)
+        make_event("Middle", day=10)
+        self.assertEqual(self.walk("/api/events/", 1), ["Early", "Middle", "Late"])
+
+    def test_event_pages_follow_the_order_of_the_full_list(self):
+        make_event("Last year, late", month="December", day=1, year=2024)
+        make_event("This year, early", month="January", day=5, year=2025)
+        make_event("Last year, early", month="January", day=5, year=2024)
+        make_event("This year, late", month="November", day=30, year=2025)
+        make_event("This year, same day", month="January", day=5, year=2025)
+        full = [item["title"] for item in self.get_json("/api/events/").json()]
+        self.assertEqual(full[:2], ["This year, early", "This year, same day"])
+        self.assertEqual(self.walk("/api/events/", 2), full)
+
+    def test_event_with_a_clamped_day_can_end_a_page(self):
+        # Migration 0025 stored February 30 as February 29 (2024).
+        Event.objects.bulk_create([
+            Event(
+                title="Legacy", category="Arts", month="February", day=30, year=2024,
+                start_time=datetime.time(9), end_time=datetime.time(10), location="Hall",
+                description="Imported.", event_date=datetime.date(2024, 2, 29),
+            )
+        ])
+        make_event("Before", month="February", day=1, year=2024)
+        make_event("After", month="March", day=1, year=2024)
+        self.assertEqual(self.walk("/api/events/", 1), ["Before", "Legacy", "After"])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.get_json("/api/gallery/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cursor", response.json())
+
+    def test_cursor_values_must_fit_their_columns(self):
+        make_event()
+        cases = [
+            ("/api/events/", [2025, 5, 1]),
+            ("/api/events/", [2025, "garbage", 1]),
+            ("/api/events/", [2025, "2025-02-30", 1]),
+            ("/api/events/", ["2025", "2025-03-14", 1]),
+            ("/api/testimonials/", ["abc"]),
+        ]
+        for url, key in cases:
+            with self.subTest(url=url, key=key):
+                cursor = KeysetPagination(ordering=(), get_key=None).encode_cursor(key)
+                response = self.get_json(url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"cursor": ["Invalid cursor."]})
+
+    def test_limit_is_validated(self):
+        self.assertEqual(self.get_json("/api/gallery/", {"limit": "0"}).status_code, 400)
+
+
+class EventFilterTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        make_event("Spring", month="March", day=1, year=2025)
+        make_event("Summer", month="July", day=1, year=2025, category="Arts")
+
+    def titles(self, **params):
+        return [item["title"] for item in self.get_json("/api/events/", params).json()]
+
+    def test_date_range(self):
+        self.assertEqual(self.titles(**{"from": "2025-06-01"}), ["Summer"])
+        self.assertEqual(self.titles(to="2025-06-01"), ["Spring"])
+
+    def test_category(self):
+        self.assertEqual(self.titles(category="Arts"), ["Summer"])
+
+    def test_bad_date_is_rejected(self):
+        self.assertEqual(self.get_json("/api/events/", {"from": "01/06/2025"}).status_code, 400)
+        self.assertEqual(self.get_json("/api/events/", {"from": "2025-02-30"}).status_code, 400)
+
+    def test_event_date_follows_month_day_and_year(self):
+        event = Event.objects.get(title="Spring")
+        event.month = "April"
+        event.save(update_fields=["month"])
+        event.refresh_from_db()
+        self.assertEqual(event.event_date, datetime.date(2025, 4, 1))
@@ -0,0 +1,109 @@
+import os
+import time
+from unittest import mock, skipUnless
+
+from django.db import OperationalError, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from booklandapp import routers
+
+from .base import BooklandTestCase, make_event
+
+
+class PrimaryPinTests(BooklandTestCase):
+    def test_pin_is_shared_through_the_file(self):
+        self.assertFalse(routers.primary_pinned())
+        routers.pin_primary()
+        self.assertTrue(routers.primary_pinned())
+        self.assertTrue(os.path.exists(os.path.join(self.state_dir, "replica_pin")))
+
+    @override_settings(DATABASE_REPLICA_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        routers.pin_primary()
+        self.assertFalse(routers.primary_pinned())
+
+    def test_unreadable_pin_means_primary(self):
+        with mock.patch("os.stat", side_effect=PermissionError):
+            self.assertTrue(routers.primary_pinned())
+
+
+# The replica is the "TEST MIRROR" of default set up in settings; run with
+# DATABASE_REPLICA_URL set to include these tests.
+@skipUnless(routers.replica_configured(), "DATABASE_REPLICA_URL is not set")
+class ReplicaRoutingTests(BooklandTestCase):
+    databases = "__all__"
+    replica_reads = True
+
+    def setUp(self):
+        super().setUp()
+        for name in ("_down_until", "_checked_until"):
+            patcher = mock.patch.object(routers, name, 0.0)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def replica_queries(self, *args, **kwargs):
+        with CaptureQueriesContext(connections["replica"]) as queries:
+            response = self.get_json(*args, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_api_reads_use_the_replica(self):
+        self.assertGreater(self.replica_queries("/api/testimonials/"), 0)
+
+    def test_pin_cookie_keeps_the_client_on_the_primary(self):
+        self.client.cookies[routers.PIN_COOKIE] = "1"
+        self.assertEqual(self.replica_queries("/api/testimonials/"), 0)
+
+    def test_content_edit_keeps_every_client_on_the_primary(self):
+        routers.pin_primary()
+        self.assertEqual(self.replica_queries("/api/testimonials/"), 0)
+
+    def test_content_edits_pin_the_primary(self):
+        # An Event, which has no foreign keys: Django checks constraints on
+        # the mirror connection too, which SQLite's shared cache would lock.
+        with self.captureOnCommitCallbacks(execute=True):
+            make_event()
+        self.assertTrue(routers.primary_pinned())
+
+    def test_writes_set_the_pin_cookie(self):
+        response = self.client.post(
+            "/api/contact/submit/",
+            {"name": "Mary", "email": "mary@example.com", "subject": "Fees", "message": "Fees?"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.cookies[routers.PIN_COOKIE]["max-age"], 10)
+
+    def test_replica_error_reruns_the_view_on_the_primary(self):
+        calls = []
+
+        def fail_on_replica(execute, sql, params, many, context):
+            calls.append(context["connection"].alias)
+            if context["connection"].alias == "replica":
+                raise OperationalError("replica went away")
+            return execute(sql, params, many, context)
+
+        with connections["replica"].execute_wrapper(fail_on_replica), \
+                connections["default"].execute_wrapper(fail_on_replica), \
+                self.assertLogs("booklandapp.routers", "WARNING"):
+            response = self.get_json("/api/testimonials/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(calls[0], "replica")
+        self.assertIn("default", calls)
+        self.assertGreater(routers._down_until, time.monotonic())
+
+    @override_settings(DATABASE_REPLICA_CHECK_SECONDS=60)
+    def test_replica_connection_is_checked_on_a_timer(self):
+        replica = connections["replica"]
+        with mock.patch.object(replica, "ensure_connection", wraps=replica.ensure_connection) as ensure:
+            for _ in range(3):
+                self.assertTrue(routers.replica_available())
+        self.assertEqual(ensure.call_count, 1)
+
+    def test_failed_check_falls_back_to_the_primary(self):
+        replica = connections["replica"]
+        with mock.patch.object(replica, "ensure_connection", side_effect=OperationalError("refused")), \
+                self.assertLogs("booklandapp.routers", "WARNING"):
+            self.assertFalse(routers.replica_available())
+        self.assertEqual(self.replica_queries("/api/testimonials/"), 0)
@@ -0,0 +1,80 @@
+from booklandapp import search
+from booklandapp.models import SearchDocument, TestimonialsMessage
+
+from .base import BooklandTestCase, make_event
+
+
+class SearchIndexTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        self.testimonial = TestimonialsMessage.objects.create(
+            name="Grace", title="Parent", testimonial="The music festival was wonderful."
+        )
+
+    def document(self):
+        return SearchDocument.objects.get(kind=SearchDocument.KIND_TESTIMONIAL, object_id=self.testimonial.pk)
+
+    def test_saving_a_row_indexes_it(self):
+        self.assertEqual((self.document().title, self.document().body), ("Grace", "The music festival was wonderful."))
+        self.testimonial.testimonial = "Great sports teams."
+        self.testimonial.save()
+        self.assertEqual(self.document().body, "Great sports teams.")
+
+    def test_deleting_a_row_removes_its_document(self):
+        self.testimonial.delete()
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_partially_loaded_row_is_indexed_from_the_database(self):
+        testimonial = TestimonialsMessage.objects.only("pk", "name").get()
+        testimonial.name = "Grace W."
+        testimonial.save(update_fields=["name"])
+        document = self.document()
+        self.assertEqual((document.title, document.body), ("Grace W.", "The music festival was wonderful."))
+
+    def test_save_of_unindexed_fields_skips_the_document(self):
+        testimonial = TestimonialsMessage.objects.only("pk", "image").get()
+        testimonial.image = "https://example.com/grace.jpg"
+        with self.assertNumQueries(1):
+            testimonial.save(update_fields=["image"])
+
+    def test_rebuild_index(self):
+        make_event("Music festival")
+        SearchDocument.objects.all().delete()
+        self.assertEqual(search.rebuild_index(), 2)
+        self.assertEqual(SearchDocument.objects.count(), 2)
+
+
+class SearchAPITests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        make_event("Music festival", description="Choirs and bands from every class.")
+        make_event("Sports day", description="Races, then a music performance.")
+        TestimonialsMessage.objects.create(name="Ann", title="Parent", testimonial="Great teachers.")
+
+    def search(self, **params):
+        response = self.get_json("/api/search/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_title_matches_rank_first(self):
+        hits = self.search(q="music")["results"]
+        self.assertEqual([hit["title"] for hit in hits], ["Music festival", "Sports day"])
+        self.assertIn("<mark>music</mark>", hits[1]["snippet"])
+
+    def test_last_word_matches_as_a_prefix(self):
+        self.assertEqual([hit["title"] for hit in self.search(q="choirs ban")["results"]], ["Music festival"])
+
+    def test_type_narrows_the_kinds(self):
+        self.assertEqual(self.search(q="great", type="event")["results"], [])
+        self.assertEqual(len(self.search(q="great", type="testimonial")["results"]), 1)
+
+    def test_results_are_paged(self):
+        first = self.search(q="music", limit=1)
+        second = self.search(q="music", limit=1, cursor=first["next"])
+        titles = [hit["title"] for hit in first["results"] + second["results"]]
+        self.assertEqual(titles, ["Music festival", "Sports day"])
+        self.assertIsNone(second["next"])
+
+    def test_query_is_required(self):
+        self.assertEqual(self.get_json("/api/search/", {"q": "  "}).status_code, 400)
+        self.assertEqual(self.get_json("/api/search/", {"q": "music", "type": "nope"}).status_code, 400)
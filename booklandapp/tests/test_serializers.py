@@ -0,0 +1,29 @@
+from rest_framework.renderers import JSONRenderer
+
+from booklandapp.benchmark import seed
+from booklandapp.fast_serializers import render_json
+from booklandapp.management.commands.bench_serializers import CASES
+
+from .base import BooklandTestCase
+
+
+class ValuesSerializerTests(BooklandTestCase):
+    def test_output_matches_the_model_serializers(self):
+        for name, (get_queryset, drf_serializer, values_serializer) in CASES.items():
+            with self.subTest(name):
+                seed(get_queryset().model, 10)
+                expected = JSONRenderer().render(drf_serializer(get_queryset(), many=True).data)
+                self.assertEqual(render_json(values_serializer(get_queryset()).data), expected)
+
+    def test_rows_hold_the_source_columns(self):
+        get_queryset, _, values_serializer = CASES["events"]
+        seed(get_queryset().model, 3)
+        serializer = values_serializer(get_queryset())
+        data = serializer.data
+        self.assertEqual(len(serializer.rows), len(data))
+        self.assertIn("event_date", serializer.rows[0])
+        self.assertNotIn("event_date", data[0])
+
+    def test_render_json_escapes_line_separators_like_drf(self):
+        data = {"text": "line\u2028separator \u2029 and café"}
+        self.assertEqual(render_json(data), JSONRenderer().render(data))
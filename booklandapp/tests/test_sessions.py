@@ -0,0 +1,74 @@
+from http.cookies import SimpleCookie
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.test import Client
+
+from booklandapp.sessions import WRITTEN_AT_KEY, SessionStore
+
+from .base import BooklandTestCase
+
+
+class SessionStoreTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        with mock.patch("time.time", return_value=1_000_000):
+            self.store = SessionStore()
+            self.store["cart"] = 1
+            self.store.create()
+
+    def reload(self, now):
+        store = SessionStore(self.store.session_key)
+        with mock.patch("time.time", return_value=now):
+            store["cart"]  # loads the session
+        return store
+
+    def test_unchanged_session_is_not_written_within_the_refresh_window(self):
+        # 20% of the 300 second SESSION_COOKIE_AGE.
+        store = self.reload(1_000_059)
+        with mock.patch("time.time", return_value=1_000_059), self.assertNumQueries(0):
+            store.save()
+        self.assertEqual(SessionStore(self.store.session_key).load()[WRITTEN_AT_KEY], 1_000_000)
+
+    def test_unchanged_session_is_written_once_the_window_has_passed(self):
+        store = self.reload(1_000_060)
+        with mock.patch("time.time", return_value=1_000_060):
+            store.save()
+        self.assertEqual(SessionStore(self.store.session_key).load()[WRITTEN_AT_KEY], 1_000_060)
+
+    def test_changed_session_is_always_written(self):
+        store = self.reload(1_000_001)
+        store["cart"] = 2
+        with mock.patch("time.time", return_value=1_000_001):
+            store.save()
+        self.assertEqual(SessionStore(self.store.session_key).load()["cart"], 2)
+
+    async def test_asave_skips_unchanged_sessions_too(self):
+        store = SessionStore(self.store.session_key)
+        with mock.patch("time.time", return_value=1_000_010):
+            await store.aload()
+            with mock.patch("django.contrib.sessions.backends.db.SessionStore.asave") as asave:
+                await store.asave()
+        asave.assert_not_called()
+
+
+class AdminSessionTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def test_admin_page_views_do_not_rewrite_the_session(self):
+        self.assertEqual(self.client.get("/admin/").status_code, 200)
+        expire_date = Session.objects.get().expire_date
+        self.assertEqual(self.client.get("/admin/").status_code, 200)
+        self.assertEqual(Session.objects.get().expire_date, expire_date)
+
+    def test_logout_ends_the_session_for_every_client(self):
+        other = Client()
+        other.cookies = SimpleCookie({settings.SESSION_COOKIE_NAME: self.client.session.session_key})
+        self.assertEqual(other.get("/admin/").status_code, 200)
+        self.client.post("/admin/logout/")
+        self.assertEqual(other.get("/admin/").status_code, 302)
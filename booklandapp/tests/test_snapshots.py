@@ -0,0 +1,58 @@
+import json
+import os
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from booklandapp import snapshots
+from booklandapp.models import TestimonialsMessage
+
+from .base import BooklandTestCase
+
+
+@override_settings(PUBLIC_BASE_URL="https://school.example.com")
+class ExportSnapshotTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        root_settings = override_settings(SNAPSHOT_ROOT=os.path.join(self.state_dir, "snapshot_root"))
+        root_settings.enable()
+        self.addCleanup(root_settings.disable)
+        TestimonialsMessage.objects.create(name="Ann", title="Parent", testimonial="Great school.")
+
+    def manifest(self):
+        with open(os.path.join(snapshots.snapshot_dir(), snapshots.MANIFEST_NAME)) as fh:
+            return json.load(fh)["files"]
+
+    def read(self, name):
+        with open(os.path.join(snapshots.snapshot_dir(), name), "rb") as fh:
+            return fh.read()
+
+    def test_export_writes_every_endpoint_with_a_manifest(self):
+        written, unchanged, failed = snapshots.export_snapshot()
+        self.assertEqual((unchanged, failed), (0, 0))
+        files = self.manifest()
+        self.assertEqual(len(files), written)
+        self.assertIn("/api/events/?month=March", files)
+        self.assertNotIn("/api/search/", files)
+        entry = files["/api/testimonials/"]
+        self.assertEqual(self.read(entry["file"]), self.get_json("/api/testimonials/").content)
+        self.assertTrue(os.path.exists(os.path.join(snapshots.snapshot_dir(), entry["file"] + ".gz")))
+
+    def test_second_export_only_rewrites_what_changed(self):
+        written, _, _ = snapshots.export_snapshot()
+        self.assertEqual(snapshots.export_snapshot(), (0, written, 0))
+        self.save(TestimonialsMessage(name="Ben", title="Parent", testimonial="Kind teachers."))
+        # The testimonials endpoint and the bundle read the changed model.
+        self.assertEqual(snapshots.export_snapshot(), (2, written - 2, 0))
+        self.assertIn(b"Ben", self.read(self.manifest()["/api/testimonials/"]["file"]))
+
+    def test_command(self):
+        out = StringIO()
+        call_command("export_snapshot", stdout=out)
+        self.assertIn("written", out.getvalue())
+
+    @override_settings(PUBLIC_BASE_URL="")
+    def test_command_needs_the_public_base_url(self):
+        with self.assertRaisesMessage(CommandError, "PUBLIC_BASE_URL"):
+            call_command("export_snapshot", stdout=StringIO())
@@ -0,0 +1,152 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import override_settings
+
+from booklandapp.models import AdmissionMessage, EnquiryMessages, PendingSubmission
+from booklandapp.submissions import enqueue_submission, save_queued, send_notifications
+
+from .base import BooklandTestCase
+
+ENQUIRY = {"name": "Mary", "email": "mary@example.com", "subject": "Fees", "message": "What are the fees?"}
+ADMISSION = {"name": "Tom", "email": "tom@example.com", "phone": 712345678, "message": "Grade 4 place?"}
+
+
+class SubmitTests(BooklandTestCase):
+    def test_saves_right_away_without_the_queue(self):
+        response = self.client.post("/api/contact/submit/", ENQUIRY, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(EnquiryMessages.objects.filter(email="mary@example.com").exists())
+        self.assertFalse(PendingSubmission.objects.exists())
+
+    @override_settings(SUBMISSION_QUEUE_ENABLED=True)
+    def test_queues_with_the_queue_enabled(self):
+        response = self.client.post("/api/admissions/submit/", ADMISSION, content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(AdmissionMessage.objects.exists())
+        self.assertEqual(PendingSubmission.objects.get().kind, PendingSubmission.KIND_ADMISSION)
+
+    def test_invalid_submission_is_rejected(self):
+        response = self.client.post("/api/contact/submit/", {"name": "Mary"}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.json())
+
+    @override_settings(SUBMISSION_QUEUE_ENABLED=True)
+    def test_submission_the_model_rejects_is_not_queued(self):
+        data = {**ADMISSION, "phone": "+254 712 345"}
+        response = self.client.post("/api/admissions/submit/", data, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("phone", response.json())
+        self.assertFalse(PendingSubmission.objects.exists())
+
+
+@override_settings(SUBMISSION_NOTIFY_EMAILS=["office@example.com"], SUBMISSION_NOTIFY_MAX_ATTEMPTS=3)
+class SubmissionQueueTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            enqueue_submission(PendingSubmission.KIND_ENQUIRY, {**ENQUIRY, "name": f"Mary {i}"})
+
+    def test_save_queued_creates_the_rows(self):
+        self.assertEqual(save_queued(), 3)
+        self.assertEqual(EnquiryMessages.objects.count(), 3)
+        saved = PendingSubmission.objects.filter(status=PendingSubmission.STATUS_SAVED)
+        self.assertEqual(
+            sorted(saved.values_list("record_id", flat=True)),
+            sorted(EnquiryMessages.objects.values_list("pk", flat=True)),
+        )
+
+    def test_row_the_model_rejects_fails_without_blocking_the_batch(self):
+        bad = enqueue_submission(PendingSubmission.KIND_ADMISSION, {**ADMISSION, "phone": "+254 712 345"})
+        with self.assertLogs("booklandapp.submissions", "ERROR"):
+            self.assertEqual(save_queued(), 3)
+        self.assertEqual(EnquiryMessages.objects.count(), 3)
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, PendingSubmission.STATUS_FAILED)
+        self.assertIn("phone", bad.last_error)
+        self.assertEqual(save_queued(), 0)
+
+    @override_settings(SUBMISSION_NOTIFY_EMAILS=[])
+    def test_without_recipients_the_queue_is_emptied_on_save(self):
+        save_queued()
+        self.assertFalse(PendingSubmission.objects.exists())
+
+    def test_sent_notifications_are_deleted(self):
+        save_queued()
+        self.assertEqual(send_notifications(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].reply_to, ["mary@example.com"])
+        self.assertFalse(PendingSubmission.objects.exists())
+
+    def test_failed_send_backs_off_and_keeps_the_sent_ones_deleted(self):
+        save_queued()
+        calls = []
+
+        def send(messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise OSError("connection reset")
+            return len(messages)
+
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=send):
+            self.assertEqual(send_notifications(), (2, 1))
+        failed = PendingSubmission.objects.get()
+        self.assertEqual(failed.attempts, 1)
+        self.assertEqual(failed.last_error, "connection reset")
+        self.assertIsNotNone(failed.next_attempt_at)
+        # Not due again until the backoff has passed.
+        self.assertEqual(send_notifications(), (0, 0))
+
+    def test_connection_failure_counts_an_attempt_per_row(self):
+        save_queued()
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.open", side_effect=OSError("refused")):
+            self.assertEqual(send_notifications(), (0, 3))
+        for item in PendingSubmission.objects.all():
+            self.assertEqual(item.attempts, 1)
+            self.assertEqual(item.status, PendingSubmission.STATUS_SAVED)
+            self.assertIsNotNone(item.next_attempt_at)
+
+    def test_gives_up_after_the_last_attempt(self):
+        save_queued()
+        PendingSubmission.objects.update(attempts=2)
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.open", side_effect=OSError("refused")):
+            send_notifications()
+        self.assertEqual(
+            set(PendingSubmission.objects.values_list("status", flat=True)), {PendingSubmission.STATUS_FAILED}
+        )
+
+    def test_claimed_rows_are_leased_to_the_worker(self):
+        save_queued()
+        with mock.patch("booklandapp.submissions.get_connection", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                send_notifications()
+        # A worker that died mid-batch leaves its rows to a later retry.
+        self.assertEqual(send_notifications(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class BulkSubmitTests(BooklandTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+
+    def test_valid_items_are_created_and_invalid_ones_reported(self):
+        items = [ENQUIRY, {**ENQUIRY, "email": "not-an-email"}, {**ENQUIRY, "name": "Ann"}]
+        response = self.client.post("/api/contact/submit/bulk/", items, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual((body["created"], body["invalid"]), (2, 1))
+        self.assertEqual([result["status"] for result in body["results"]], ["created", "invalid", "created"])
+        self.assertEqual(EnquiryMessages.objects.count(), 2)
+
+    def test_ndjson_body(self):
+        lines = "\n".join(json.dumps({**ADMISSION, "name": f"Kid {i}"}) for i in range(3))
+        response = self.client.post("/api/admissions/submit/bulk/", lines, content_type="application/x-ndjson")
+        self.assertEqual(response.json()["created"], 3)
+
+    def test_needs_an_admin(self):
+        self.client.logout()
+        response = self.client.post("/api/contact/submit/bulk/", [ENQUIRY], content_type="application/json")
+        self.assertIn(response.status_code, (401, 403))
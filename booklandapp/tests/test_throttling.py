@@ -0,0 +1,62 @@
+import sqlite3
+from unittest import mock
+
+from django.test import override_settings
+
+from booklandapp.throttling import MemoryStore, SQLiteStore
+
+from .base import BooklandTestCase
+
+ENQUIRY = {"name": "Mary", "email": "mary@example.com", "subject": "Fees", "message": "What are the fees?"}
+
+
+class StoreTests(BooklandTestCase):
+    def check_store(self, store):
+        # Two requests per ten seconds: a burst of two, then one every five seconds.
+        self.assertEqual(store.acquire("k", 100.0, 5.0, 10.0), 0)
+        self.assertEqual(store.acquire("k", 100.0, 5.0, 10.0), 0)
+        self.assertAlmostEqual(store.acquire("k", 100.0, 5.0, 10.0), 5.0)
+        self.assertAlmostEqual(store.acquire("k", 103.0, 5.0, 10.0), 2.0)
+        self.assertEqual(store.acquire("k", 105.0, 5.0, 10.0), 0)
+        self.assertEqual(store.acquire("other", 105.0, 5.0, 10.0), 0)
+
+    def test_sqlite_store(self):
+        self.check_store(SQLiteStore(f"{self.state_dir}/throttle.sqlite3", 0.1))
+
+    def test_memory_store(self):
+        self.check_store(MemoryStore())
+
+    def test_sqlite_store_is_shared_through_the_file(self):
+        path = f"{self.state_dir}/shared.sqlite3"
+        SQLiteStore(path, 0.1).acquire("k", 100.0, 5.0, 5.0)
+        self.assertAlmostEqual(SQLiteStore(path, 0.1).acquire("k", 100.0, 5.0, 5.0), 5.0)
+
+
+class SubmitThrottleTests(BooklandTestCase):
+    def submit(self, **extra):
+        return self.client.post("/api/contact/submit/", ENQUIRY, content_type="application/json", **extra)
+
+    def test_submissions_over_the_rate_get_429(self):
+        for _ in range(20):
+            self.assertEqual(self.submit().status_code, 201)
+        response = self.submit()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        # Reads have a scope of their own.
+        self.assertEqual(self.get_json("/api/testimonials/").status_code, 200)
+
+    def test_forwarded_for_does_not_buy_a_fresh_allowance(self):
+        for i in range(20):
+            self.submit(HTTP_X_FORWARDED_FOR=f"10.0.0.{i}")
+        self.assertEqual(self.submit(HTTP_X_FORWARDED_FOR="10.0.1.1").status_code, 429)
+
+    @override_settings(THROTTLE_STORE="memory")
+    def test_memory_store_setting(self):
+        for _ in range(20):
+            self.submit()
+        self.assertEqual(self.submit().status_code, 429)
+
+    def test_broken_store_lets_requests_through(self):
+        with mock.patch("booklandapp.throttling.SQLiteStore.acquire", side_effect=sqlite3.OperationalError("locked")):
+            for _ in range(21):
+                self.assertEqual(self.submit().status_code, 201)
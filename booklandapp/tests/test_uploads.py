@@ -0,0 +1,174 @@
+import io
+import os
+import zipfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from booklandapp.admin import ImageUploadAdmin
+from booklandapp.models import GalleryImage, ImageAsset, ImageModel, ImageUpload
+from booklandapp.uploads import LocalTransport, process_upload, queue_upload
+
+from .base import BooklandTestCase
+
+
+def png_bytes(size=(400, 200), color="navy"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class UploadTestCase(BooklandTestCase):
+    """Uploads go through LocalTransport into a throwaway MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        upload_settings = override_settings(
+            MEDIA_ROOT=os.path.join(self.state_dir, "media"),
+            IMAGE_STAGING_DIR=os.path.join(self.state_dir, "staging"),
+            IMAGE_UPLOAD_TRANSPORT="booklandapp.uploads.LocalTransport",
+            IMAGE_UPLOAD_IN_PROCESS=False,
+            IMAGE_UPLOAD_MAX_ATTEMPTS=2,
+            IMAGE_VARIANT_WIDTHS=[160, 320, 640],
+        )
+        upload_settings.enable()
+        self.addCleanup(upload_settings.disable)
+
+    def stage(self, content=None, name="photo.png"):
+        os.makedirs(os.path.join(self.state_dir, "staging"), exist_ok=True)
+        path = os.path.join(self.state_dir, "staging", name)
+        with open(path, "wb") as fh:
+            fh.write(content if content is not None else png_bytes())
+        return path
+
+    def queue(self, content=None):
+        image = GalleryImage.objects.create(title="Sports day", image_status=ImageModel.IMAGE_PENDING)
+        return image, queue_upload(image, self.stage(content), "bookland/gallery")
+
+
+class ProcessUploadTests(UploadTestCase):
+    def test_success_writes_the_image_variants_and_asset(self):
+        image, upload = self.queue()
+        self.assertTrue(process_upload(upload.pk, LocalTransport()))
+        image.refresh_from_db()
+        self.assertEqual(image.image_status, ImageModel.IMAGE_READY)
+        self.assertTrue(image.image.startswith("/media/bookland/gallery/"))
+        self.assertEqual([entry["width"] for entry in image.image_variants["srcset"]], [160, 320, 400])
+        self.assertEqual(image.image_variants["srcset"][-1]["url"], image.image)
+        self.assertTrue(image.image_variants["placeholder"].startswith("data:image/webp;base64,"))
+        self.assertEqual((image.image_asset.width, image.image_asset.height), (400, 200))
+        self.assertEqual(image.image_asset.format, "png")
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertFalse(os.path.exists(upload.staged_path))
+
+    def test_new_image_replaces_the_old_asset(self):
+        image, upload = self.queue()
+        process_upload(upload.pk, LocalTransport())
+        image.refresh_from_db()
+        old_asset = image.image_asset_id
+        upload = queue_upload(image, self.stage(png_bytes(color="red"), "second.png"), "bookland/gallery")
+        process_upload(upload.pk, LocalTransport())
+        image.refresh_from_db()
+        self.assertEqual(list(ImageAsset.objects.values_list("pk", flat=True)), [image.image_asset_id])
+        self.assertNotEqual(image.image_asset_id, old_asset)
+
+    def test_failure_is_retried_with_backoff_then_given_up(self):
+        image, upload = self.queue(b"not an image")
+        self.assertFalse(process_upload(upload.pk, LocalTransport()))
+        upload.refresh_from_db()
+        self.assertEqual(upload.attempts, 1)
+        self.assertEqual(upload.status, ImageUpload.STATUS_QUEUED)
+        self.assertIsNotNone(upload.next_attempt_at)
+        # Not due until the backoff has passed.
+        self.assertFalse(process_upload(upload.pk, LocalTransport()))
+        self.assertEqual(ImageUpload.objects.get().attempts, 1)
+
+        ImageUpload.objects.update(next_attempt_at=None)
+        process_upload(upload.pk, LocalTransport())
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, ImageUpload.STATUS_FAILED)
+        image.refresh_from_db()
+        self.assertEqual(image.image_status, ImageModel.IMAGE_FAILED)
+
+    def test_claimed_upload_is_leased_to_the_worker(self):
+        _, upload = self.queue()
+        with mock.patch.object(LocalTransport, "upload", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                process_upload(upload.pk, LocalTransport())
+        # A worker that died mid-upload leaves it to a later retry, with the
+        # attempt counted.
+        self.assertFalse(process_upload(upload.pk, LocalTransport()))
+        self.assertEqual(ImageUpload.objects.get().attempts, 1)
+
+    def test_deleted_row_drops_its_upload(self):
+        image, upload = self.queue()
+        image.delete()
+        self.assertFalse(process_upload(upload.pk, LocalTransport()))
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertFalse(os.path.exists(upload.staged_path))
+
+    def test_queueing_a_newer_image_drops_the_waiting_one(self):
+        image, first = self.queue()
+        queue_upload(image, self.stage(name="newer.png"), "bookland/gallery")
+        self.assertEqual(ImageUpload.objects.count(), 1)
+        self.assertFalse(os.path.exists(first.staged_path))
+
+
+class ImageUploadAdminTests(UploadTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+
+    def test_retry_now_gives_failed_uploads_a_fresh_set_of_attempts(self):
+        _, upload = self.queue(b"not an image")
+        ImageUpload.objects.update(status=ImageUpload.STATUS_FAILED, attempts=2, last_error="cannot identify image")
+        response = self.client.post(
+            "/admin/booklandapp/imageupload/",
+            {"action": "retry_now", "_selected_action": [upload.pk]},
+        )
+        self.assertEqual(response.status_code, 302)
+        upload.refresh_from_db()
+        self.assertEqual(
+            (upload.status, upload.attempts, upload.last_error, upload.next_attempt_at),
+            (ImageUpload.STATUS_QUEUED, 0, "", None),
+        )
+        self.assertEqual(ImageUploadAdmin.actions, ["retry_now"])
+
+    def test_bulk_upload_queues_every_image(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("a.png", png_bytes())
+            zf.writestr("b.png", png_bytes(color="red"))
+            zf.writestr("notes.txt", "not a picture")
+        response = self.client.post(
+            "/admin/booklandapp/galleryimage/bulk-upload/",
+            {
+                "files": [
+                    SimpleUploadedFile("single.png", png_bytes(), "image/png"),
+                    SimpleUploadedFile("photos.zip", archive.getvalue(), "application/zip"),
+                ],
+            },
+        )
+        self.assertEqual(response.status_code, 302, getattr(response, "context_data", None))
+        self.assertEqual(sorted(GalleryImage.objects.values_list("title", flat=True)), ["a", "b", "single"])
+        self.assertEqual(ImageUpload.objects.filter(status=ImageUpload.STATUS_QUEUED).count(), 3)
+        batch = ImageUpload.objects.values_list("batch", flat=True).first()
+        self.assertIn(str(batch), response["Location"])
+
+        for upload in ImageUpload.objects.all():
+            process_upload(upload.pk, LocalTransport())
+        progress = self.client.get(response["Location"])
+        self.assertEqual((progress.context["uploaded"], progress.context["remaining"]), (3, 0))
+
+    def test_bulk_upload_hands_the_uploads_to_the_pool_after_commit(self):
+        with override_settings(IMAGE_UPLOAD_IN_PROCESS=True), \
+                mock.patch("booklandapp.uploads.submit_background") as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    "/admin/booklandapp/galleryimage/bulk-upload/",
+                    {"files": [SimpleUploadedFile("single.png", png_bytes(), "image/png")]},
+                )
+        submit.assert_called_once_with(ImageUpload.objects.get().pk)
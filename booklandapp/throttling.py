@@ -0,0 +1,157 @@
+"""
+API rate limits shared by every worker on the host.
+
+DRF's AnonRateThrottle/UserRateThrottle keep a list of request timestamps
+per client in the default cache, which is per-process LocMem here: each
+gunicorn worker enforced its own limit, and every check trimmed and wrote
+back the whole list. SQLiteScopedRateThrottle keeps one number per client
+and scope instead, the "theoretical arrival time" of the generic cell rate
+algorithm (a token bucket without a refill timer), and updates it with a
+single UPSERT in a SQLite file that all workers open (THROTTLE_DB_PATH).
+A client may spend its whole allowance in a burst and then gets one request
+per ``duration / num_requests``.
+
+Views pick a scope with DRF's ``@throttle_scope("submit")`` below
+``@api_view``; the rates are REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]. Views
+without one are limited under "anon" or "user". Clients are told apart by
+user id or by IP address, read as DRF does: with NUM_PROXIES set, only the
+address the last trusted proxy saw counts, so a made-up X-Forwarded-For
+does not buy a fresh allowance.
+"""
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# Chance that a check also deletes the rows of clients with a full allowance.
+PRUNE_PROBABILITY = 0.001
+
+
+# =====================================================
+# Stores
+# =====================================================
+class SQLiteStore:
+    """Arrival times in a SQLite file, one connection per thread."""
+
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            # Losing a few updates in a crash only forgives a few requests.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS throttle (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+            )
+            self.local.conn = conn
+        return conn
+
+    def acquire(self, key, now, interval, window):
+        conn = self.connection()
+        # Only moves the arrival time forward when the request is allowed.
+        allowed = conn.execute(
+            """
+            INSERT INTO throttle (key, tat) VALUES (:key, :now + :interval)
+            ON CONFLICT (key) DO UPDATE SET tat = max(tat, :now) + :interval
+            WHERE max(tat, :now) + :interval - :now <= :window
+            RETURNING tat
+            """,
+            {"key": key, "now": now, "interval": interval, "window": window},
+        ).fetchall()
+        if random.random() < PRUNE_PROBABILITY:
+            conn.execute("DELETE FROM throttle WHERE tat < ?", (now,))
+        if allowed:
+            return 0.0
+        row = conn.execute("SELECT tat FROM throttle WHERE key = ?", (key,)).fetchone()
+        return max(row[0], now) + interval - now - window if row else 0.0
+
+
+class MemoryStore:
+    """Arrival times in this process only; for development and the benchmarks."""
+
+    def __init__(self):
+        self.tats = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, key, now, interval, window):
+        with self.lock:
+            tat = max(self.tats.get(key, now), now) + interval
+            if tat - now > window:
+                return tat - now - window
+            self.tats[key] = tat
+            if random.random() < PRUNE_PROBABILITY:
+                self.tats = {k: v for k, v in self.tats.items() if v >= now}
+            return 0.0
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    config = (settings.THROTTLE_STORE, settings.THROTTLE_DB_PATH)
+    store = _stores.get(config)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(config)
+            if store is None:
+                if settings.THROTTLE_STORE == "memory":
+                    store = MemoryStore()
+                else:
+                    store = SQLiteStore(settings.THROTTLE_DB_PATH, settings.THROTTLE_DB_TIMEOUT)
+                _stores[config] = store
+    return store
+
+
+# =====================================================
+# Throttle
+# =====================================================
+class SQLiteScopedRateThrottle(SimpleRateThrottle):
+    """
+    Limit each client to the rate of the view's ``throttle_scope``, or of
+    "user"/"anon" when it has none. Scopes without a rate are not limited.
+    If the store fails the request is let through, since a broken rate
+    limiter must not take the site down with it.
+    """
+    timer = time.time
+
+    def __init__(self):
+        # The rate depends on the view; see allow_request().
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        user = getattr(request, "user", None)
+        authenticated = bool(user and user.is_authenticated)
+        self.scope = getattr(view, "throttle_scope", None) or ("user" if authenticated else "anon")
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        ident = f"user:{user.pk}" if authenticated else f"ip:{self.get_ident(request)}"
+        key = f"{self.scope}:{ident}"
+        # The slack keeps float rounding from costing the last request of a burst.
+        window = self.duration + 1e-6
+        try:
+            self.wait_seconds = get_store().acquire(key, self.timer(), self.duration / self.num_requests, window)
+        except sqlite3.Error as exc:
+            logger.warning("Throttle store unavailable, not limiting: %s", exc)
+            return True
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,372 @@
+"""
+Off-request image uploads for the admin image forms.
+
+The form stages the file under IMAGE_STAGING_DIR, saves the row with
+``image_status = "pending"`` and queues an ImageUpload. After the commit the
+upload is attempted on a background thread; failed ones are retried with
+backoff by ``python manage.py process_image_uploads``. On success the
+transport's URL is written to the row's ``image``.
+
+Transports take a file path and a folder and return a Cloudinary-style
+upload result (``secure_url``, ``width``, ``height``, ``bytes``, ``format``);
+``variant_urls`` then gives the URL of each resized copy listed in the row's
+``image_variants`` (booklandapp/images.py). IMAGE_UPLOAD_TRANSPORT picks one: CloudinaryTransport, or LocalTransport,
+which copies into MEDIA_ROOT and stands in for Cloudinary in tests and
+local development.
+"""
+import io
+import logging
+import os
+import re
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import cloudinary.uploader
+from cloudinary.utils import cloudinary_url
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+from . import retries
+from .images import build_image_variants
+from .instrumentation import timed
+from .models import ImageAsset, ImageModel, ImageUpload
+
+logger = logging.getLogger(__name__)
+
+CLOUDINARY_URL_RE = re.compile(
+    r"^https?://res\.cloudinary\.com/[^/]+/image/upload/"
+    r"(?:[^/]*_[^/]*/)*(?:v(?P<version>\d+)/)?(?P<public_id>.+?)(?:\.\w+)?$"
+)
+
+
+# =====================================================
+# Transports
+# =====================================================
+class CloudinaryTransport:
+    def upload(self, path, folder):
+        with timed("cloudinary"):
+            return cloudinary.uploader.upload(path, folder=folder, quality="auto", fetch_format="auto")
+
+    @staticmethod
+    def parse_url(url):
+        """
+        The upload result fields ``variant_urls`` needs, read back from a
+        Cloudinary delivery URL, or None for other URLs.
+        """
+        match = CLOUDINARY_URL_RE.match(url or "")
+        if not match:
+            return None
+        return {"public_id": match["public_id"], "version": match["version"], "secure_url": url}
+
+    def variant_urls(self, path, result, sizes):
+        """Delivery URLs resized by Cloudinary; nothing else is uploaded."""
+        urls = [
+            cloudinary_url(
+                result["public_id"], version=result.get("version"), secure=True,
+                width=width, crop="limit", quality="auto", fetch_format="auto",
+            )[0]
+            for width, _ in sizes[:-1]
+        ]
+        return urls + [result["secure_url"]]
+
+
+class LocalTransport:
+    """Copy files into MEDIA_ROOT and describe them with Pillow."""
+
+    def __init__(self, location=None, base_url=None):
+        self.storage = FileSystemStorage(
+            location=location or settings.MEDIA_ROOT,
+            base_url=base_url or settings.MEDIA_URL,
+        )
+
+    def upload(self, path, folder):
+        with open(path, "rb") as fh:
+            name = self.storage.save(f"{folder}/{os.path.basename(path)}", File(fh))
+        with Image.open(self.storage.path(name)) as image:
+            width, height = image.size
+            image_format = (image.format or "").lower()
+        return {
+            "secure_url": self.storage.url(name),
+            "public_id": os.path.splitext(name)[0],
+            "storage_name": name,
+            "width": width,
+            "height": height,
+            "bytes": self.storage.size(name),
+            "format": image_format,
+        }
+
+    def parse_url(self, url):
+        """Counterpart of CloudinaryTransport.parse_url for MEDIA_URL files."""
+        if not url or not url.startswith(self.storage.base_url):
+            return None
+        name = url[len(self.storage.base_url):]
+        return {"public_id": os.path.splitext(name)[0], "storage_name": name, "secure_url": url}
+
+    def variant_urls(self, path, result, sizes):
+        """Write a resized copy per size next to the uploaded file."""
+        base, extension = os.path.splitext(result["storage_name"])
+        urls = []
+        with Image.open(path) as original:
+            image_format = original.format or "PNG"
+            image = ImageOps.exif_transpose(original)
+            for width, height in sizes[:-1]:
+                resized = image.resize((width, height), Image.LANCZOS)
+                if image_format == "JPEG" and resized.mode not in ("RGB", "L"):
+                    resized = resized.convert("RGB")
+                buffer = io.BytesIO()
+                resized.save(buffer, image_format, **({"quality": 82} if image_format in ("JPEG", "WEBP") else {}))
+                name = self.storage.save(f"{base}-{width}w{extension}", ContentFile(buffer.getvalue()))
+                urls.append(self.storage.url(name))
+        return urls + [result["secure_url"]]
+
+
+def get_transport():
+    return import_string(settings.IMAGE_UPLOAD_TRANSPORT)()
+
+
+# =====================================================
+# Staging / queueing
+# =====================================================
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tif", ".tiff"}
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class StagingError(Exception):
+    pass
+
+
+def stage_chunks(chunks, name):
+    """Write ``chunks`` to a new file in IMAGE_STAGING_DIR; returns its path."""
+    os.makedirs(settings.IMAGE_STAGING_DIR, exist_ok=True)
+    extension = os.path.splitext(name)[1].lower()
+    path = os.path.join(settings.IMAGE_STAGING_DIR, f"{uuid.uuid4().hex}{extension}")
+    with open(path, "wb") as fh:
+        for chunk in chunks:
+            fh.write(chunk)
+    return path
+
+
+def stage_file(uploaded_file):
+    """Copy an uploaded file into IMAGE_STAGING_DIR in chunks; returns its path."""
+    return stage_chunks(uploaded_file.chunks(), uploaded_file.name)
+
+
+def stage_image(uploaded_file):
+    """Stage an uploaded file after checking Pillow can read it as an image."""
+    path = stage_file(uploaded_file)
+    try:
+        verify_image(path)
+    except StagingError:
+        remove_staged(path)
+        raise
+    return path
+
+
+def verify_image(path):
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception as exc:  # Pillow raises a variety of errors on bad files
+        raise StagingError(f"Not a valid image: {exc}")
+
+
+def stage_zip_images(fileobj, max_files, max_bytes):
+    """
+    Stage every image in a zip archive, one member at a time.
+    Yields ``(name, staged_path or None, error or None)``.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as exc:
+        raise StagingError(f"Not a valid zip file: {exc}")
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir()
+            and os.path.splitext(info.filename)[1].lower() in IMAGE_EXTENSIONS
+            and not os.path.basename(info.filename).startswith(".")
+        ]
+        if len(members) > max_files:
+            raise StagingError(f"The archive holds {len(members)} images; the limit is {max_files}.")
+        if sum(info.file_size for info in members) > max_bytes:
+            raise StagingError("The archive is too large once extracted.")
+        for info in members:
+            name = os.path.basename(info.filename)
+            with archive.open(info) as member:
+                path = stage_chunks(iter(lambda: member.read(COPY_CHUNK_SIZE), b""), name)
+            try:
+                verify_image(path)
+            except StagingError as exc:
+                remove_staged(path)
+                yield name, None, str(exc)
+            else:
+                yield name, path, None
+
+
+def remove_staged(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def queue_upload(instance, staged_path, folder):
+    """
+    Queue ``staged_path`` as the new image of ``instance`` (already saved)
+    and start uploading it once the transaction commits.
+    """
+    content_type = ContentType.objects.get_for_model(instance)
+    # A newer image replaces any upload still waiting for this row.
+    for stale in ImageUpload.objects.filter(content_type=content_type, object_id=instance.pk):
+        remove_staged(stale.staged_path)
+        stale.delete()
+    return queue_uploads([(instance, staged_path)], folder)[0]
+
+
+def queue_uploads(items, folder, batch=None):
+    """
+    Queue ``(saved instance, staged path)`` pairs with one bulk INSERT and
+    start uploading them once the transaction commits.
+    """
+    uploads = ImageUpload.objects.bulk_create([
+        ImageUpload(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+            folder=folder,
+            staged_path=staged_path,
+            batch=batch,
+        )
+        for instance, staged_path in items
+    ])
+    if settings.IMAGE_UPLOAD_IN_PROCESS:
+        pks = [upload.pk for upload in uploads]
+        transaction.on_commit(lambda: [submit_background(pk) for pk in pks])
+    return uploads
+
+
+# =====================================================
+# Processing
+# =====================================================
+def due_uploads():
+    return retries.due(ImageUpload.objects.filter(status=ImageUpload.STATUS_QUEUED), timezone.now())
+
+
+def claim(pk):
+    """Lease a due upload (see retries.py); returns it, or None if someone else has it."""
+    upload = due_uploads().filter(pk=pk).first()
+    if upload is None:
+        return None
+    # Only while next_attempt_at is unchanged, i.e. no other worker took it first.
+    claimed = retries.lease(ImageUpload.objects.filter(pk=pk, next_attempt_at=upload.next_attempt_at), timezone.now())
+    if not claimed:
+        return None
+    upload.attempts += 1
+    return upload
+
+
+def process_upload(pk, transport=None):
+    """Upload one queued file and patch its row. Returns True on success."""
+    upload = claim(pk)
+    if upload is None:
+        return False
+    target = upload.target
+    if target is None:
+        # The row was deleted while the file waited.
+        remove_staged(upload.staged_path)
+        upload.delete()
+        return False
+
+    transport = transport or get_transport()
+    try:
+        result = transport.upload(upload.staged_path, upload.folder)
+        variants = build_image_variants(upload.staged_path, transport, result)
+    except Exception as exc:  # network, API and file errors alike
+        record_failure(upload, target, exc)
+        return False
+
+    with transaction.atomic():
+        # Nothing deleted means a newer image replaced this one meanwhile.
+        # (Writing first also avoids SQLite's read-to-write lock upgrade.)
+        deleted, _ = ImageUpload.objects.filter(pk=upload.pk).delete()
+        if deleted:
+            apply_upload_result(target, result, variants)
+    remove_staged(upload.staged_path)
+    return True
+
+
+def apply_upload_result(target, result, variants):
+    old_asset_id = target.image_asset_id
+    target.image = result.get("secure_url")
+    target.image_variants = variants
+    target.image_asset = create_asset(result, variants)
+    target.image_status = ImageModel.IMAGE_READY
+    target.save(update_fields=["image", "image_variants", "image_asset", "image_status", "updated_at"])
+    if old_asset_id:
+        ImageAsset.objects.filter(pk=old_asset_id).delete()
+
+
+def create_asset(result, variants):
+    """
+    Record an uploaded image. Dimensions come from the Pillow-decoded file
+    (EXIF rotation applied); size and format from the upload result.
+    """
+    return ImageAsset.objects.create(
+        url=result["secure_url"],
+        public_id=result.get("public_id") or "",
+        width=variants["width"],
+        height=variants["height"],
+        bytes=result.get("bytes"),
+        format=(result.get("format") or "")[:10],
+    )
+
+
+def record_failure(upload, target, exc):
+    gave_up = retries.record_failure(
+        upload, exc, settings.IMAGE_UPLOAD_MAX_ATTEMPTS, ImageUpload.STATUS_FAILED, timezone.now()
+    )
+    # update() rather than save(): the upload may have been replaced meanwhile.
+    updated = ImageUpload.objects.filter(pk=upload.pk).update(
+        **{name: getattr(upload, name) for name in retries.FAILURE_FIELDS}
+    )
+    if not gave_up:
+        logger.warning("Image upload %s failed (attempt %s): %s", upload.pk, upload.attempts, exc)
+    elif updated:
+        logger.error("Giving up on image upload %s: %s", upload.pk, exc)
+        target.image_status = ImageModel.IMAGE_FAILED
+        target.save(update_fields=["image_status"])
+
+
+# =====================================================
+# In-process background uploads
+# =====================================================
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def submit_background(pk):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_UPLOAD_THREADS, thread_name_prefix="image-upload"
+            )
+    _executor.submit(run_background, pk)
+
+
+def run_background(pk):
+    try:
+        process_upload(pk)
+    except Exception:
+        logger.exception("Background image upload %s crashed", pk)
+    finally:
+        # Connections are per thread; don't leave this one's open.
+        connections.close_all()
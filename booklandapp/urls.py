@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     api_home,
@@ -5,14 +6,33 @@ from .views import (
     api_leadership,
     api_gallery,
     api_fees,
+    api_fee_pdf,
     api_events,
     api_featured_events,
     api_alumni,
     api_admission_deadlines,
+    api_search,
+    api_bundle,
     api_admissions,
     api_contact,
+    api_admissions_bulk,
+    api_contact_bulk,
 )
 
+if settings.ASYNC_READ_VIEWS:
+    # ASGI deployments: the same read endpoints as native coroutines.
+    from .async_views import (  # noqa: F811
+        api_testimonials,
+        api_leadership,
+        api_gallery,
+        api_fees,
+        api_events,
+        api_featured_events,
+        api_alumni,
+        api_admission_deadlines,
+        api_search,
+    )
+
 urlpatterns = [
     path("", api_home, name="api_home"),
     path("testimonials/", api_testimonials, name="api_testimonials"),
@@ -20,9 +40,14 @@ urlpatterns = [
     path("leadership/", api_leadership, name="api_leadership"),
     path("gallery/", api_gallery, name="api_gallery"),
     path("fees/", api_fees, name="api_fees"),
+    path("fees/<int:pk>/pdf/", api_fee_pdf, name="api_fee_pdf"),
     path("featured-events/", api_featured_events, name="api_featured_events"),
     path("alumni/", api_alumni, name="api_alumni"),
     path("admission-deadlines/", api_admission_deadlines, name="api_admission_deadlines"),
+    path("search/", api_search, name="api_search"),
+    path("bundle/", api_bundle, name="api_bundle"),
     path("admissions/submit/", api_admissions, name="api_admissions"),
     path("contact/submit/", api_contact, name="api_contact"),
+    path("admissions/submit/bulk/", api_admissions_bulk, name="api_admissions_bulk"),
+    path("contact/submit/bulk/", api_contact_bulk, name="api_contact_bulk"),
 ]
@@ -1,9 +1,32 @@
+import hashlib
+import json
+import os
 from datetime import date
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes, permission_classes, throttle_scope
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from cloudinary.utils import cloudinary_url
+from django.conf import settings
+from django.core.exceptions import ValidationError as ModelValidationError
+from django.db import transaction
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    QueryDict,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework.renderers import JSONRenderer
 
 from .models import (
     AdmissionMessage,
@@ -16,19 +39,76 @@ from .models import (
     AlumniMessage,
     FeaturedEvent,
     KeyAdmissionDeadline,
+    ImageAsset,
+    PendingSubmission,
 )
 from .serializers import (
-    TestimonialsMessageSerializer,
-    LeadershipMessageSerializer,
-    GalleryImageSerializer,
     FeeStructureSerializer,
-    EventSerializer,
-    FeaturedEventSerializer,
-    AlumniMessageSerializer,
-    KeyAdmissionDeadlineSerializer,
     AdmissionMessageSerializer,
     EnquiryMessagesSerializer,
 )
+from .fast_serializers import (
+    TestimonialsMessageValuesSerializer,
+    LeadershipMessageValuesSerializer,
+    GalleryImageValuesSerializer,
+    EventValuesSerializer,
+    FeaturedEventValuesSerializer,
+    AlumniMessageValuesSerializer,
+    KeyAdmissionDeadlineValuesSerializer,
+)
+from . import feepdfs, search
+from .cache import cache_api_response, get_cached_entry, set_validators, store_entry
+from .pagination import KeysetPagination, RankedPagination
+from .parsers import NDJSONParser
+from .submissions import enqueue_submission
+
+
+# =====================================================
+# Pagination helpers
+# =====================================================
+def id_pagination():
+    return KeysetPagination(ordering=("id",), get_key=lambda item: (item["id"],))
+
+
+# Newest year first, then in calendar order within the year.
+EVENT_ORDERING = ("-year", "event_date", "id")
+
+
+def event_pagination():
+    return KeysetPagination(
+        ordering=EVENT_ORDERING,
+        # The stored event_date, not one rebuilt from month/day/year: rows
+        # whose invalid day migration 0025 clamped would not match it.
+        get_key=lambda row: (row["year"], row["event_date"].isoformat(), row["id"]),
+    )
+
+
+def paginated_or_full(request, queryset, serializer_class, paginator):
+    """
+    Serialize ``queryset`` as a keyset page when the client asked for one
+    (``?limit=`` / ``?cursor=``), otherwise as the full list.
+    """
+    page = paginator.paginate_queryset(queryset, request)
+    if page is None:
+        return Response(serializer_class(queryset, many=True).data)
+    serializer = serializer_class(page, many=True)
+    data = serializer.data
+    return paginator.get_paginated_response(data, serializer.rows)
+
+
+# =====================================================
+# Image filters
+# =====================================================
+def filter_orientation(request, queryset):
+    """Apply ``?orientation=landscape|portrait|square`` from the image's ImageAsset."""
+    orientation = request.GET.get("orientation")
+    if not orientation:
+        return queryset
+    if orientation not in dict(ImageAsset.ORIENTATION_CHOICES):
+        choices = ", ".join(dict(ImageAsset.ORIENTATION_CHOICES))
+        raise ValidationError({"orientation": [f"Must be one of: {choices}."]})
+    return queryset.filter(image_asset__orientation=orientation)
+
 
 # =====================================================
 # General / Health Check
@@ -46,30 +126,36 @@ def api_home(request):
 # Read-only APIs
 # =====================================================
 @api_view(["GET"])
+@throttle_scope("read")
+@cache_api_response(TestimonialsMessage)
 def api_testimonials(request):
-    queryset = TestimonialsMessage.objects.all()
-    serializer = TestimonialsMessageSerializer(queryset, many=True)
-    return Response(serializer.data)
+    queryset = filter_orientation(request, TestimonialsMessage.objects.all())
+    return paginated_or_full(request, queryset, TestimonialsMessageValuesSerializer, id_pagination())
 
 
 @api_view(["GET"])
+@throttle_scope("read")
+@cache_api_response(LeadershipMessage)
 def api_leadership(request):
-    queryset = LeadershipMessage.objects.all()
-    serializer = LeadershipMessageSerializer(queryset, many=True)
+    queryset = filter_orientation(request, LeadershipMessage.objects.all())
+    serializer = LeadershipMessageValuesSerializer(queryset, many=True)
     return Response(serializer.data)
 
 
 @api_view(["GET"])
+@throttle_scope("read")
+@cache_api_response(GalleryImage)
 def api_gallery(request):
-    queryset = GalleryImage.objects.all()
-    serializer = GalleryImageSerializer(queryset, many=True)
-    return Response(serializer.data)
+    queryset = filter_orientation(request, GalleryImage.objects.all())
+    return paginated_or_full(request, queryset, GalleryImageValuesSerializer, id_pagination())
 
 
 # =====================================================
 # Fees API - returns all fee structures with public PDF URLs
 # =====================================================
 @api_view(['GET'])
+@throttle_scope("read")
+@cache_api_response(FeeStructure)
 def api_fees(request):
     """
     Returns all fee structures with guaranteed public PDF URLs.
@@ -79,6 +165,58 @@ def api_fees(request):
     return Response(serializer.data)
 
 
+@require_safe
+def api_fee_pdf(request, pk):
+    """
+    Serves a fee structure PDF from the local mirror, with a strong ETag and
+    single-range requests. Redirects to Cloudinary while there is no mirror.
+    """
+    fee = get_object_or_404(FeeStructure.objects.only("pk", "pdf_url", "pdf_sha256", "updated_at"), pk=pk)
+    if not fee.pdf_url:
+        raise Http404("No PDF uploaded")
+    path = feepdfs.mirror_path(fee.pdf_sha256) if fee.pdf_sha256 else None
+    if not settings.FEE_PDF_MIRROR or path is None or not os.path.exists(path):
+        if settings.FEE_PDF_MIRROR:
+            feepdfs.schedule_mirror(fee.pk)
+        return HttpResponseRedirect(fee.pdf_url)
+
+    etag = quote_etag(fee.pdf_sha256)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified["ETag"] = etag
+        return not_modified
+
+    size = os.path.getsize(path)
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if if_range is None or if_range == etag:
+        try:
+            byte_range = feepdfs.parse_range(request.headers.get("Range"), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, "rb"), content_type="application/pdf")
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            feepdfs.read_range(path, start, end), status=206, content_type="application/pdf"
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Content-Disposition"] = f'inline; filename="fee-structure-{fee.pk}.pdf"'
+    # file_url carries ?v=<hash>, so that exact URL never changes content.
+    if request.GET.get("v") == fee.pdf_sha256[:16]:
+        response["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response["Cache-Control"] = f"public, max-age={settings.FEE_PDF_MAX_AGE}"
+    return response
+
+
 @api_view(['POST'])
 def api_create_fee(request):
     """
@@ -95,24 +233,65 @@ def api_create_fee(request):
 # =====================================================
 # Events APIs
 # =====================================================
-@api_view(["GET"])
-def api_events(request):
-    queryset = Event.objects.all()
+def get_date_param(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value) if len(value) == 10 else None
+    except ValueError:
+        # Well formed but not a real date, e.g. 2025-02-30.
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: ["Date has wrong format. Use YYYY-MM-DD."]})
+    return parsed
+
+
+def events_vary(request):
+    # "upcoming" results change at midnight even when no row does.
+    return timezone.localdate().isoformat() if request.GET.get("upcoming") else ""
+
+
+def filter_events(request, queryset):
+    """Apply the ``month``, ``category``, ``from``, ``to`` and ``upcoming`` filters."""
     month = request.GET.get("month")
     category = request.GET.get("category")
+    date_from = get_date_param(request, "from")
+    date_to = get_date_param(request, "to")
+    upcoming = request.GET.get("upcoming", "").lower() in ("1", "true", "yes")
     if month:
         queryset = queryset.filter(month=month)
     if category:
         queryset = queryset.filter(category=category)
-    queryset = queryset.order_by("-year", "month", "day")
-    serializer = EventSerializer(queryset, many=True)
+    if date_from:
+        queryset = queryset.filter(event_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(event_date__lte=date_to)
+    if upcoming:
+        queryset = queryset.filter(event_date__gte=timezone.localdate())
+    return queryset
+
+
+@api_view(["GET"])
+@throttle_scope("read")
+@cache_api_response(Event, vary=events_vary)
+def api_events(request):
+    queryset = filter_events(request, Event.objects.all())
+    paginator = event_pagination()
+    if paginator.is_requested(request):
+        return paginated_or_full(request, queryset, EventValuesSerializer, paginator)
+
+    queryset = queryset.order_by(*EVENT_ORDERING)
+    serializer = EventValuesSerializer(queryset, many=True)
     return Response(serializer.data)
 
 
 @api_view(["GET"])
+@throttle_scope("read")
+@cache_api_response(FeaturedEvent)
 def api_featured_events(request):
-    queryset = FeaturedEvent.objects.all()
-    serializer = FeaturedEventSerializer(queryset, many=True)
+    queryset = filter_orientation(request, FeaturedEvent.objects.all())
+    serializer = FeaturedEventValuesSerializer(queryset, many=True)
     return Response(serializer.data)
 
 
@@ -120,38 +299,258 @@ def api_featured_events(request):
 # Alumni
 # =====================================================
 @api_view(["GET"])
+@throttle_scope("read")
+@cache_api_response(AlumniMessage)
 def api_alumni(request):
-    queryset = AlumniMessage.objects.all()
-    serializer = AlumniMessageSerializer(queryset, many=True)
-    return Response(serializer.data)
+    queryset = filter_orientation(request, AlumniMessage.objects.all())
+    return paginated_or_full(request, queryset, AlumniMessageValuesSerializer, id_pagination())
 
 
 # =====================================================
 # Admission Deadlines
 # =====================================================
 @api_view(["GET"])
+@throttle_scope("read")
+@cache_api_response(KeyAdmissionDeadline)
 def api_admission_deadlines(request):
     queryset = KeyAdmissionDeadline.objects.all().order_by('deadline_date')
-    serializer = KeyAdmissionDeadlineSerializer(queryset, many=True)
+    serializer = KeyAdmissionDeadlineValuesSerializer(queryset, many=True)
     return Response(serializer.data)
 
 
+# =====================================================
+# Search
+# =====================================================
+def search_params(request):
+    """The validated ``(query, kinds)`` of a search request."""
+    query = request.GET.get("q", "").strip()
+    if not search.query_terms(query):
+        raise ValidationError({"q": ["Enter at least one word to search for."]})
+    if len(query) > settings.SEARCH_MAX_QUERY_LENGTH:
+        raise ValidationError({"q": [f"Ensure this value has at most {settings.SEARCH_MAX_QUERY_LENGTH} characters."]})
+    kinds = [name.strip() for name in request.GET.get("type", "").split(",") if name.strip()]
+    unknown = [name for name in kinds if name not in search.SOURCES]
+    if unknown:
+        raise ValidationError({"type": [f"Unknown type: {name}" for name in unknown]})
+    return query, kinds
+
+
+@api_view(["GET"])
+@cache_api_response(*search.KIND_FOR_MODEL)
+def api_search(request):
+    """
+    Full-text search: ``?q=`` (required), ``?type=event,alumni`` to narrow
+    the kinds, and ``?limit=`` / ``?cursor=`` to page through ranked hits.
+    """
+    query, kinds = search_params(request)
+    paginator = RankedPagination()
+    offset, limit = paginator.get_window(request)
+    hits = search.search(query, kinds, offset, limit + 1)
+    return paginator.get_paginated_response(hits)
+
+
+# =====================================================
+# Bundle - several read endpoints in one round trip
+# =====================================================
+# section -> (view name, serializer, queryset). The view name and ordering
+# match the unfiltered endpoint so both share one cache entry.
+BUNDLE_SECTIONS = {
+    "testimonials": (
+        "api_testimonials",
+        TestimonialsMessageValuesSerializer,
+        lambda: TestimonialsMessage.objects.all(),
+    ),
+    "leadership": ("api_leadership", LeadershipMessageValuesSerializer, lambda: LeadershipMessage.objects.all()),
+    "featured-events": ("api_featured_events", FeaturedEventValuesSerializer, lambda: FeaturedEvent.objects.all()),
+    "gallery": ("api_gallery", GalleryImageValuesSerializer, lambda: GalleryImage.objects.all()),
+    "admission-deadlines": (
+        "api_admission_deadlines",
+        KeyAdmissionDeadlineValuesSerializer,
+        lambda: KeyAdmissionDeadline.objects.all().order_by('deadline_date'),
+    ),
+    "fees": ("api_fees", FeeStructureSerializer, lambda: FeeStructure.objects.all().order_by('level')),
+    "events": ("api_events", EventValuesSerializer, lambda: Event.objects.order_by(*EVENT_ORDERING)),
+    "alumni": ("api_alumni", AlumniMessageValuesSerializer, lambda: AlumniMessage.objects.all()),
+}
+
+HOMEPAGE_SECTIONS = [
+    "testimonials",
+    "leadership",
+    "featured-events",
+    "gallery",
+    "admission-deadlines",
+    "fees",
+]
+
+
+def get_bundle_fields(request, sections):
+    """Read optional per-section field lists: ``?fields.gallery=id,image``."""
+    fields = {}
+    for section in sections:
+        raw = request.GET.get(f"fields.{section}")
+        if raw:
+            fields[section] = [name.strip() for name in raw.split(",") if name.strip()]
+    return fields
+
+
+def render_section(body, fields):
+    if not fields:
+        return body
+    items = json.loads(body)
+    return JSONRenderer().render([
+        {name: item[name] for name in fields if name in item} for item in items
+    ])
+
+
+@api_view(["GET"])
+@throttle_scope("read")
+def api_bundle(request):
+    """
+    Returns several read endpoints as one JSON object keyed by section name.
+
+    ``?sections=`` is a comma-separated subset of BUNDLE_SECTIONS and
+    defaults to what the landing page needs. Each section is cached on its
+    own and the response ETag combines the section ETags.
+    """
+    raw_sections = request.GET.get("sections")
+    if raw_sections:
+        sections = [name.strip() for name in raw_sections.split(",") if name.strip()]
+    else:
+        sections = HOMEPAGE_SECTIONS
+    unknown = [name for name in sections if name not in BUNDLE_SECTIONS]
+    if unknown:
+        raise ValidationError({"sections": [f"Unknown section: {name}" for name in unknown]})
+    sections = list(dict.fromkeys(sections))
+    fields = get_bundle_fields(request, sections)
+
+    no_filters = QueryDict()
+    entries = {}
+    for section in sections:
+        view_name, serializer_class, get_queryset = BUNDLE_SECTIONS[section]
+        entries[section] = get_cached_entry(view_name, no_filters, [get_queryset().model])
+
+    tags = "|".join(f"{section}:{entry['etag']}" for section, (_, entry) in entries.items())
+    selection = "|".join(f"{section}:{','.join(names)}" for section, names in sorted(fields.items()))
+    bundle_entry = {
+        "etag": "W/" + quote_etag(hashlib.sha256(f"{tags}#{selection}".encode()).hexdigest()[:32]),
+    }
+    not_modified = get_conditional_response(request, etag=bundle_entry["etag"])
+    if not_modified is not None:
+        return set_validators(not_modified, bundle_entry)
+
+    parts = []
+    for section, (key, entry) in entries.items():
+        if "body" not in entry:
+            _, serializer_class, get_queryset = BUNDLE_SECTIONS[section]
+            data = serializer_class(get_queryset(), many=True).data
+            store_entry(key, entry, data)
+        parts.append(json.dumps(section).encode() + b":" + render_section(entry["body"], fields.get(section)))
+    body = b"{" + b",".join(parts) + b"}"
+
+    if request.accepted_renderer.format != "json":
+        return Response(json.loads(body))
+    return set_validators(HttpResponse(body, content_type="application/json"), bundle_entry)
+
+
 # =====================================================
 # Write APIs
 # =====================================================
+def submit(serializer, kind, success_message):
+    """
+    Queue a valid submission for the process_submissions worker (202), or
+    save it right away (201) when SUBMISSION_QUEUE_ENABLED is off.
+
+    As in bulk_submit(), the submission is also checked against the model
+    fields, which are stricter than the serializer's (phone is an integer
+    column): a queued row the worker cannot save would only fail there.
+    """
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        serializer.Meta.model(**serializer.validated_data).clean_fields()
+    except ModelValidationError as exc:
+        return Response(exc.message_dict, status=status.HTTP_400_BAD_REQUEST)
+    if settings.SUBMISSION_QUEUE_ENABLED:
+        enqueue_submission(kind, serializer.validated_data)
+        return Response({"success": success_message}, status=status.HTTP_202_ACCEPTED)
+    serializer.save()
+    return Response({"success": success_message}, status=status.HTTP_201_CREATED)
+
+
 @api_view(["POST"])
+@throttle_scope("submit")
 def api_admissions(request):
     serializer = AdmissionMessageSerializer(data=request.data)
-    if serializer.is_valid():
-        serializer.save()
-        return Response({"success": "Admission request submitted successfully."}, status=status.HTTP_201_CREATED)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return submit(serializer, PendingSubmission.KIND_ADMISSION, "Admission request submitted successfully.")
 
 
 @api_view(["POST"])
+@throttle_scope("submit")
 def api_contact(request):
     serializer = EnquiryMessagesSerializer(data=request.data)
-    if serializer.is_valid():
-        serializer.save()
-        return Response({"success": "Your message has been sent successfully."}, status=status.HTTP_201_CREATED)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return submit(serializer, PendingSubmission.KIND_ENQUIRY, "Your message has been sent successfully.")
+
+
+# =====================================================
+# Bulk write APIs (staff re-entering paper forms)
+# =====================================================
+BULK_CHUNK_SIZE = 500
+
+
+def bulk_submit(request, serializer_class):
+    """
+    Validate every item of a JSON array / NDJSON body on its own, save the
+    valid ones with chunked bulk_create and report a result per item.
+
+    Items are also checked against the model fields: bulk_create does not
+    go through save(), and one row the column rejects would fail the batch.
+    """
+    items = request.data
+    if not isinstance(items, list):
+        raise ValidationError({"non_field_errors": ["Expected a JSON array or NDJSON lines."]})
+    if len(items) > settings.BULK_SUBMISSION_MAX_ITEMS:
+        raise ValidationError({
+            "non_field_errors": [f"At most {settings.BULK_SUBMISSION_MAX_ITEMS} items per request."]
+        })
+
+    model = serializer_class.Meta.model
+    serializer = serializer_class()
+    results = []
+    instances = []
+    for index, item in enumerate(items):
+        try:
+            instance = model(**serializer.run_validation(item))
+            instance.clean_fields()
+        except ValidationError as exc:
+            results.append({"index": index, "status": "invalid", "errors": exc.detail})
+        except ModelValidationError as exc:
+            results.append({"index": index, "status": "invalid", "errors": exc.message_dict})
+        else:
+            instances.append(instance)
+            results.append({"index": index, "status": "created", "instance": instance})
+
+    with transaction.atomic():
+        model.objects.bulk_create(instances, batch_size=BULK_CHUNK_SIZE)
+    for result in results:
+        if "instance" in result:
+            result["id"] = result.pop("instance").pk
+
+    created = len(instances)
+    return Response(
+        {"created": created, "invalid": len(items) - created, "results": results},
+        status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
+    )
+
+
+@api_view(["POST"])
+@parser_classes([JSONParser, NDJSONParser])
+@permission_classes([IsAdminUser])
+def api_admissions_bulk(request):
+    return bulk_submit(request, AdmissionMessageSerializer)
+
+
+@api_view(["POST"])
+@parser_classes([JSONParser, NDJSONParser])
+@permission_classes([IsAdminUser])
+def api_contact_bulk(request):
+    return bulk_submit(request, EnquiryMessagesSerializer)